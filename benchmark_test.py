@@ -0,0 +1,42 @@
+"""Benchmarks of the Ramsey environments with pytest-benchmark.
+
+Run with `pytest benchmark_test.py --benchmark-json=benchmark.json`, or run
+`python -m ramsey.benchmark` for the full grid without pytest-benchmark.
+"""
+
+import pytest
+
+from ramsey import benchmark as ramsey_benchmark
+
+pytest.importorskip('pytest_benchmark')
+
+GRID = [(6, 3), (10, 4), (17, 4)]
+
+
+@pytest.mark.parametrize('env_id', list(ramsey_benchmark.ENVIRONMENTS))
+@pytest.mark.parametrize('policy', ['random', 'adversarial'])
+@pytest.mark.parametrize('n_nodes,k_clique', GRID)
+def test_environment(benchmark, env_id, n_nodes, k_clique, policy):
+    result = benchmark.pedantic(ramsey_benchmark.benchmark_environment,
+                                args=(env_id, n_nodes, k_clique, policy, 200),
+                                rounds=3)
+    benchmark.extra_info.update(result)
+
+
+@pytest.mark.parametrize('n_nodes', [n_nodes for n_nodes, _ in GRID])
+def test_ramsey_number(benchmark, n_nodes):
+    graphs = ramsey_benchmark.random_graphs(n_nodes, 10)
+    benchmark(lambda: [
+        ramsey_benchmark.reward_functions.ramsey_number(graph)
+        for graph in graphs
+    ])
+
+
+@pytest.mark.parametrize('n_nodes', [n_nodes for n_nodes, _ in GRID])
+def test_one_hot_encode(benchmark, n_nodes):
+    graphs = ramsey_benchmark.random_graphs(n_nodes, 10)
+    dictionary = ramsey_benchmark.encoders.graph_hot_encoder_dict(n_nodes)
+    benchmark(lambda: [
+        ramsey_benchmark.encoders.one_hot_encode(dictionary, graph.edges)
+        for graph in graphs
+    ])
@@ -0,0 +1,83 @@
+"""Tests of the canonical labelling of edge-coloured graphs."""
+
+import networkx
+import numpy as np
+import pytest
+
+from ramsey import canonical
+from ramsey import encoders
+from ramsey import reward_functions
+
+
+def relabel_colouring(colouring, n_nodes, labels):
+    """Colouring where edge (labels[i], labels[j]) has the colour of (i, j)."""
+    encoder = encoders.EdgeEncoder(n_nodes)
+    relabelled = np.empty_like(colouring)
+    for index, (node_u, node_v) in enumerate(encoder.edges):
+        relabelled[encoder.edge_index(labels[node_u],
+                                      labels[node_v])] = colouring[index]
+    return relabelled
+
+
+@pytest.mark.parametrize('n_nodes', [1, 2, 5, 8, 10])
+def test_invariant_under_relabelling(n_nodes):
+    rng = np.random.default_rng(n_nodes)
+    n_edges = n_nodes * (n_nodes - 1) // 2
+    colourings = rng.integers(0, 2, (20, n_edges))
+    relabelled = np.stack([
+        relabel_colouring(colouring, n_nodes, rng.permutation(n_nodes))
+        for colouring in colourings
+    ])
+    forms, _ = canonical.canonical_colourings(colourings)
+    relabelled_forms, _ = canonical.canonical_colourings(relabelled)
+    np.testing.assert_array_equal(forms, relabelled_forms)
+
+
+def test_labellings():
+    rng = np.random.default_rng(0)
+    colourings = rng.integers(0, 2, (20, 28))
+    forms, labellings = canonical.canonical_colourings(colourings)
+    for colouring, form, labelling in zip(colourings, forms, labellings):
+        expected = np.empty_like(colouring)
+        encoder = encoders.EdgeEncoder(8)
+        for index, (node_u, node_v) in enumerate(encoder.edges):
+            expected[index] = colouring[encoder.edge_index(
+                labelling[node_u], labelling[node_v])]
+        np.testing.assert_array_equal(np.unpackbits(form, count=28), expected)
+        single_form, _ = canonical.canonical_colourings(colouring)
+        np.testing.assert_array_equal(single_form, form)
+
+
+def test_separates_non_isomorphic_graphs():
+    graphs = [networkx.gnm_random_graph(7, 10, seed) for seed in range(30)]
+    forms = []
+    for graph in graphs:
+        adjacency, _ = reward_functions.adjacency_bitmasks(graph)
+        forms.append(canonical.canonical_form([adjacency], 7))
+    for index, graph in enumerate(graphs):
+        for other in range(index):
+            assert (forms[index] == forms[other]) == networkx.is_isomorphic(
+                graph, graphs[other])
+
+
+def path_adjacencies(coloured_edges):
+    """Adjacencies of a 3 node graph with one list of edges per colour."""
+    adjacencies = [[0] * 3 for _ in coloured_edges]
+    for adjacency, edges in zip(adjacencies, coloured_edges):
+        for node_u, node_v in edges:
+            adjacency[node_u] |= 1 << node_v
+            adjacency[node_v] |= 1 << node_u
+    return adjacencies
+
+
+def test_two_colours():
+    # Paths with one edge of each colour are isomorphic.
+    paths = [([(0, 1)], [(1, 2)]), ([(2, 1)], [(1, 0)]), ([(0, 2)], [(2, 1)])]
+    forms = {
+        canonical.canonical_form(path_adjacencies(coloured_edges), 3)
+        for coloured_edges in paths
+    }
+    assert len(forms) == 1
+    # But not to paths with both edges of the same colour.
+    assert canonical.canonical_form(path_adjacencies([[(0, 1), (1, 2)], []]),
+                                    3) not in forms
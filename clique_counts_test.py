@@ -0,0 +1,53 @@
+"""Tests of the batched monochromatic clique counts."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from ramsey import clique_counts
+from ramsey import encoders
+from ramsey.envs import ramsey_env_multiplayer
+
+
+def brute_force_count(colouring, n_nodes, k_clique, colour):
+    encoder = encoders.EdgeEncoder(n_nodes)
+    return sum(
+        all(colouring[encoder.edge_index(node_u, node_v)] == colour
+            for node_u, node_v in itertools.combinations(nodes, 2))
+        for nodes in itertools.combinations(range(n_nodes), k_clique))
+
+
+@pytest.mark.parametrize('n_nodes,k_clique', [(5, 1), (5, 2), (6, 3), (8, 3),
+                                              (8, 4), (9, 5), (4, 6)])
+def test_matches_brute_force(n_nodes, k_clique):
+    rng = np.random.default_rng(n_nodes + k_clique)
+    colourings = rng.integers(0, 3, (20, n_nodes * (n_nodes - 1) // 2))
+    counts = clique_counts.monochromatic_counts(colourings, n_nodes, k_clique,
+                                                (1, 2))
+    assert counts.shape == (20, 2)
+    for colouring, colouring_counts in zip(colourings, counts):
+        assert colouring_counts.tolist() == [
+            brute_force_count(colouring, n_nodes, k_clique, colour)
+            for colour in (1, 2)
+        ]
+
+
+def test_single_colouring():
+    counts = clique_counts.monochromatic_counts(np.zeros(10), 5, 3)
+    assert counts.tolist() == [[10, 0]]
+
+
+def test_count_rewards():
+    env = ramsey_env_multiplayer.RamseyGameMultiplayer(6,
+                                                       3,
+                                                       reward_mode='count')
+    env.reset()
+    rng = np.random.default_rng(0)
+    done = False
+    while not done:
+        _, reward, done, _ = env.step(
+            rng.choice(np.flatnonzero(env.action_masks())))
+        colours = env.edges[0] + 2 * env.edges[1]
+        assert reward == -clique_counts.monochromatic_counts(
+            colours, 6, env.count_clique, (1, 2)).sum()
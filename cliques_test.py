@@ -0,0 +1,92 @@
+"""Tests of the clique search on adjacency bitmasks."""
+
+import itertools
+
+import networkx
+import pytest
+
+from ramsey import cliques
+from ramsey import reward_functions
+
+
+def random_graphs(n_graphs=50):
+    return [
+        networkx.gnp_random_graph(seed % 12 + 1, (seed % 9 + 1) / 10, seed)
+        for seed in range(n_graphs)
+    ]
+
+
+def networkx_clique_number(graph):
+    return max((len(clique) for clique in networkx.find_cliques(graph)),
+               default=0)
+
+
+@pytest.mark.parametrize('graph', random_graphs())
+def test_clique_number(graph):
+    adjacency, nodes = reward_functions.adjacency_bitmasks(graph)
+    expected = networkx_clique_number(graph)
+    assert cliques.clique_number(adjacency, nodes) == expected
+    for limit in range(1, expected + 2):
+        assert cliques.clique_number(adjacency, nodes,
+                                     limit) == min(expected, limit)
+
+
+@pytest.mark.parametrize('graph', random_graphs())
+def test_ramsey_number(graph):
+    expected = max(networkx_clique_number(graph),
+                   networkx_clique_number(networkx.complement(graph)))
+    assert reward_functions.ramsey_number(graph) == expected
+    for k_clique in range(1, expected + 2):
+        assert reward_functions.ramsey_number(graph, k_clique) == min(
+            expected, k_clique)
+
+
+@pytest.mark.parametrize('graph', random_graphs())
+def test_dual_based_reward(graph):
+    assert reward_functions.dual_based_reward(graph) == (
+        networkx_clique_number(graph) -
+        networkx_clique_number(networkx.complement(graph)))
+
+
+@pytest.mark.parametrize('graph', random_graphs())
+def test_clique_number_through_edge(graph):
+    adjacency, _ = reward_functions.adjacency_bitmasks(graph)
+    for node_u, node_v in graph.edges:
+        expected = max(
+            len(clique)
+            for clique in networkx.find_cliques(graph)
+            if node_u in clique and node_v in clique)
+        assert cliques.clique_number_through_edge(adjacency, node_u,
+                                                  node_v) == expected
+
+
+def test_empty_graph():
+    assert cliques.clique_number([], 0) == 0
+    assert cliques.ramsey_number([0, 0, 0], 0b111) == 3
+
+
+@pytest.mark.parametrize('graph', random_graphs())
+def test_find_clique(graph):
+    adjacency, nodes = reward_functions.adjacency_bitmasks(graph)
+    expected = networkx_clique_number(graph)
+    for size in range(expected + 2):
+        clique = cliques.find_clique(adjacency, nodes, size)
+        assert (clique is not None) == (size <= expected)
+        assert cliques.has_clique(adjacency, nodes, size) == (size <= expected)
+        if clique is not None:
+            assert len(set(clique)) == size
+            assert all(
+                graph.has_edge(node_u, node_v)
+                for node_u, node_v in itertools.combinations(clique, 2))
+
+
+def test_has_k_clique_witness():
+    graph = networkx.Graph(itertools.combinations('abcd', 2))
+    graph.add_edge('d', 'e')
+    assert reward_functions.has_k_clique(graph, 4)
+    assert not reward_functions.has_k_clique(graph, 5)
+    assert sorted(reward_functions.has_k_clique(
+        graph, 4, return_witness=True)) == ['a', 'b', 'c', 'd']
+    assert reward_functions.has_k_clique(graph, 5, return_witness=True) is None
+    assert reward_functions.clique_number_capped(graph, 3) == 3
+    assert reward_functions.clique_number_capped(graph, 6) == 4
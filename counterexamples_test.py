@@ -0,0 +1,69 @@
+"""Tests of the counterexample store."""
+
+import numpy as np
+
+from ramsey import counterexamples
+from ramsey import encoders
+
+
+def cycle_colouring(order):
+    """Colouring of K5 whose colour 1 edges are the 5-cycle through order."""
+    encoder = encoders.EdgeEncoder(5)
+    colouring = np.zeros(encoder.n_edges, dtype=np.int8)
+    for node_u, node_v in zip(order, order[1:] + order[:1]):
+        colouring[encoder.edge_index(node_u, node_v)] = 1
+    return colouring
+
+
+def test_round_trip(tmp_path):
+    file_name = str(tmp_path / 'counterexamples.bin')
+    store = counterexamples.CounterexampleStore(file_name)
+    colourings = [cycle_colouring([0, 1, 2, 3, 4]), np.ones(21, dtype=np.int8)]
+    assert store.add(5, 3, colourings[0])
+    assert store.add(7, 8, colourings[1])
+    store.close()
+
+    stored = list(counterexamples.iter_counterexamples(file_name))
+    assert [(c.n_nodes, c.k_clique) for c in stored] == [(5, 3), (7, 8)]
+    for counterexample, colouring in zip(stored, colourings):
+        np.testing.assert_array_equal(counterexample.colouring, colouring)
+
+
+def test_deduplicates_isomorphic_colourings(tmp_path):
+    file_name = str(tmp_path / 'counterexamples.bin')
+    store = counterexamples.CounterexampleStore(file_name)
+    assert store.add(5, 3, cycle_colouring([0, 1, 2, 3, 4]))
+    assert not store.add(5, 3, cycle_colouring([2, 4, 1, 0, 3]))
+    # The same colouring is a different record for another k_clique.
+    assert store.add(5, 4, cycle_colouring([0, 1, 2, 3, 4]))
+
+    # Another store on the same file sees the records of the first one.
+    other_store = counterexamples.CounterexampleStore(file_name)
+    assert not other_store.add(5, 3, cycle_colouring([1, 3, 0, 2, 4]))
+    assert other_store.n_counterexamples == 2
+    # The 5-cycle is isomorphic to its complement.
+    assert not store.add(5, 3, 1 - cycle_colouring([0, 1, 2, 3, 4]))
+    store.close()
+    other_store.close()
+    assert len(list(counterexamples.iter_counterexamples(file_name))) == 2
+
+
+def test_missing_file(tmp_path):
+    assert not list(
+        counterexamples.iter_counterexamples(str(tmp_path / 'missing.bin')))
+
+
+def test_partial_record_is_not_read(tmp_path):
+    file_name = str(tmp_path / 'counterexamples.bin')
+    store = counterexamples.CounterexampleStore(file_name)
+    assert store.add(5, 3, cycle_colouring([0, 1, 2, 3, 4]))
+    store.close()
+    # A record of a writer that crashed after its header and first byte.
+    with open(file_name, 'ab') as record_file:
+        record_file.write(bytes([7, 3, 255]))
+    assert len(list(counterexamples.iter_counterexamples(file_name))) == 1
+
+    store = counterexamples.CounterexampleStore(file_name)
+    assert not store.add(5, 3, cycle_colouring([0, 1, 2, 3, 4]))
+    assert store.n_counterexamples == 1
+    store.close()
@@ -0,0 +1,82 @@
+"""Tests of the curriculum over the game sizes."""
+
+import numpy as np
+import pytest
+
+from ramsey import encoders
+
+pytest.importorskip('stable_baselines3')
+
+# pylint: disable=wrong-import-position
+from ramsey import curriculum
+
+
+def padded_action(max_nodes, node_u, node_v):
+    return encoders.edge_index(max_nodes, node_u, node_v)
+
+
+def test_pads_multiplayer_games():
+    env = curriculum.CurriculumEnv(7, 5, 3)
+    max_edges = env.max_edges
+    observation = env.reset()
+    assert observation.shape == (2 * max_edges,)
+    masks = env.action_masks()
+    assert masks.sum() == 10
+    assert not masks[padded_action(7, 0, 6)]
+
+    # The two players colour a 5-cycle and its complement.
+    cycle = [(0, 1), (1, 2), (2, 3), (3, 4), (0, 4)]
+    complement = [(0, 2), (2, 4), (1, 4), (1, 3), (0, 3)]
+    for (node_u, node_v), (other_u, other_v) in zip(cycle, complement):
+        observation, _, done, _ = env.step(padded_action(7, node_u, node_v))
+        assert observation[padded_action(7, node_u, node_v)] == 1
+        assert not done
+        observation, _, done, info = env.step(padded_action(
+            7, other_u, other_v))
+        assert observation[max_edges + padded_action(7, other_u, other_v)] == 1
+    assert done
+    assert info['is_success']
+    assert info['task'] == (5, 3)
+
+
+def test_padding_actions_end_the_game():
+    env = curriculum.CurriculumEnv(7, 5, 3)
+    env.reset()
+    _, reward, done, info = env.step(padded_action(7, 0, 6))
+    assert done
+    assert reward < 0
+    assert not info['is_success']
+
+
+def test_set_task():
+    env = curriculum.CurriculumEnv(7, 5, 3, environment_id='RamseyGame-v0')
+    env.set_task(7, 4)
+    assert env.n_nodes == 5
+    observation = env.reset()
+    assert observation.shape == (env.max_edges,)
+    assert (env.n_nodes, env.k_clique) == (7, 4)
+    observation, _, _, _ = env.step(np.ones(env.max_edges, dtype=int))
+    assert observation.all()
+
+
+def test_scheduler():
+    stages = curriculum.parse_stages(['5:3', '6:3'])
+    scheduler = curriculum.CurriculumScheduler(stages, threshold=0.5, window=4)
+    assert scheduler.task == (5, 3)
+    assert not any(scheduler.record(success) for success in [0, 0, 0, 1])
+    assert scheduler.record(True)
+    assert scheduler.task == (6, 3)
+    assert scheduler.success_rate() == 0.0
+    for _ in range(10):
+        assert not scheduler.record(True)
+
+
+@pytest.mark.parametrize('reward_mode', ['clique', 'count', 'count_delta'])
+def test_padding_penalty(reward_mode):
+    env = curriculum.CurriculumEnv(7, 5, 3, reward_mode=reward_mode)
+    env.reset()
+    env.step(padded_action(7, 0, 1))
+    expected = env.env.invalid_action_reward()
+    _, reward, done, _ = env.step(padded_action(7, 0, 6))
+    assert done
+    assert reward == expected
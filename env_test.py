@@ -0,0 +1,78 @@
+"""Tests of the Ramsey game environments."""
+
+import numpy as np
+import pytest
+
+from ramsey.envs import ramsey_env_multiplayer
+
+
+@pytest.mark.parametrize('n_nodes,k_clique', [(5, 3), (6, 3)])
+def test_masked_games_end(n_nodes, k_clique):
+    env = ramsey_env_multiplayer.RamseyGameMultiplayer(n_nodes, k_clique)
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        env.reset()
+        done = False
+        n_steps = 0
+        while not done:
+            masks = env.action_masks()
+            assert masks.any()
+            _, _, done, _ = env.step(rng.choice(np.flatnonzero(masks)))
+            n_steps += 1
+        assert n_steps <= env.n_edges
+
+
+def test_masked_vec_games_end():
+    pytest.importorskip('stable_baselines3')
+    # pylint: disable=import-outside-toplevel
+    from ramsey.envs import ramsey_vec_env
+    env = ramsey_vec_env.RamseyVecEnv(64, 5, 3)
+    env.reset()
+    rng = np.random.default_rng(0)
+    n_dones = 0
+    for _ in range(200):
+        masks = env.action_masks()
+        assert masks.any(axis=1).all()
+        actions = [rng.choice(np.flatnonzero(mask)) for mask in masks]
+        _, _, dones, _ = env.step(actions)
+        n_dones += dones.sum()
+    assert n_dones >= 200 * 64 // env.n_edges
+
+
+@pytest.mark.parametrize('reward_mode', ['clique', 'count', 'count_delta'])
+def test_invalid_action_reward(reward_mode):
+    env = ramsey_env_multiplayer.RamseyGameMultiplayer(6,
+                                                       4,
+                                                       reward_mode=reward_mode)
+    env.reset()
+    for action in [0, 1, 5, 2]:
+        env.step(action)
+    expected = env.invalid_action_reward()
+    _, reward, done, _ = env.step(5)
+    assert done
+    assert reward == expected
+
+
+def test_vec_env_indices():
+    pytest.importorskip('stable_baselines3')
+    # pylint: disable=import-outside-toplevel
+    from ramsey.envs import ramsey_vec_env
+    env = ramsey_vec_env.RamseyVecEnv(4, 5, 3)
+    env.reset()
+    env.step([0, 1, 2, 3])
+    assert env.get_attr('current_player', [0, 2]) == [2, 2]
+    assert env.get_attr('n_nodes', [1, 3]) == [5, 5]
+    env.set_attr('current_player', 1, [1])
+    assert env.get_attr('current_player') == [2, 1, 2, 2]
+    with pytest.raises(ValueError, match='shared'):
+        env.set_attr('k_clique', 4, [0])
+    env.set_attr('k_clique', 4)
+    assert env.k_clique == 4
+
+    masks = env.env_method('action_masks', indices=[3])
+    assert len(masks) == 1
+    assert not masks[0][3] and masks[0][:3].all()
+    with pytest.raises(ValueError, match='shared'):
+        env.env_method('reset', indices=[0])
+    assert env.seed(7) == [7, 8, 9, 10]
+    assert env.env_is_wrapped(object, [0, 1]) == [False, False]
@@ -0,0 +1,72 @@
+"""Tests of the exact solver of the two player game."""
+
+import functools
+import itertools
+import random
+
+import pytest
+
+from ramsey import game_solver
+
+
+def brute_force_solver(n_nodes, k_clique, misere):
+    """Minimax without pruning nor symmetries.
+
+    Returns:
+        The functions giving the value of a position, and of a move in a
+        position, for the mover. Positions are given by the frozensets of the
+        edges of the mover and of the other player.
+    """
+    edges = list(itertools.combinations(range(n_nodes), 2))
+    k_cliques = [
+        set(itertools.combinations(nodes, 2))
+        for nodes in itertools.combinations(range(n_nodes), k_clique)
+    ]
+
+    def move_value(own, other, edge):
+        claimed = own | {edge}
+        if any(clique <= claimed for clique in k_cliques):
+            return game_solver.LOSS if misere else game_solver.WIN
+        return -solve(other, claimed)
+
+    @functools.lru_cache(maxsize=None)
+    def solve(own, other):
+        free_edges = [edge for edge in edges if edge not in own | other]
+        if not free_edges:
+            return game_solver.DRAW
+        return max(move_value(own, other, edge) for edge in free_edges)
+
+    return solve, move_value
+
+
+@pytest.mark.parametrize('misere', [False, True])
+@pytest.mark.parametrize('n_nodes,k_clique', [(4, 3), (5, 3), (4, 4)])
+@pytest.mark.parametrize('symmetry', [False, True])
+def test_empty_board(n_nodes, k_clique, misere, symmetry):
+    solver = game_solver.GameSolver(n_nodes, k_clique, misere, symmetry)
+    solve, _ = brute_force_solver(n_nodes, k_clique, misere)
+    assert solver.solve() == solve(frozenset(), frozenset())
+
+
+@pytest.mark.parametrize('misere', [False, True])
+def test_random_positions(misere):
+    rng = random.Random(0)
+    solver = game_solver.GameSolver(5, 3, misere)
+    solve, move_value = brute_force_solver(5, 3, misere)
+    edges = list(itertools.combinations(range(5), 2))
+    for _ in range(20):
+        rng.shuffle(edges)
+        n_moves = rng.randint(0, 4)
+        first, second = edges[:n_moves:2], edges[1:n_moves:2]
+        position = solver.position((first, second))
+        if len(first) == len(second):
+            own, other = frozenset(first), frozenset(second)
+        else:
+            own, other = frozenset(second), frozenset(first)
+        assert solver.solve(position) == solve(own, other)
+
+        values = solver.move_values(position)
+        assert len(values) == len(edges) - n_moves
+        for index, value in values.items():
+            assert value == move_value(own, other, solver.edges[index])
+        assert values[solver.best_move(position)] == max(values.values())
@@ -0,0 +1,17 @@
+"""Checks that the environments import lazily and within a loose budget."""
+
+from ramsey import benchmark
+
+# Loaded test runners time imports unreliably, so the test only catches
+# regressions well over the budget, which python -m ramsey.benchmark reports.
+CI_IMPORT_TIME_BUDGET = 5 * benchmark.IMPORT_TIME_BUDGET
+
+
+def test_lazy_imports():
+    result = benchmark.benchmark_import('ramsey.envs', n_runs=1)
+    assert not result['lazy_modules_imported']
+
+
+def test_import_time():
+    result = benchmark.benchmark_import('ramsey.envs', n_runs=3)
+    assert result['seconds'] <= CI_IMPORT_TIME_BUDGET
@@ -0,0 +1,39 @@
+"""Tests of the local search for counterexamples."""
+
+import numpy as np
+import pytest
+
+from ramsey import local_search
+
+
+def test_deltas_match_recount():
+    counterexample_search = local_search.LocalSearch(8, 4, seed=0)
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        edge = rng.integers(counterexample_search.n_edges)
+        delta = counterexample_search.deltas[edge]
+        n_monochromatic = counterexample_search.n_monochromatic
+        counterexample_search.flip(edge)
+        assert counterexample_search.n_monochromatic == n_monochromatic + delta
+        np.testing.assert_array_equal(counterexample_search.deltas,
+                                      counterexample_search.flip_deltas())
+    ones = counterexample_search.colours[
+        counterexample_search.clique_edges].sum(axis=1)
+    assert counterexample_search.n_monochromatic == np.sum((ones == 0) | (
+        ones == counterexample_search.n_clique_edges))
+
+
+@pytest.mark.parametrize('mode', ['anneal', 'tabu', 'restart'])
+@pytest.mark.parametrize('n_nodes,k_clique', [(5, 3), (8, 4), (17, 4)])
+def test_finds_counterexample(mode, n_nodes, k_clique):
+    counterexample_search = local_search.LocalSearch(n_nodes, k_clique, seed=0)
+    colouring = counterexample_search.run(mode)
+    assert colouring is not None
+    ones = colouring[counterexample_search.clique_edges].sum(axis=1)
+    assert np.all((ones > 0) & (ones < counterexample_search.n_clique_edges))
+
+
+def test_no_counterexample():
+    counterexample_search = local_search.LocalSearch(6, 3, seed=0)
+    assert counterexample_search.run('tabu', max_flips=1000) is None
+    assert counterexample_search.best_n_monochromatic > 0
@@ -0,0 +1,64 @@
+"""Tests of the Monte Carlo Tree Search."""
+
+import numpy as np
+
+from ramsey import encoders
+from ramsey import mcts
+
+
+def test_game_state():
+    state = mcts.GameState(4, 3)
+    for node_u, node_v in [(0, 1), (2, 3), (0, 2), (1, 3)]:
+        state.play(encoders.edge_index(4, node_u, node_v))
+    assert not state.is_terminal()
+    assert state.player == 1
+    assert len(state.legal_moves()) == 2
+    observation = state.observation().reshape(2, -1)
+    assert observation.sum(axis=1).tolist() == [2, 2]
+
+    copy = state.copy()
+    copy.play(encoders.edge_index(4, 1, 2))
+    assert copy.winner == 1
+    assert copy.value() == -1.0
+    assert state.winner is None
+    assert len(state.legal_moves()) == 2
+
+
+def test_misere_game_state():
+    state = mcts.GameState(4, 3, misere=True)
+    for node_u, node_v in [(0, 1), (2, 3), (0, 2), (1, 3), (1, 2)]:
+        state.play(encoders.edge_index(4, node_u, node_v))
+    assert state.winner == 2
+
+
+def test_finds_winning_move():
+    state = mcts.GameState(5, 3)
+    for node_u, node_v in [(0, 1), (2, 3), (0, 2), (3, 4)]:
+        state.play(encoders.edge_index(5, node_u, node_v))
+    search = mcts.MCTS(state, batch_size=4, seed=0)
+    counts = search.search(200)
+    # The simulations of the first batch all stop at the unexpanded root.
+    assert counts.sum() == 200 - 4
+    assert search.choose_move() == encoders.edge_index(5, 1, 2)
+
+
+def test_play_game():
+    game = mcts.play_game(5, 3, n_simulations=20, temperature_moves=2, seed=0)
+    state = mcts.GameState(5, 3)
+    for move, visits in zip(game['moves'], game['visits']):
+        assert visits.sum() > 0
+        assert set(np.flatnonzero(visits)) <= set(state.legal_moves())
+        state.play(move)
+    assert state.winner == game['winner']
+
+
+def test_self_play():
+    games = mcts.self_play(3,
+                           n_workers=2,
+                           n_nodes=4,
+                           k_clique=3,
+                           n_simulations=10)
+    assert len(games) == 3
+    game = mcts.play_game(4, 3, n_simulations=10, seed=1)
+    assert games[1]['moves'] == game['moves']
+    assert games[1]['winner'] == game['winner']
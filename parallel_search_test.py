@@ -0,0 +1,35 @@
+"""Tests of the parallel counterexample search."""
+
+import itertools
+
+import pytest
+
+from ramsey import encoders
+from ramsey import parallel_search
+from ramsey import search
+
+
+def is_counterexample(colouring, n_nodes, k_clique):
+    for nodes in itertools.combinations(range(n_nodes), k_clique):
+        colours = {
+            colouring[encoders.edge_index(n_nodes, node_u, node_v)]
+            for node_u, node_v in itertools.combinations(nodes, 2)
+        }
+        if len(colours) == 1:
+            return False
+    return True
+
+
+@pytest.mark.parametrize('n_nodes,k_clique', [(5, 3), (6, 3), (6, 4)])
+def test_parallel_matches_serial(n_nodes, k_clique):
+    serial = search.CounterexampleSearch(n_nodes, k_clique)
+    serial_colouring = serial.run()
+    parallel = parallel_search.ParallelSearch(n_nodes,
+                                              k_clique,
+                                              n_workers=2,
+                                              chunk_nodes=4)
+    parallel_colouring = parallel.run()
+    assert (parallel_colouring is None) == (serial_colouring is None)
+    assert parallel.exhausted == serial.exhausted
+    if parallel_colouring is not None:
+        assert is_counterexample(parallel_colouring, n_nodes, k_clique)
@@ -0,0 +1,287 @@
+"""Throughput benchmarks for the Ramsey environments.
+
+Measures, for RamseyGame-v0 and RamseyGame-v1 over a grid of (n_nodes,
+k_clique) and action policies, the steps per second, the cost of a reset, the
+latency of the reward computation and the peak resident memory.
+reward_functions.ramsey_number and encoders.one_hot_encode are also
+measured in isolation, as well as the time to import the environments in a
+new interpreter, which every worker process pays. The results are written as
+JSON, so that runs can be compared to catch regressions in the hot path.
+
+The peak memory of a process never decreases, so run_benchmarks() runs every
+benchmark in a new process, whose peak is the one of the benchmark.
+
+Policies:
+- 'random': uniformly random actions. In RamseyGame-v1 this often picks an
+edge that is already placed, which ends the game early.
+- 'adversarial': the actions that make every step the most expensive. In
+RamseyGame-v0 these are circulant graphs with half of the distances, which
+have few and small cliques in both the graph and its dual, so the clique
+search cannot stop early. In RamseyGame-v1 only free edges are picked, so
+games go on until the board is full or a player wins.
+
+The functions of this module are also used by benchmark_test.py, which runs
+them with pytest-benchmark.
+"""
+
+import concurrent.futures
+import json
+import multiprocessing
+import resource
+import subprocess
+import sys
+import time
+
+from absl import app
+from absl import flags
+from absl import logging
+
+import networkx
+import numpy as np
+
+from ramsey import encoders
+from ramsey import envs
+from ramsey import reward_functions
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_list('n_nodes', ['6', '8', '10', '13', '17'],
+                  'Numbers of nodes of the benchmarked environments.')
+
+flags.DEFINE_list('k_clique_number', ['3', '4'],
+                  'Sizes of the cliques of the benchmarked environments.')
+
+flags.DEFINE_list('policies', ['random', 'adversarial'],
+                  'Action policies to benchmark.')
+
+flags.DEFINE_integer('n_steps',
+                     2000,
+                     'Number of steps per benchmarked environment.',
+                     lower_bound=1)
+
+flags.DEFINE_string('output_file', None,
+                    'JSON file for the results. Defaults to stdout.')
+
+ENVIRONMENTS = {
+    'RamseyGame-v0': envs.RamseyGame,
+    'RamseyGame-v1': envs.RamseyGameMultiplayer,
+}
+
+# Seconds allowed to import the environments in a new interpreter, and the
+# slow modules they should not import until they render.
+IMPORT_TIME_BUDGET = 1.0
+LAZY_MODULES = ('matplotlib', 'networkx')
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+lazy_modules = [name for name in {lazy_modules} if name in sys.modules]
+print(json.dumps([elapsed, lazy_modules]))
+"""
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process since it started, in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def circulant_action(encoder, rng):
+    """Edges of a random circulant graph with half of the distances."""
+    n_nodes = encoder.n_nodes
+    distances = np.arange(1, n_nodes // 2 + 1)
+    chosen = rng.permutation(distances)[:max(1, len(distances) // 2)]
+    connected = np.zeros(n_nodes, dtype=bool)
+    connected[chosen] = True
+    connected[n_nodes - chosen] = True
+    return connected[(encoder.cols - encoder.rows) % n_nodes].astype(np.int8)
+
+
+class Policy:
+    """Chooses the actions of a benchmarked environment."""
+
+    def __init__(self, env, name, seed=0):
+        """Inits the policy for the given environment."""
+        self.env = env
+        self.name = name
+        self.rng = np.random.default_rng(seed)
+        self.encoder = encoders.EdgeEncoder(env.n_nodes)
+        self.multiplayer = isinstance(env, envs.RamseyGameMultiplayer)
+
+    def __call__(self):
+        """Returns the next action."""
+        if self.multiplayer:
+            if self.name == 'adversarial':
+                free_edges = np.flatnonzero(self.env.action_masks())
+                if len(free_edges):
+                    return int(self.rng.choice(free_edges))
+            return int(self.rng.integers(self.env.n_edges))
+        if self.name == 'adversarial':
+            return circulant_action(self.encoder, self.rng)
+        return self.rng.integers(0, 2, self.env.n_edges, dtype=np.int8)
+
+
+def benchmark_environment(env_id, n_nodes, k_clique, policy, n_steps, seed=0):
+    """Steps an environment n_steps times.
+
+    Returns:
+        A dictionary with the parameters and the measurements.
+    """
+    env = ENVIRONMENTS[env_id](n_nodes, k_clique)
+    choose_action = Policy(env, policy, seed)
+
+    reward_seconds = []
+    get_reward = env._get_reward  # pylint: disable=protected-access
+
+    def timed_get_reward():
+        start = time.perf_counter_ns()
+        reward = get_reward()
+        reward_seconds.append(time.perf_counter_ns() - start)
+        return reward
+
+    env._get_reward = timed_get_reward  # pylint: disable=protected-access
+
+    reset_seconds = []
+    n_episodes = 0
+    start = time.perf_counter()
+    reset_start = time.perf_counter_ns()
+    env.reset()
+    reset_seconds.append(time.perf_counter_ns() - reset_start)
+    for _ in range(n_steps):
+        _, _, done, _ = env.step(choose_action())
+        if done:
+            n_episodes += 1
+            reset_start = time.perf_counter_ns()
+            env.reset()
+            reset_seconds.append(time.perf_counter_ns() - reset_start)
+    elapsed = time.perf_counter() - start
+    env.close()
+
+    return {
+        'benchmark': 'environment',
+        'env_id': env_id,
+        'n_nodes': n_nodes,
+        'k_clique': k_clique,
+        'policy': policy,
+        'n_steps': n_steps,
+        'n_episodes': n_episodes,
+        'steps_per_second': n_steps / elapsed,
+        'reset_seconds': np.mean(reset_seconds) * 1e-9,
+        'reward_seconds': np.mean(reward_seconds) * 1e-9,
+        'reward_seconds_p99': np.percentile(reward_seconds, 99) * 1e-9,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def random_graphs(n_nodes, n_graphs, seed=0):
+    """Random graphs with n_nodes and edge probability 1/2."""
+    rng = np.random.default_rng(seed)
+    encoder = encoders.EdgeEncoder(n_nodes)
+    graphs = []
+    for _ in range(n_graphs):
+        graph = networkx.empty_graph(n_nodes)
+        graph.add_edges_from(
+            encoder.decode(rng.integers(0, 2, encoder.n_edges)).tolist())
+        graphs.append(graph)
+    return graphs
+
+
+def benchmark_function(name, function, inputs, n_nodes):
+    """Times a function over a list of inputs."""
+    start = time.perf_counter()
+    for function_input in inputs:
+        function(function_input)
+    elapsed = time.perf_counter() - start
+    return {
+        'benchmark': name,
+        'n_nodes': n_nodes,
+        'n_calls': len(inputs),
+        'seconds_per_call': elapsed / len(inputs),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def benchmark_ramsey_number(n_nodes, n_graphs=100, seed=0):
+    """Times reward_functions.ramsey_number on random graphs."""
+    return benchmark_function('ramsey_number', reward_functions.ramsey_number,
+                              random_graphs(n_nodes, n_graphs, seed), n_nodes)
+
+
+def benchmark_one_hot_encode(n_nodes, n_graphs=100, seed=0):
+    """Times encoders.one_hot_encode on the edges of random graphs."""
+    dictionary = encoders.graph_hot_encoder_dict(n_nodes)
+    return benchmark_function(
+        'one_hot_encode',
+        lambda graph: encoders.one_hot_encode(dictionary, graph.edges),
+        random_graphs(n_nodes, n_graphs, seed), n_nodes)
+
+
+def benchmark_import(module='ramsey.envs', n_runs=5):
+    """Times importing a module in new interpreters.
+
+    Returns:
+        The fastest of n_runs imports, which is the least disturbed by the
+        rest of the machine, and the LAZY_MODULES the import loaded.
+    """
+    script = _IMPORT_SCRIPT.format(module=module, lazy_modules=LAZY_MODULES)
+    times = []
+    for _ in range(n_runs):
+        output = subprocess.run([sys.executable, '-c', script],
+                                check=True,
+                                capture_output=True,
+                                text=True).stdout
+        elapsed, lazy_modules = json.loads(output.splitlines()[-1])
+        times.append(elapsed)
+    return {
+        'benchmark': 'import',
+        'module': module,
+        'seconds': min(times),
+        'budget_seconds': IMPORT_TIME_BUDGET,
+        'lazy_modules_imported': lazy_modules,
+    }
+
+
+def run_isolated(function, *args):
+    """Runs a benchmark in a new process, returning its result."""
+    context = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(1,
+                                                mp_context=context) as executor:
+        return executor.submit(function, *args).result()
+
+
+def run_benchmarks(n_nodes_list, k_clique_list, policies, n_steps):
+    """Runs every benchmark of the grid, returning a list of results."""
+    results = [benchmark_import()]
+    for n_nodes in n_nodes_list:
+        results.append(run_isolated(benchmark_ramsey_number, n_nodes))
+        results.append(run_isolated(benchmark_one_hot_encode, n_nodes))
+        for k_clique in k_clique_list:
+            if k_clique > n_nodes:
+                continue
+            for env_id in ENVIRONMENTS:
+                for policy in policies:
+                    result = run_isolated(benchmark_environment, env_id,
+                                          n_nodes, k_clique, policy, n_steps)
+                    logging.info('%s n_nodes=%s k_clique=%s %s: %.0f steps/s',
+                                 env_id, n_nodes, k_clique, policy,
+                                 result['steps_per_second'])
+                    results.append(result)
+    return results
+
+
+def main(_):
+    """Runs the benchmarks and writes the results as JSON."""
+    results = run_benchmarks([int(n) for n in FLAGS.n_nodes],
+                             [int(k) for k in FLAGS.k_clique_number],
+                             FLAGS.policies, FLAGS.n_steps)
+    if FLAGS.output_file:
+        with open(FLAGS.output_file, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    logging.set_verbosity(logging.INFO)
+    app.run(main)
@@ -0,0 +1,100 @@
+"""Stable Baselines3 callbacks of the Ramsey games."""
+
+import collections
+import os
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+from ramsey import profiling
+from ramsey import tournament
+
+
+class ProfilingCallback(BaseCallback):
+    """Logs the step profiles of all the games, see ramsey.profiling.
+
+    The profiles in the infos of every game are summed over each rollout, and
+    logged per step of a game at the end of the rollout.
+    """
+
+    def __init__(self, verbose=0):
+        super().__init__(verbose)
+        self.total = collections.Counter()
+        self.n_steps = 0
+
+    def _on_step(self):
+        self.total.update(profiling.aggregate(self.locals['infos']))
+        self.n_steps += len(self.locals['infos'])
+        return True
+
+    def _on_rollout_end(self):
+        if not self.n_steps:
+            return
+        for name, value in sorted(self.total.items()):
+            self.logger.record('profile/' + name, value / self.n_steps)
+        self.total.clear()
+        self.n_steps = 0
+
+
+class TournamentCallback(BaseCallback):
+    """Rates checkpoints of the model in tournaments, see ramsey.tournament.
+
+    Every eval_freq timesteps, the model is saved to directory and plays
+    n_games of RamseyGameMultiplayer against every opponent and the previous
+    checkpoint. The Elo ratings of all the checkpoints are kept in
+    directory/ratings.json.
+    """
+
+    def __init__(self,
+                 directory,
+                 n_nodes,
+                 k_clique,
+                 eval_freq,
+                 n_games=200,
+                 opponents=('random', 'greedy'),
+                 n_workers=None,
+                 verbose=0):
+        super().__init__(verbose)
+        self.directory = directory
+        self.n_nodes = n_nodes
+        self.k_clique = k_clique
+        self.eval_freq = eval_freq
+        self.n_games = n_games
+        self.opponents = list(opponents)
+        self.n_workers = n_workers
+        os.makedirs(directory, exist_ok=True)
+        self.ratings_file = os.path.join(directory, 'ratings.json')
+        self.ratings = tournament.EloRatings.load(self.ratings_file)
+        self.previous = None
+        self.last_timesteps = 0
+
+    def _on_step(self):
+        if self.num_timesteps - self.last_timesteps < self.eval_freq:
+            return True
+        self.last_timesteps = self.num_timesteps
+        checkpoint = os.path.join(self.directory,
+                                  f'checkpoint_{self.num_timesteps}.zip')
+        self.model.save(checkpoint)
+        opponents = self.opponents + ([self.previous] if self.previous else [])
+        # The workers are started by a forkserver, as forking a process
+        # running torch can deadlock.
+        results = tournament.run_tournament(
+            [checkpoint] + opponents,
+            self.n_games,
+            self.n_nodes,
+            self.k_clique,
+            n_workers=self.n_workers,
+            ratings=self.ratings,
+            pairs=[(checkpoint, opponent) for opponent in opponents],
+            algorithm=type(self.model),
+            start_method='forkserver')
+        self.ratings.save(self.ratings_file)
+        self.previous = checkpoint
+        result = results['agents'][checkpoint]
+        for name in ('elo', 'win_rate', 'draw_rate'):
+            self.logger.record('tournament/' + name, result[name])
+        self.logger.record('tournament/mean_game_length',
+                           results['mean_game_length'])
+        if self.verbose:
+            print(f'Checkpoint {checkpoint}: Elo {result["elo"]:.0f}, '
+                  f'{100 * result["win_rate"]:.1f}% wins.')
+        return True
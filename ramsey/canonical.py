@@ -0,0 +1,216 @@
+"""Canonical labelling of edge-coloured graphs.
+
+Two graphs are isomorphic when they have the same canonical form, which makes
+isomorphism classes usable as dictionary keys (e.g. to cache rewards).
+
+A graph with several edge colours is given by one list of adjacency bitmasks
+per colour, see ramsey.cliques. The canonical labelling is found with the
+usual individualisation-refinement search:
+- The nodes are partitioned into cells ordered by isomorphism invariants, and
+the partition is refined until the nodes of every cell have the same number
+of neighbours of every colour in every cell.
+- While a cell has more than one node, each of its nodes is in turn put in a
+cell of its own, and the partition is refined again.
+- Every discrete partition is a labelling of the nodes, and the canonical one
+gives the smallest certificate, the adjacency relabelled and packed as
+integers.
+Interchangeable nodes (twins, with the same neighbours up to each other) give
+the same certificates, so only one of them is individualised.
+
+The search can be bounded to a number of discrete partitions. A bounded search
+always gives the same form to the same graph, and different forms to graphs
+that are not isomorphic, but may give different forms to isomorphic graphs.
+
+canonical_colourings() labels batches of 2-colourings of the complete graph,
+given as the edge vectors of the environments.
+"""
+
+import math
+
+import numpy as np
+
+from ramsey import encoders
+
+
+def _cell_mask(cell):
+    """Bitmask of the nodes of a cell."""
+    mask = 0
+    for node in cell:
+        mask |= 1 << node
+    return mask
+
+
+def _signature(adjacencies, masks, node):
+    """Number of neighbours of every colour of a node in every cell."""
+    return tuple(
+        bin(adjacency[node] & mask).count('1')
+        for adjacency in adjacencies
+        for mask in masks)
+
+
+def refine(adjacencies, cells):
+    """Refines an ordered partition of the nodes until it is equitable.
+
+    Cells are split by the number of neighbours of every colour that their
+    nodes have in every cell, and the new cells are ordered by these numbers,
+    so that the result only depends on the graph up to isomorphism.
+
+    Args:
+        adjacencies: Adjacency bitmasks of every edge colour.
+        cells: Ordered partition of the nodes, as a list of lists.
+    """
+    while True:
+        masks = [_cell_mask(cell) for cell in cells]
+        refined = []
+        for cell in cells:
+            if len(cell) == 1:
+                refined.append(cell)
+                continue
+            signatures = {
+                node: _signature(adjacencies, masks, node) for node in cell
+            }
+            for signature in sorted(set(signatures.values())):
+                refined.append(
+                    [node for node in cell if signatures[node] == signature])
+        if len(refined) == len(cells):
+            return refined
+        cells = refined
+
+
+def _twins(adjacencies, node_u, node_v):
+    """Whether swapping two nodes is an automorphism of the graph."""
+    mask = ~((1 << node_u) | (1 << node_v))
+    return all(adjacency[node_u] & mask == adjacency[node_v] & mask
+               for adjacency in adjacencies)
+
+
+def certificate(adjacencies, labelling):
+    """Packs the adjacency of a graph relabelled by labelling.
+
+    Args:
+        adjacencies: Adjacency bitmasks of every edge colour.
+        labelling: The node with every new label.
+
+    Returns:
+        A tuple with one integer per colour, whose bit i is set when the i-th
+        edge of encoders.graph_hot_encoder_dict has that colour.
+    """
+    n_nodes = len(labelling)
+    packed = []
+    for adjacency in adjacencies:
+        value = 0
+        for label_u, node_u in enumerate(labelling):
+            neighbours = adjacency[node_u]
+            for label_v in range(label_u + 1, n_nodes):
+                if neighbours >> labelling[label_v] & 1:
+                    value |= 1 << encoders.edge_index(n_nodes, label_u, label_v)
+        packed.append(value)
+    return tuple(packed)
+
+
+def canonical_labelling(adjacencies, n_nodes, max_leaves=None):
+    """Canonical labelling of an edge-coloured graph.
+
+    Args:
+        adjacencies: Adjacency bitmasks of every edge colour.
+        n_nodes: Number of nodes of the graph.
+        max_leaves: If set, the search stops after this number of discrete
+            partitions, see the module docstring.
+
+    Returns:
+        The canonical certificate, see certificate(), and the labelling that
+        gives it, as the list of the node with every new label.
+    """
+    best = [None, None]
+    n_leaves = [0]
+
+    def search(cells):
+        cells = refine(adjacencies, cells)
+        for index, cell in enumerate(cells):
+            if len(cell) > 1:
+                break
+        else:
+            n_leaves[0] += 1
+            labelling = [cell[0] for cell in cells]
+            packed = certificate(adjacencies, labelling)
+            if best[0] is None or packed < best[0]:
+                best[0] = packed
+                best[1] = labelling
+            return
+
+        tried = []
+        for node in cell:
+            if max_leaves is not None and n_leaves[0] >= max_leaves:
+                return
+            if any(_twins(adjacencies, node, other) for other in tried):
+                continue
+            tried.append(node)
+            search(cells[:index] +
+                   [[node], [other for other in cell if other != node]] +
+                   cells[index + 1:])
+
+    if n_nodes == 0:
+        return tuple(0 for _ in adjacencies), []
+    search([list(range(n_nodes))])
+    return best[0], best[1]
+
+
+def canonical_form(adjacencies, n_nodes, max_leaves=None):
+    """Certificate shared by all the graphs isomorphic to this one."""
+    return canonical_labelling(adjacencies, n_nodes, max_leaves)[0]
+
+
+def canonical_colourings(colourings, max_leaves=None):
+    """Canonical forms of a batch of 2-colourings of the complete graph.
+
+    Equal colourings of the batch are labelled once, and the adjacency
+    bitmasks and the relabelled colourings are computed for the whole batch
+    with NumPy.
+
+    Args:
+        colourings: Array with shape (batch, n_edges), or (n_edges,), with the
+            colour (0 or 1) of every edge, in the order of
+            encoders.graph_hot_encoder_dict.
+        max_leaves: Bound of the search, see canonical_labelling().
+
+    Returns:
+        The canonical colourings packed with np.packbits, with shape (batch,
+        ceil(n_edges / 8)), and the labellings giving them, with shape (batch,
+        n_nodes): edge (i, j) of a canonical colouring has the colour of edge
+        (labelling[i], labelling[j]) of the colouring.
+    """
+    colourings = np.asarray(colourings, dtype=bool)
+    single = colourings.ndim == 1
+    if single:
+        colourings = colourings[None]
+    n_nodes = (math.isqrt(8 * colourings.shape[1] + 1) + 1) // 2
+    encoder = encoders.EdgeEncoder(n_nodes)
+
+    packed = np.packbits(colourings, axis=1)
+    unique, first, inverse = np.unique(packed,
+                                       axis=0,
+                                       return_index=True,
+                                       return_inverse=True)
+    inverse = inverse.reshape(-1)
+    matrices = np.zeros((len(unique), n_nodes, n_nodes), dtype=np.int64)
+    matrices[:, encoder.rows, encoder.cols] = colourings[first]
+    matrices[:, encoder.cols, encoder.rows] = colourings[first]
+    bitmasks = matrices @ (np.int64(1) << np.arange(n_nodes, dtype=np.int64))
+
+    labellings = np.empty((len(unique), n_nodes), dtype=np.int64)
+    for index, adjacency in enumerate(bitmasks.tolist()):
+        labellings[index] = canonical_labelling([adjacency], n_nodes,
+                                                max_leaves)[1]
+    labellings = labellings[inverse]
+
+    # Index, in the colourings, of every edge of the canonical colourings.
+    edges = encoder.edge_indices(
+        np.stack([labellings[:, encoder.rows], labellings[:, encoder.cols]],
+                 axis=-1))
+    canonical = np.take_along_axis(colourings,
+                                   edges.reshape(len(colourings), -1),
+                                   axis=1)
+    canonical = np.packbits(canonical, axis=1)
+    if single:
+        return canonical[0], labellings[0]
+    return canonical, labellings
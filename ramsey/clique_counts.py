@@ -0,0 +1,88 @@
+"""Counts of the monochromatic cliques of edge colourings, for whole batches.
+
+The number of monochromatic k_cliques of a colouring is a dense measure of how
+far it is from a counterexample, which has none, unlike the size of its
+biggest clique.
+
+Colourings are given as arrays with shape (batch, n_edges), with the colour of
+every edge in the order of encoders.graph_hot_encoder_dict. Triangles are
+counted with matrix products of the stacked adjacency matrices of the batch,
+(batch, n_nodes, n_nodes): trace(A^3) / 6, computed as the sum of the entries
+of (A @ A) * A. Bigger cliques are counted with the tables of the edges of
+every k_clique (see ramsey.clique_tables): a k_clique has a colour when all its
+edges have it.
+"""
+
+import math
+
+import numpy as np
+
+from ramsey import clique_tables
+from ramsey import encoders
+
+# Rewards of the environments: minus the biggest clique (or the running cost
+# of RamseyGame-v1), minus the number of monochromatic cliques, or the
+# decrease of this number since the previous step.
+REWARD_MODES = ('clique', 'count', 'count_delta')
+
+
+def adjacency_tensor(colourings, n_nodes, colour):
+    """Stacked adjacency matrices of the edges of a colour.
+
+    Returns:
+        A float array with shape (batch, n_nodes, n_nodes).
+    """
+    encoder = encoders.EdgeEncoder(n_nodes)
+    edges = np.asarray(colourings).reshape(-1, encoder.n_edges) == colour
+    tensor = np.zeros((len(edges), n_nodes, n_nodes))
+    tensor[:, encoder.rows, encoder.cols] = edges
+    tensor[:, encoder.cols, encoder.rows] = edges
+    return tensor
+
+
+def count_triangles(adjacency):
+    """Number of triangles of stacked adjacency matrices, trace(A^3) / 6."""
+    closed_walks = np.einsum('bij,bij->b', adjacency @ adjacency, adjacency)
+    return np.rint(closed_walks / 6).astype(np.int64)
+
+
+def count_cliques(colourings, n_nodes, k_clique, colour):
+    """Number of k_cliques of a colour in every colouring of a batch.
+
+    Returns:
+        An integer array with shape (batch,).
+    """
+    colourings = np.asarray(colourings)
+    colourings = colourings.reshape(-1, n_nodes * (n_nodes - 1) // 2)
+    if k_clique > n_nodes:
+        return np.zeros(len(colourings), dtype=np.int64)
+    if k_clique <= 1:
+        return np.full(len(colourings), math.comb(n_nodes, k_clique))
+    edges = colourings == colour
+    if k_clique == 2:
+        return edges.sum(axis=1)
+    if k_clique == 3:
+        return count_triangles(adjacency_tensor(colourings, n_nodes, colour))
+    table = clique_tables.clique_edge_indices(n_nodes, k_clique)
+    return edges[:, table].all(axis=2).sum(axis=1)
+
+
+def monochromatic_counts(colourings, n_nodes, k_clique, colours=(0, 1)):
+    """Number of k_cliques of every colour in every colouring of a batch.
+
+    Args:
+        colourings: Array with shape (batch, n_edges), or (n_edges,).
+        n_nodes: Number of nodes of the complete graph.
+        k_clique: Size of the counted cliques.
+        colours: Colours whose cliques are counted. A 2-colouring of the
+            complete graph has colours 0 and 1, and the games of
+            RamseyGameMultiplayer colours 1 and 2, 0 being the free edges.
+
+    Returns:
+        An integer array with shape (batch, len(colours)).
+    """
+    counts = [
+        count_cliques(colourings, n_nodes, k_clique, colour)
+        for colour in colours
+    ]
+    return np.stack(counts, axis=-1)
@@ -0,0 +1,100 @@
+"""Tables with the edges of every k_clique of a complete graph.
+
+Edges are referred to by their index in encoders.graph_hot_encoder_dict, so a
+graph encoded as a vector over the edges has a k_clique of a colour when all
+the entries of one row of the table have that colour.
+
+The tables only depend on (n_nodes, k_clique). They are memoised in-process
+and saved as .npy files in CACHE_DIR, so that worker processes memory-map them
+at start-up instead of building them again. The cache directory can be set
+with the RAMSEY_CACHE_DIR environment variable.
+"""
+
+import itertools
+import os
+import tempfile
+
+from absl import logging
+import numpy as np
+
+from ramsey import encoders
+
+CACHE_DIR = os.environ.get(
+    'RAMSEY_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'ramsey', 'clique_tables'))
+
+_TABLES = {}
+
+
+def _build_clique_edge_indices(n_nodes, k_clique):
+    """Builds the table returned by clique_edge_indices()."""
+    n_clique_edges = k_clique * (k_clique - 1) // 2
+    table = [
+        encoders.edge_index(n_nodes, node_u, node_v)
+        for nodes in itertools.combinations(range(n_nodes), k_clique)
+        for node_u, node_v in itertools.combinations(nodes, 2)
+    ]
+    return np.array(table, dtype=np.int64).reshape(-1, n_clique_edges)
+
+
+def _build_edge_clique_indices(n_nodes, k_clique):
+    """Builds the table returned by edge_clique_indices()."""
+    table = clique_edge_indices(n_nodes, k_clique)
+    n_edges = n_nodes * (n_nodes - 1) // 2
+    # Every edge is in the same number of cliques, so sorting the cliques by
+    # edge gives a rectangular table.
+    order = np.argsort(table.ravel(), kind='stable')
+    return (order // table.shape[1]).reshape(n_edges, -1)
+
+
+def _cached_table(name, n_nodes, k_clique, build):
+    """Returns a memoised table, memory-mapping or writing its .npy file."""
+    key = (name, n_nodes, k_clique)
+    if key in _TABLES:
+        return _TABLES[key]
+
+    file_name = os.path.join(CACHE_DIR,
+                             f'{name}_{n_nodes}_nodes_{k_clique}_clique.npy')
+    try:
+        table = np.load(file_name, mmap_mode='r')
+    except (OSError, ValueError):
+        table = build(n_nodes, k_clique)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            # Write to a temporary file first, so that concurrent workers
+            # never memory-map a partially written table.
+            with tempfile.NamedTemporaryFile(dir=CACHE_DIR,
+                                             suffix='.npy',
+                                             delete=False) as table_file:
+                np.save(table_file, table)
+            os.replace(table_file.name, file_name)
+            table = np.load(file_name, mmap_mode='r')
+        except OSError as error:
+            logging.warning('Could not cache %s: %s', file_name, error)
+
+    _TABLES[key] = table
+    return table
+
+
+def clique_edge_indices(n_nodes, k_clique):
+    """Edge indices of every k_clique of the complete graph with n_nodes.
+
+    Returns:
+        A read-only integer array with shape (C(n_nodes, k_clique),
+        C(k_clique, 2)). Row r holds the edges of the r-th k-subset of the
+        nodes, the subsets being in lexicographic order.
+    """
+    return _cached_table('clique_edges', n_nodes, k_clique,
+                         _build_clique_edge_indices)
+
+
+def edge_clique_indices(n_nodes, k_clique):
+    """Inverted index of clique_edge_indices(): the k_cliques of every edge.
+
+    Returns:
+        A read-only integer array with shape (n_edges, C(n_nodes - 2,
+        k_clique - 2)). Row e holds, in increasing order, the rows of
+        clique_edge_indices() with the edge e.
+    """
+    return _cached_table('edge_cliques', n_nodes, k_clique,
+                         _build_edge_clique_indices)
@@ -0,0 +1,170 @@
+"""Clique search on graphs stored as adjacency bitmasks.
+
+Bit j of adjacency[i] is set when the nodes i and j are connected. Sets of
+nodes are also represented as bitmasks, which makes candidate intersection a
+single integer AND.
+
+The maximum clique search is a branch and bound in the style of Tomita's MCQ:
+the candidates are greedily coloured so that no two nodes of the same colour
+are connected, and a branch is pruned when the number of colours, an upper
+bound on the size of its biggest clique, cannot beat the best clique found.
+"""
+
+
+def complement(adjacency, nodes):
+    """Adjacency bitmasks of the complement of the subgraph induced by nodes."""
+    return [
+        ~neighbours & nodes & ~(1 << node)
+        for node, neighbours in enumerate(adjacency)
+    ]
+
+
+def _colour_candidates(adjacency, candidates):
+    """Greedy colouring of the candidates.
+
+    Returns:
+        The candidates, ordered by colour, and the colour of each of them. The
+        colour of a node bounds the size of the biggest clique among it and the
+        nodes before it.
+    """
+    order = []
+    colours = []
+    colour = 0
+    uncoloured = candidates
+    while uncoloured:
+        colour += 1
+        available = uncoloured
+        while available:
+            node = available.bit_length() - 1
+            bit = 1 << node
+            available &= ~adjacency[node] & ~bit
+            uncoloured &= ~bit
+            order.append(node)
+            colours.append(colour)
+    return order, colours
+
+
+def _max_clique(adjacency, nodes, best, limit):
+    """Size of the biggest clique if it is bigger than best, best otherwise.
+
+    The search stops as soon as a clique of size limit is found.
+    """
+    best = [best]
+
+    def expand(size, candidates):
+        order, colours = _colour_candidates(adjacency, candidates)
+        for index in range(len(order) - 1, -1, -1):
+            if size + colours[index] <= best[0]:
+                return False
+            node = order[index]
+            if size + 1 > best[0]:
+                best[0] = size + 1
+                if best[0] >= limit:
+                    return True
+            new_candidates = candidates & adjacency[node]
+            if new_candidates and expand(size + 1, new_candidates):
+                return True
+            candidates &= ~(1 << node)
+        return False
+
+    if limit is None:
+        limit = len(adjacency) + 1
+    if nodes and best[0] < limit:
+        expand(0, nodes)
+    return best[0]
+
+
+def clique_number(adjacency, nodes, limit=None):
+    """Size of the biggest clique of the subgraph induced by a set of nodes.
+
+    Matches networkx.graph_clique_number: an empty set of nodes has clique
+    number 0 and a set of isolated nodes has clique number 1.
+
+    Args:
+        adjacency: List with the neighbours bitmask of every node.
+        nodes: Bitmask of the nodes of the subgraph.
+        limit: If set, the search stops at the first clique of this size and
+            the result is min(clique number, limit).
+    """
+    return _max_clique(adjacency, nodes, 0, limit)
+
+
+def ramsey_number(adjacency, nodes, limit=None):
+    """Biggest clique number of the subgraph induced by nodes or its dual.
+
+    The dual is searched with the clique number of the graph as a lower bound,
+    so only its branches that could beat it are expanded.
+
+    Args:
+        adjacency: List with the neighbours bitmask of every node.
+        nodes: Bitmask of the nodes of the subgraph.
+        limit: If set, the search stops at the first clique of this size, in
+            either colour, and the result is min(ramsey number, limit).
+    """
+    best = _max_clique(adjacency, nodes, 0, limit)
+    return _max_clique(complement(adjacency, nodes), nodes, best, limit)
+
+
+def _prune_degrees(adjacency, nodes, min_degree):
+    """Removes the nodes with fewer than min_degree neighbours among nodes.
+
+    Such nodes are in no clique of size min_degree + 1, and removing them can
+    lower the degree of others, so this is repeated until nothing changes.
+    """
+    pruned = True
+    while pruned:
+        pruned = False
+        remaining = nodes
+        while remaining:
+            node = remaining.bit_length() - 1
+            remaining &= ~(1 << node)
+            if bin(adjacency[node] & nodes).count('1') < min_degree:
+                nodes &= ~(1 << node)
+                pruned = True
+    return nodes
+
+
+def find_clique(adjacency, nodes, size):
+    """Finds a clique of size in the subgraph induced by a set of nodes.
+
+    Stops at the first clique found, which is much cheaper than computing the
+    clique number when only a threshold matters.
+
+    Returns:
+        The list of the nodes of the clique, or None if there is none.
+    """
+    if size <= 0:
+        return []
+    if size > 2:
+        nodes = _prune_degrees(adjacency, nodes, size - 1)
+    while nodes:
+        if bin(nodes).count('1') < size:
+            return None
+        node = nodes.bit_length() - 1
+        nodes &= ~(1 << node)
+        clique = find_clique(adjacency, nodes & adjacency[node], size - 1)
+        if clique is not None:
+            clique.append(node)
+            return clique
+    return None
+
+
+def has_clique(adjacency, nodes, size):
+    """Whether the subgraph induced by a set of nodes has a clique of size."""
+    return find_clique(adjacency, nodes, size) is not None
+
+
+def clique_number_through_edge(adjacency, node_u, node_v, limit=None):
+    """Size of the biggest clique containing the edge (node_u, node_v).
+
+    Every such clique is the edge plus a clique of the common neighbourhood of
+    its endpoints, so the search is restricted to N(u) & N(v). When a single
+    edge is added to a graph, only these cliques can be new, which lets callers
+    keep a running clique number instead of searching the whole graph.
+
+    If limit is set, the result is capped at max(limit, 2), see clique_number.
+    """
+    if limit is not None:
+        limit = max(limit - 2, 0)
+    return 2 + clique_number(adjacency, adjacency[node_u] & adjacency[node_v],
+                             limit)
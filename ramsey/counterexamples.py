@@ -0,0 +1,148 @@
+"""Append-only store of Ramsey counterexamples.
+
+A counterexample is a 2-colouring of the edges of the complete graph with
+n_nodes with no monochromatic k_clique. It is stored as one record with the
+colour of every edge, in the order of encoders.graph_hot_encoder_dict, packed
+8 edges per byte:
+
+    n_nodes (uint8) | k_clique (uint8) | ceil(n_edges / 8) bytes
+
+Colourings that only differ by a relabelling of the nodes are the same
+counterexample, so the store only appends colourings whose canonical form (see
+ramsey.canonical) is not the one of a stored colouring. Many processes (e.g.
+SubprocVecEnv workers) can share the same file: appends hold an exclusive lock
+on it, and every process reads the records appended by the others before
+checking for duplicates. Readers take a shared lock to find the end of the
+last complete record.
+"""
+
+import collections
+import fcntl
+import os
+import struct
+
+import numpy as np
+
+from ramsey import canonical
+
+DEFAULT_FILE = 'ramsey/graphs/counterexamples.bin'
+
+_HEADER = struct.Struct('<BB')
+
+Counterexample = collections.namedtuple('Counterexample',
+                                        ['n_nodes', 'k_clique', 'colouring'])
+
+
+def _record_size(n_nodes):
+    """Number of bytes of the packed colouring of a graph with n_nodes."""
+    return (n_nodes * (n_nodes - 1) // 2 + 7) // 8
+
+
+def _read_records(record_file, end):
+    """Reads the records from the current position of an open file to end.
+
+    A trailing partial record, e.g. of a writer that crashed while appending
+    it, is not read, and the file is left at its first byte.
+    """
+    while True:
+        start = record_file.tell()
+        if start + _HEADER.size > end:
+            return
+        n_nodes, k_clique = _HEADER.unpack(record_file.read(_HEADER.size))
+        if start + _HEADER.size + _record_size(n_nodes) > end:
+            record_file.seek(start)
+            return
+        packed = record_file.read(_record_size(n_nodes))
+        n_edges = n_nodes * (n_nodes - 1) // 2
+        colouring = np.unpackbits(np.frombuffer(packed, dtype=np.uint8),
+                                  count=n_edges)
+        yield Counterexample(n_nodes, k_clique, colouring)
+
+
+def iter_counterexamples(file_name):
+    """Lazily iterates over the counterexamples of a store file.
+
+    Only the records appended before the call are read: the size of the file
+    is taken under a shared lock, so no append is in progress.
+    """
+    if not os.path.exists(file_name):
+        return
+    with open(file_name, 'rb') as record_file:
+        fcntl.flock(record_file, fcntl.LOCK_SH)
+        try:
+            end = os.fstat(record_file.fileno()).st_size
+        finally:
+            fcntl.flock(record_file, fcntl.LOCK_UN)
+        yield from _read_records(record_file, end)
+
+
+def _key(n_nodes, k_clique, colouring):
+    """Key shared by the colourings isomorphic to colouring."""
+    return n_nodes, k_clique, canonical.canonical_colourings(
+        colouring)[0].tobytes()
+
+
+class CounterexampleStore:
+    """Deduplicated, append-only file of counterexamples."""
+
+    def __init__(self, file_name):
+        """Opens (or creates) the store file."""
+        self.file_name = file_name
+        directory = os.path.dirname(file_name)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # pylint: disable=consider-using-with
+        self._file = open(file_name, 'ab+')
+        self._offset = 0
+        # Keys of the stored colourings.
+        self._keys = set()
+        self.n_counterexamples = 0
+
+    def _sync(self):
+        """Indexes the records appended since the last call."""
+        self._file.seek(self._offset)
+        end = os.fstat(self._file.fileno()).st_size
+        for counterexample in _read_records(self._file, end):
+            self._keys.add(_key(*counterexample))
+            self.n_counterexamples += 1
+        self._offset = self._file.tell()
+
+    def add(self, n_nodes, k_clique, colouring):
+        """Appends a counterexample unless an isomorphic one is stored.
+
+        Args:
+            n_nodes: Number of nodes of the complete graph.
+            k_clique: Size of the monochromatic cliques it avoids.
+            colouring: Colour (0 or 1) of every edge, in encoder order.
+
+        Returns:
+            Whether the counterexample was appended.
+        """
+        colouring = np.asarray(colouring, dtype=bool)
+        key = _key(n_nodes, k_clique, colouring)
+        record = _HEADER.pack(n_nodes,
+                              k_clique) + np.packbits(colouring).tobytes()
+
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            self._sync()
+            if key in self._keys:
+                return False
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(record)
+            self._file.flush()
+            self._offset = self._file.tell()
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+        self._keys.add(key)
+        self.n_counterexamples += 1
+        return True
+
+    def __iter__(self):
+        """Lazily iterates over the stored counterexamples."""
+        return iter_counterexamples(self.file_name)
+
+    def close(self):
+        """Closes the store file."""
+        self._file.close()
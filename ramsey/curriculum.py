@@ -0,0 +1,242 @@
+"""Curriculum over the sizes of the Ramsey games.
+
+Small games are solved quickly and big ones rarely at first, so training
+starts on the first (n_nodes, k_clique) stage of a curriculum and moves to the
+next stage once the success rate over the last episodes reaches a threshold.
+An episode is a success when it ends on a counterexample: a colouring of all
+the edges with no monochromatic k_clique.
+
+CurriculumEnv pads the games to the edges of the biggest stage, so the spaces
+and thus the policy do not change with the stage. An edge (i, j) has the same
+action and observation index at every stage, its index in
+encoders.graph_hot_encoder_dict(max_nodes).
+
+CurriculumCallback counts the successes during training and, when the stage
+changes, calls set_task() on every environment through the VecEnv: the
+environments rebuild their game at their next reset, inside the running
+worker processes.
+"""
+
+import collections
+
+import gym
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+from ramsey import encoders
+from ramsey import envs
+
+ENVIRONMENTS = {
+    'RamseyGame-v0': envs.RamseyGame,
+    'RamseyGame-v1': envs.RamseyGameMultiplayer,
+}
+
+
+def parse_stages(stages):
+    """Parses stages given as 'n_nodes:k_clique' strings."""
+    parsed = []
+    for stage in stages:
+        n_nodes, k_clique = stage.split(':')
+        parsed.append((int(n_nodes), int(k_clique)))
+    return parsed
+
+
+class CurriculumEnv(gym.Env):
+    """Ramsey game padded to max_nodes, whose size can change on reset."""
+    metadata = {'render.modes': ['human']}
+
+    def __init__(self,
+                 max_nodes,
+                 n_nodes,
+                 k_clique,
+                 environment_id='RamseyGame-v1',
+                 **env_kwargs):
+        """Inits the environment with the game of the first stage.
+
+        Args:
+            max_nodes: Number of nodes of the biggest game of the curriculum.
+            n_nodes: Number of nodes of the first game.
+            k_clique: Size of the cliques of the first game.
+            environment_id: 'RamseyGame-v0' or 'RamseyGame-v1'.
+            **env_kwargs: Other arguments of the games.
+        """
+        super().__init__()
+        self.max_nodes = max_nodes
+        self.max_edges = max_nodes * (max_nodes - 1) // 2
+        self.environment_id = environment_id
+        self.env_kwargs = env_kwargs
+        self.multiplayer = environment_id == 'RamseyGame-v1'
+        if self.multiplayer:
+            self.action_space = gym.spaces.Discrete(self.max_edges)
+            self.observation_space = gym.spaces.MultiBinary(2 * self.max_edges)
+        else:
+            self.action_space = gym.spaces.MultiBinary(self.max_edges)
+            self.observation_space = gym.spaces.MultiBinary(self.max_edges)
+        self.observation = np.zeros(self.observation_space.n, dtype=int)
+        self.pending_task = None
+        self.env = None
+        self._build(n_nodes, k_clique)
+
+    def _build(self, n_nodes, k_clique):
+        """Creates the game with n_nodes and k_clique."""
+        if n_nodes > self.max_nodes:
+            raise ValueError(
+                f'{n_nodes} nodes do not fit in {self.max_nodes} nodes.')
+        if self.env is not None:
+            self.env.close()
+        self.env = ENVIRONMENTS[self.environment_id](n_nodes, k_clique,
+                                                     **self.env_kwargs)
+        self.n_nodes = n_nodes
+        self.k_clique = k_clique
+        encoder = encoders.EdgeEncoder(n_nodes)
+        # Padded index of every edge of the game.
+        self.padded_edges = encoders.EdgeEncoder(self.max_nodes).edge_indices(
+            encoder.edges)
+        # Game edge of every padded action, -1 for the padding.
+        self.game_edges = np.full(self.max_edges, -1, dtype=np.int64)
+        self.game_edges[self.padded_edges] = np.arange(encoder.n_edges)
+        self.solved = False
+
+    @property
+    def current_player(self):
+        """Player to move in the game, always 1 in RamseyGame-v0."""
+        return getattr(self.env, 'current_player', 1)
+
+    def set_task(self, n_nodes, k_clique):
+        """Switches to another game at the next reset."""
+        self.pending_task = (n_nodes, k_clique)
+
+    def _pad(self, observation):
+        """Pads an observation of the game to max_nodes."""
+        observation = np.asarray(observation).reshape(-1, self.env.n_edges)
+        padded = self.observation.reshape(-1, self.max_edges)
+        padded[:] = 0
+        padded[:, self.padded_edges] = observation
+        return self.observation.copy()
+
+    def _is_counterexample(self, reward, done):
+        """Whether the game has reached a counterexample."""
+        if self.multiplayer:
+            env = self.env
+            return env.state.number_of_edges() == env.n_edges and max(
+                env.players_biggest_clique.values()) < env.k_clique
+        if self.env.reward_mode != 'clique':
+            return done and self.env.clique_count == 0
+        return done and -reward < self.env.k_clique
+
+    def action_masks(self):
+        """Whether each padded action places a free edge of the game."""
+        masks = np.zeros(self.max_edges, dtype=bool)
+        masks[self.padded_edges] = self.env.action_masks()
+        return masks
+
+    def step(self, action):
+        """Plays a padded action in the game."""
+        if self.multiplayer:
+            game_action = self.game_edges[action]
+            if game_action < 0:
+                # An edge of the padding is never free, see action_masks().
+                reward = self.env.invalid_action_reward()
+                return self.observation.copy(), reward, True, {
+                    'is_success': self.solved,
+                    'task': (self.n_nodes, self.k_clique),
+                }
+        else:
+            game_action = np.asarray(action)[self.padded_edges]
+        observation, reward, done, info = self.env.step(game_action)
+        self.solved = self.solved or self._is_counterexample(reward, done)
+        if done:
+            info = dict(info,
+                        is_success=self.solved,
+                        task=(self.n_nodes, self.k_clique))
+        return self._pad(observation), reward, done, info
+
+    def reset(self):
+        """Resets the game, switching to the pending task if there is one."""
+        if self.pending_task is not None:
+            self._build(*self.pending_task)
+            self.pending_task = None
+        self.solved = False
+        return self._pad(self.env.reset())
+
+    def seed(self, seed=None):
+        """Seeds the game."""
+        return self.env.seed(seed)
+
+    def render(self, mode='human'):
+        """Renders the game."""
+        return self.env.render(mode)
+
+    def close(self):
+        """Closes the game."""
+        self.env.close()
+
+
+class CurriculumScheduler:
+    """Moves through the stages as the success rate reaches a threshold."""
+
+    def __init__(self, stages, threshold=0.8, window=100):
+        """Inits the scheduler at the first stage.
+
+        Args:
+            stages: List of (n_nodes, k_clique) stages.
+            threshold: Success rate over the last window episodes needed to
+                move to the next stage.
+            window: Number of episodes of the success rate.
+        """
+        self.stages = list(stages)
+        self.threshold = threshold
+        self.window = window
+        self.stage = 0
+        self.successes = collections.deque(maxlen=window)
+
+    @property
+    def task(self):
+        """(n_nodes, k_clique) of the current stage."""
+        return self.stages[self.stage]
+
+    def success_rate(self):
+        """Success rate over the last window episodes of the stage."""
+        if not self.successes:
+            return 0.0
+        return sum(self.successes) / len(self.successes)
+
+    def record(self, success):
+        """Records the outcome of an episode.
+
+        Returns:
+            Whether the curriculum moved to the next stage.
+        """
+        self.successes.append(bool(success))
+        if self.stage + 1 < len(self.stages) and \
+                len(self.successes) == self.window and \
+                self.success_rate() >= self.threshold:
+            self.stage += 1
+            self.successes.clear()
+            return True
+        return False
+
+
+class CurriculumCallback(BaseCallback):
+    """Feeds the episode outcomes to a scheduler and hot-swaps the games."""
+
+    def __init__(self, scheduler, verbose=0):
+        """Inits the callback with a CurriculumScheduler."""
+        super().__init__(verbose)
+        self.scheduler = scheduler
+
+    def _on_step(self):
+        for done, info in zip(self.locals['dones'], self.locals['infos']):
+            # Episodes started before the last stage change do not count.
+            if not done or info.get('task') != self.scheduler.task:
+                continue
+            if self.scheduler.record(info['is_success']):
+                n_nodes, k_clique = self.scheduler.task
+                self.training_env.env_method('set_task', n_nodes, k_clique)
+                if self.verbose:
+                    print(f'Curriculum stage {self.scheduler.stage}: '
+                          f'{n_nodes} nodes, {k_clique}-cliques.')
+        self.logger.record('curriculum/stage', self.scheduler.stage)
+        self.logger.record('curriculum/success_rate',
+                           self.scheduler.success_rate())
+        return True
@@ -6,8 +6,12 @@ https://alexandervandekleut.github.io/gym-wrappers/
 """
 
 import itertools
+import math
 
-import networkx
+import numpy as np
+
+# Edges of the complete graph with n nodes, memoised by graph_hot_encoder_dict.
+_EDGE_TABLES = {}
 
 
 def graph_hot_encoder_dict(n_nodes):
@@ -27,19 +31,114 @@ def graph_hot_encoder_dict(n_nodes):
     ...
     n(n-1)/2 | (n-1, n-1)
 
-    Generating a complete undirected graph with n nodes gives us all the
-    necessary edges. The i-th tuple is then accessed by it's index:
-    encoder_dictionary[i]
+    The edges are the pairs of nodes in lexicographic order, the order of the
+    edges of networkx.complete_graph(n). The i-th tuple is then accessed by
+    it's index: encoder_dictionary[i]
     """
-    return list(networkx.complete_graph(n_nodes).edges)
+    if n_nodes not in _EDGE_TABLES:
+        _EDGE_TABLES[n_nodes] = tuple(itertools.combinations(range(n_nodes), 2))
+    return list(_EDGE_TABLES[n_nodes])
 
 
 def one_hot_encode(dictionary, graph_edges):
     """One hot encodes a graph into a binary list."""
-    return [element in list(graph_edges) for element in dictionary]
+    graph_edges = set(graph_edges)
+    return [element in graph_edges for element in dictionary]
 
 
 def one_hot_decode(dictionary, binary_list):
     """One hot decodes a binary list into a list of edges."""
     edges = itertools.compress(dictionary, binary_list)
     return edges
+
+
+def edge_index(n_nodes, node_u, node_v):
+    """Index of the edge (node_u, node_v) in graph_hot_encoder_dict(n_nodes).
+
+    The edges (i, j), i < j, are sorted lexicographically, so the edges of
+    node i start after the n - 1 + n - 2 + ... + n - i edges of the nodes
+    before it.
+    """
+    if node_u > node_v:
+        node_u, node_v = node_v, node_u
+    return node_u * (2 * n_nodes - node_u - 1) // 2 + node_v - node_u - 1
+
+
+def index_edge(n_nodes, index):
+    """Edge with the given index in graph_hot_encoder_dict(n_nodes).
+
+    Inverts edge_index() by counting the edges from the end of the ordering:
+    the last m nodes hold m(m-1)/2 edges.
+    """
+    n_edges = n_nodes * (n_nodes - 1) // 2
+    remaining = n_edges - 1 - index
+    n_last_nodes = (math.isqrt(8 * remaining + 1) + 1) // 2
+    node_u = n_nodes - 1 - n_last_nodes
+    node_v = index - edge_index(n_nodes, node_u, node_u + 1) + node_u + 1
+    return node_u, node_v
+
+
+class EdgeEncoder:
+    """Encodes graphs with n_nodes as binary vectors over their edges.
+
+    Uses the ordering of graph_hot_encoder_dict(n_nodes) with closed-form
+    index math, and NumPy for whole vectors. Functions taking an out argument
+    write into it, so that callers can reuse their buffers on every step.
+    """
+
+    def __init__(self, n_nodes):
+        """Inits the encoder for graphs with n_nodes."""
+        self.n_nodes = n_nodes
+        self.n_edges = n_nodes * (n_nodes - 1) // 2
+        rows, cols = np.triu_indices(n_nodes, k=1)
+        self.rows = rows
+        self.cols = cols
+        self.edges = np.stack([rows, cols], axis=1)
+
+    def edge_index(self, node_u, node_v):
+        """Index of the edge (node_u, node_v)."""
+        return edge_index(self.n_nodes, node_u, node_v)
+
+    def index_edge(self, index):
+        """Edge (i, j), i < j, with the given index."""
+        return index_edge(self.n_nodes, index)
+
+    def edge_indices(self, edges):
+        """Indices of an array of edges with shape (n, 2)."""
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        node_u = edges.min(axis=1)
+        node_v = edges.max(axis=1)
+        return (node_u * (2 * self.n_nodes - node_u - 1) // 2 + node_v -
+                node_u - 1)
+
+    def encode(self, edges, out=None):
+        """One hot encodes a list of edges into a binary vector."""
+        if out is None:
+            out = np.zeros(self.n_edges, dtype=np.int8)
+        else:
+            out[:] = 0
+        out[self.edge_indices(edges)] = 1
+        return out
+
+    def decode(self, vector):
+        """Edges of a binary vector, as an array with shape (n, 2)."""
+        return self.edges[np.flatnonzero(vector)]
+
+    def adjacency_to_vector(self, adjacency, out=None):
+        """Edge vector of a (n_nodes, n_nodes) adjacency matrix."""
+        adjacency = np.asarray(adjacency)
+        if out is None:
+            return adjacency[self.rows, self.cols]
+        out[:] = adjacency[self.rows, self.cols]
+        return out
+
+    def vector_to_adjacency(self, vector, out=None):
+        """Symmetric (n_nodes, n_nodes) adjacency matrix of an edge vector."""
+        vector = np.asarray(vector)
+        if out is None:
+            out = np.zeros((self.n_nodes, self.n_nodes), dtype=vector.dtype)
+        else:
+            out[np.diag_indices(self.n_nodes)] = 0
+        out[self.rows, self.cols] = vector
+        out[self.cols, self.rows] = vector
+        return out
@@ -17,33 +17,82 @@ This is too complicated for the first iteration, so let's try to train
 something that creates a k_clique.
 """
 
-import sys
+import math
+
+from absl import logging
 
 import gym
-import matplotlib.pyplot as plt
-import networkx
 import numpy as np
 
+from ramsey import clique_counts
+from ramsey import cliques
+from ramsey import counterexamples
 from ramsey import encoders
-from ramsey import reward_functions
+from ramsey import graph_state
+from ramsey import profiling
 
 
 class RamseyGame(gym.Env):
     """Custom Environment that follows gym interface"""
     metadata = {'render.modes': ['human']}
 
-    def __init__(self, n_nodes, k_clique, save_counterexample=False):
-        """Inits the Ramsey Game gym environment."""
+    def __init__(self,
+                 n_nodes,
+                 k_clique,
+                 save_counterexample=False,
+                 counterexample_file=counterexamples.DEFAULT_FILE,
+                 reward_cache=None,
+                 profile=False,
+                 reward_mode='clique'):
+        """Inits the Ramsey Game gym environment.
+
+        With profile=True, every step adds the time spent in each of its
+        phases to its info, see ramsey.profiling.
+
+        reward_mode is one of clique_counts.REWARD_MODES. With 'count' the
+        reward is minus the number of monochromatic k_cliques of the graph
+        and its dual, and with 'count_delta' the decrease of this number
+        since the previous step. The game ends as in the 'clique' mode.
+        """
         super().__init__()
+        if reward_mode not in clique_counts.REWARD_MODES:
+            raise ValueError(f'Unknown reward mode {reward_mode}.')
+        self.reward_mode = reward_mode
+        # Optional reward_cache.RewardCache of the biggest clique in the graph
+        # or its dual.
+        self.reward_cache = reward_cache
         self.save_counterexample = save_counterexample
+        self.counterexample_file = counterexample_file
+        self.counterexample_store = None
         self.n_nodes = n_nodes
         self.n_edges = int(self.n_nodes * (self.n_nodes - 1) / 2)
         self.k_clique = k_clique
         self.action_dictionary = encoders.graph_hot_encoder_dict(self.n_nodes)
+        self.encoder = encoders.EdgeEncoder(self.n_nodes)
+        self.state = graph_state.GraphState(self.n_nodes)
+        self.edges = np.zeros(self.n_edges, dtype=int)
+        # Number of monochromatic k_cliques after the previous step.
+        self.clique_count = 0
 
         self.action_space = gym.spaces.MultiBinary(self.n_edges)
         self.observation_space = gym.spaces.MultiBinary(self.n_edges)
 
+        self.profiler = None
+        if profile:
+            self.profiler = profiling.StepProfiler()
+            self.profiler.time_methods(self, {'_get_reward': 'reward'})
+            self.profiler.time_methods(self.encoder, {
+                'decode': 'decode',
+                'encode': 'encode'
+            })
+            self.profiler.time_methods(self.state, {'add_edge': 'add_edge'})
+            if self.reward_cache is not None:
+                for name in ('hits', 'shared_hits', 'misses'):
+                    self.profiler.track(
+                        'cache_' + name,
+                        lambda name=name: getattr(self.reward_cache, name))
+            self.step = self.profiler.profiled_step(self.step)
+
     def step(self, action):
         """Performs a step in the environment.
 
@@ -52,19 +101,20 @@ class RamseyGame(gym.Env):
         the size of the biggest clique and finnally encoding the graph to a
         binary vector, in order to satisfy the gym interface.
         """
-        self.graph = networkx.empty_graph(self.n_nodes)
+        self.state.clear()
         # The agent has the ability to change the entire graph with one action.
-        actions = encoders.one_hot_decode(self.action_dictionary, action)
-        for edge in actions:
-            self.graph.add_edge(*edge)
+        actions = self.encoder.decode(action)
+        for edge in actions.tolist():
+            self.state.add_edge(*edge)
+
+        # Update observation
+        self.encoder.encode(actions, out=self.edges)
 
         # Get reward and update done.
         reward = self._get_reward()
 
-        # Update observation
-        observation = encoders.one_hot_encode(self.action_dictionary,
-                                              self.graph.edges)
-
+        # A copy, as the next step overwrites self.edges.
+        observation = self.edges.copy()
         info = {}
         return observation, reward, self.done, info
 
@@ -73,44 +123,75 @@ class RamseyGame(gym.Env):
         self.score = 0
         self.done = False
 
-        self.graph = networkx.empty_graph(self.n_nodes)
-        self.nodes = list(self.graph.nodes)
-        self.edges = np.zeros(self.n_edges, dtype=int)  #list(self.graph.edges)
+        self.state.clear()
+        self.nodes = list(range(self.n_nodes))
+        self.edges[:] = 0
+        # The dual of the empty graph is the complete graph.
+        self.clique_count = math.comb(self.n_nodes, self.k_clique)
         self.biggest_clique = 0
         self.previous_biggest_clique = 0
 
-        observation = self.edges
+        observation = self.edges.copy()
         return observation  # reward, done, info can't be included
 
+    @property
+    def graph(self):
+        """The current graph, materialised as a networkx graph."""
+        return self.state.to_networkx()
+
     def render(self, mode='human'):
-        """Nice visualization of graph."""
+        """Nice visualization of graph.
+
+        Blocks for a tenth of a second per frame, see recorder.EpisodeRecorder
+        to watch the games of a training run.
+        """
         if mode == 'human':
-            networkx.draw(self.graph)
-            networkx.draw(networkx.complement(self.graph), node_color='r')
+            # Only rendering needs these, and they are slow to import.
+            # pylint: disable=import-outside-toplevel
+            import matplotlib.pyplot as plt
+            import networkx
+            graph = self.graph
+            networkx.draw(graph)
+            networkx.draw(networkx.complement(graph), node_color='r')
             plt.pause(0.1)
             plt.clf()
 
     def close(self):
+        """Closes the counterexample store."""
+        if self.counterexample_store is not None:
+            self.counterexample_store.close()
+            self.counterexample_store = None
+
+    def _save_counterexample(self, colouring):
         """Acts as a data saver.
 
         Given a graph with n_nodes we may find that there is a configuration
         where neither the graph, nor it's dual, contain a k_clique. We call this
         configuration a RamseyGame counterexample.
-        When a counterexample is found, we save it to a file.
+        When a counterexample is found, we append it to the counterexample
+        store, unless an isomorphic one was already saved.
 
         TODO(@ze): Create a callback function for saving the the graph when the
         model is trained. The callback function should be a input for the
         training function.
+
+        Args:
+            colouring: Binary vector with the edges of the graph, the other
+                edges being the ones of its dual.
         """
-        file_name = 'ramsey/graphs/win_' + str(self.k_clique) + '_clique_' + str(self.n_nodes) + '_nodes.txt'
-        networkx.write_edgelist(self.graph, file_name)
-        sys.exit()
+        if self.counterexample_store is None:
+            self.counterexample_store = counterexamples.CounterexampleStore(
+                self.counterexample_file)
+        if self.counterexample_store.add(self.n_nodes, self.k_clique,
+                                         colouring):
+            logging.info('Saved a counterexample to %s',
+                         self.counterexample_file)
 
     def _get_reward(self):
         """Reward function for k_clique finding.
 
         Currently this function also handles the logic behind saving a
-        RamseyGame counterexample. See self.close() method.
+        RamseyGame counterexample. See self._save_counterexample() method.
 
         Ideas to improve this reward function:
         - Penalize non connected graphs.
@@ -118,15 +199,46 @@ class RamseyGame(gym.Env):
         - Use the stepaction. A action is placing an edge, start counting
         cliques from that edge.
         """
-        # Get biggest clique.
-        biggest_clique = reward_functions.ramsey_number(self.graph)
+        if self.reward_mode != 'clique':
+            return self._get_count_reward()
+
+        # Get biggest clique in the graph or it's dual.
+        adjacency = self.state.mask_adjacency()
+        if self.reward_cache is None:
+            biggest_clique = cliques.ramsey_number(adjacency,
+                                                   self.state.full_mask)
+        else:
+            biggest_clique = self.reward_cache.lookup(
+                adjacency,
+                lambda: cliques.ramsey_number(adjacency, self.state.full_mask))
         reward = -biggest_clique
 
-        # See self.close() method for TODO comment.
         if biggest_clique <= self.k_clique:
             self.done = True
 
             if self.save_counterexample:
                 if biggest_clique < self.k_clique:
-                    self.close()
+                    self._save_counterexample(
+                        self.encoder.encode(list(self.state.edges())))
+        return reward
+
+    def _get_count_reward(self):
+        """Reward from the number of monochromatic k_cliques, see __init__."""
+        clique_count = int(
+            clique_counts.monochromatic_counts(self.edges, self.n_nodes,
+                                               self.k_clique).sum())
+        if self.reward_mode == 'count':
+            reward = -clique_count
+        else:
+            reward = self.clique_count - clique_count
+        self.clique_count = clique_count
+
+        # The game ends as in the clique mode, when the biggest monochromatic
+        # clique has at most k_clique nodes, which is never a counterexample
+        # when n_nodes is at least the Ramsey number R(k_clique, k_clique).
+        if clique_count == 0 or not clique_counts.monochromatic_counts(
+                self.edges, self.n_nodes, self.k_clique + 1).any():
+            self.done = True
+            if self.save_counterexample and clique_count == 0:
+                self._save_counterexample(self.edges)
         return reward
@@ -1,53 +1,137 @@
 """Reinforcement Learning gym environment for k_clique finding."""
 
-import sys
-
 from absl import logging
 
 import gym
-import matplotlib.pyplot as plt
-import networkx
 import numpy as np
 
+from ramsey import clique_counts
+from ramsey import counterexamples
 from ramsey import encoders
-from ramsey import reward_functions
+from ramsey import graph_state
+from ramsey import profiling
+
+
+def default_count_clique(k_clique):
+    """Size of the cliques counted by the count rewards, see __init__."""
+    return max(k_clique - 1, 3)
 
 
 class RamseyGameMultiplayer(gym.Env):
     """Custom Environment that follows gym interface"""
     metadata = {'render.modes': ['human']}
 
-    def __init__(self, n_nodes, k_clique, save_counterexample=False):
-        """Inits the Ramsey Game gym environment."""
+    def __init__(self,
+                 n_nodes,
+                 k_clique,
+                 save_counterexample=False,
+                 counterexample_file=counterexamples.DEFAULT_FILE,
+                 profile=False,
+                 reward_mode='clique',
+                 count_clique=None):
+        """Inits the Ramsey Game gym environment.
+
+        With profile=True, every step adds the time spent in each of its
+        phases to its info, see ramsey.profiling.
+
+        reward_mode is one of clique_counts.REWARD_MODES. With 'count' the
+        running cost of every step is replaced by minus the number of
+        monochromatic cliques of size count_clique of both players, and with
+        'count_delta' by the decrease of this number since the previous step.
+        The game ends at the first monochromatic k_clique, so count_clique
+        defaults to k_clique - 1, the cliques one node short of it, but at
+        least 3: the 2-cliques are just the placed edges, whose number only
+        depends on the move number.
+        """
         super().__init__()
+        if reward_mode not in clique_counts.REWARD_MODES:
+            raise ValueError(f'Unknown reward mode {reward_mode}.')
+        self.reward_mode = reward_mode
+        if count_clique is None:
+            count_clique = default_count_clique(k_clique)
+        self.count_clique = count_clique
+        # Number of monochromatic count_cliques after the previous step.
+        self.clique_count = 0
 
         # TODO: Create a fonfiguration file where the environment parameters
-        # are saved. 
+        # are saved.
         self.save_counterexample = save_counterexample
+        self.counterexample_file = counterexample_file
+        self.counterexample_store = None
         self.n_nodes = n_nodes
         self.n_edges = int(self.n_nodes * (self.n_nodes - 1) / 2)
         self.k_clique = k_clique
         self.action_dictionary = encoders.graph_hot_encoder_dict(self.n_nodes)
+        self.encoder = encoders.EdgeEncoder(self.n_nodes)
+        # The edges of player 1 and the edges of player 2, flattened into a
+        # new array as the observation, since the next step updates them.
+        self.edges = np.zeros((2, self.n_edges), dtype=int)
+        # Legal actions, kept up to date as edges are placed.
+        self.free_edges = np.ones(self.n_edges, dtype=bool)
 
         self.agents = ['player_1', 'player_2']
+        # Edges are coloured with the number of the player who placed them.
+        self.state = graph_state.GraphState(self.n_nodes, colours=(1, 2))
 
         self.action_space = gym.spaces.Discrete(self.n_edges)
-        self.observation_space = gym.spaces.MultiBinary(self.n_edges)
+        self.observation_space = gym.spaces.MultiBinary(2 * self.n_edges)
+
+        self.profiler = None
+        if profile:
+            self.profiler = profiling.StepProfiler()
+            self.profiler.time_methods(
+                self, {
+                    '_place_edge': 'place_edge',
+                    '_update_biggest_cliques': 'clique_search',
+                    '_get_reward': 'reward',
+                })
+            self.profiler.time_methods(self.encoder, {'encode': 'encode'})
+            self.step = self.profiler.profiled_step(self.step)
 
     def _place_edge(self, action):
         """Places an edge in the graph for the current player."""
-        self.previous_graph = self.graph
+        self.previous_n_edges = self.state.number_of_edges()
 
         action_edge = self.action_dictionary[action]
         logging.debug('action_edge: %s', action_edge)
-        if self.current_player == 1:
-            logging.debug('player 1 previous graph: %s', list(self.graph.edges))
-            self.graph.add_edge(*action_edge, player=1)
-            logging.debug('player 1 following graph: %s', list(self.graph.edges))
-        else:
-            logging.debug('player 2 previous graph: %s', list(self.graph.edges))
-            self.graph.add_edge(*action_edge, player=2)
-            logging.debug('player 2 following graph: %s', list(self.graph.edges))
+        if logging.level_debug():
+            logging.debug('player %s previous graph: %s', self.current_player,
+                          list(self.state.edges()))
+        previous_player = self.state.add_edge(*action_edge,
+                                              colour=self.current_player)
+        self.edges[self.current_player - 1, action] = 1
+        # The edge is taken from the other player if she had placed it.
+        self.edges[2 - self.current_player, action] = 0
+        self.free_edges[action] = False
+        if logging.level_debug():
+            logging.debug('player %s following graph: %s', self.current_player,
+                          list(self.state.edges()))
+        self._update_biggest_cliques(action_edge, previous_player)
+
+    def _update_biggest_cliques(self, action_edge, previous_player):
+        """Updates the running biggest clique of each player.
+
+        A new edge can only create cliques that contain it, so the current
+        player's biggest clique is found by searching the common neighbourhood
+        of the edge's endpoints. Taking an edge from the other player can
+        shrink her cliques, in which case her subgraph is searched again.
+
+        The game is only decided by cliques of size k_clique, so the searches
+        stop at the first one and the biggest cliques are capped at k_clique.
+        """
+        if previous_player == self.current_player:
+            return
+        self.players_biggest_clique[self.current_player] = max(
+            self.players_biggest_clique[self.current_player],
+            self.state.clique_number_through_edge(*action_edge,
+                                                  self.current_player,
+                                                  limit=self.k_clique))
+        if previous_player is not None:
+            self.players_biggest_clique[previous_player] = \
+                self.state.clique_number(
+                    previous_player,
+                    nodes=self.state.non_isolated_nodes(previous_player),
+                    limit=self.k_clique)
 
     def step(self, action):
         """Performs a step in the environment.
@@ -69,8 +153,7 @@ class RamseyGameMultiplayer(gym.Env):
         reward = self._get_reward()
 
         # Update observation
-        observation = encoders.one_hot_encode(self.action_dictionary,
-                                              self.graph.edges)
+        observation = self.edges.flatten()
         logging.debug('observation: %s', observation)
         info = {}
         #self.render()
@@ -81,101 +164,173 @@ class RamseyGameMultiplayer(gym.Env):
         self.player_1_score = 0
         self.player_2_score = 0
 
-
     def reset(self):
         """Resets the environment when a k_clique is found."""
         self.current_player = 1
         self.current_step = 0
 
         self.reward = 0
+        self.clique_count = 0
         self._reset_players_score()
         self.player_biggest_clique = 0
+        self.players_biggest_clique = {1: 0, 2: 0}
         self.done = False
 
-        self.graph = networkx.empty_graph(self.n_nodes)
-        self.previous_graph = networkx.empty_graph(self.n_nodes)
-        self.nodes = list(self.graph.nodes)
-        self.edges = np.zeros(self.n_edges, dtype=int)  #list(self.graph.edges)
+        self.state.clear()
+        self.previous_n_edges = 0
+        self.nodes = list(range(self.n_nodes))
+        self.edges[:] = 0
+        self.free_edges[:] = True
         self.biggest_clique = 0
         self.previous_biggest_clique = 0
 
-        observation = self.edges
+        observation = self.edges.flatten()
         logging.debug('reset done')
         return observation  # reward, done, info can't be included
 
+    def action_masks(self):
+        """Whether each action places a free edge.
+
+        Placing an edge that is already in the graph ends the game with a
+        penalty, so agents that support action masks (e.g. sb3-contrib's
+        MaskablePPO) should only sample the free edges. The game ends when the
+        board is full, so some edge is always free.
+        """
+        return self.free_edges.copy()
+
+    @property
+    def graph(self):
+        """The current graph, with the player who placed each edge."""
+        return self.state.to_networkx(attribute='player')
+
     def render(self, mode='human'):
-        """Nice visualization of graph."""
+        """Nice visualization of graph.
+
+        Blocks for a second per frame. To watch the games of a training run,
+        record them with recorder.EpisodeRecorder instead and view them in
+        another process with ramsey.view_episodes.
+        """
         if mode == 'human':
-            logging.debug('edges: %s', self.graph.edges.data())
+            # Only rendering needs these, and they are slow to import.
+            # pylint: disable=import-outside-toplevel
+            import matplotlib.pyplot as plt
+            import networkx
+            graph = networkx.empty_graph(self.n_nodes)
+            edges = []
             colors = []
-            for edge in self.graph.edges:
-                if self.graph.get_edge_data(*edge)['player'] == 1:
-                    colors.append('red')
-                else:
-                    colors.append('blue')
-            networkx.draw(self.graph, edge_color=colors)
+            for player, color in ((1, 'red'), (2, 'blue')):
+                player_edges = list(self.state.edges(player))
+                edges.extend(player_edges)
+                colors.extend([color] * len(player_edges))
+            graph.add_edges_from(edges)
+            logging.debug('edges: %s', edges)
+            networkx.draw(graph, edgelist=edges, edge_color=colors)
             #networkx.draw(networkx.complement(self.graph), node_color='r')
             plt.pause(1)
             plt.clf()
 
     def close(self):
+        """Closes the counterexample store."""
+        if self.counterexample_store is not None:
+            self.counterexample_store.close()
+            self.counterexample_store = None
+
+    def _save_counterexample(self, colouring):
         """Acts as a data saver.
 
         Given a graph with n_nodes we may find that there is a configuration
         where neither the graph, nor it's dual, contain a k_clique. We call this
         configuration a RamseyGame counterexample.
-        When a counterexample is found, we save it to a file.
+        When a counterexample is found, we append it to the counterexample
+        store, unless an isomorphic one was already saved.
 
         TODO(@ze): Create a callback function for saving the the graph when the
         model is trained. The callback function should be a input for the
         training function.
+
+        Args:
+            colouring: Binary vector with the edges of the graph, the other
+                edges being the ones of its dual.
         """
-        file_name = 'ramsey/graphs/win_' + str(self.k_clique) + '_clique_' + \
-            str(self.n_nodes) + '_nodes.txt'
-        networkx.write_edgelist(self.graph, file_name)
-        sys.exit()
+        if self.counterexample_store is None:
+            self.counterexample_store = counterexamples.CounterexampleStore(
+                self.counterexample_file)
+        if self.counterexample_store.add(self.n_nodes, self.k_clique,
+                                         colouring):
+            logging.info('Saved a counterexample to %s',
+                         self.counterexample_file)
 
     def _get_reward(self):
         """Reward function for k_clique finding.
 
         Currently this function also handles the logic behind saving a
-        RamseyGame counterexample. See self.close() method.
+        RamseyGame counterexample. See self._save_counterexample() method.
 
         Ideas to improve this reward function:
         - Penalize non connected graphs.
         - Give reward for finding smaller cliques.
-        - Use the stepaction. A action is placing an edge, start counting
-        cliques from that edge.
         """
-        # Check winning conditions.
-        current_player_edge_list = []
-        for edge in self.graph.edges:
-            if self.graph.get_edge_data(*edge)['player'] == self.current_player:
-                current_player_edge_list.append(edge)
-        
-        subgraph = networkx.Graph()
-        subgraph.add_edges_from(current_player_edge_list)
-
-        previous_player_biggest_clique = self.player_biggest_clique
-        self.player_biggest_clique = networkx.graph_clique_number(subgraph)
-        
-        self.reward -= 1
-        reward = self.reward
+        # Check winning conditions. The biggest cliques are kept up to date
+        # by self._place_edge().
+        self.player_biggest_clique = self.players_biggest_clique[
+            self.current_player]
+
+        if self.reward_mode == 'clique':
+            self.reward -= 1
+            reward = self.reward
+        else:
+            reward = self._get_count_reward()
 
         # Penalty for not adding an edge.
-        if self.previous_graph.number_of_edges() == self.graph.number_of_edges():
+        if self.previous_n_edges == self.state.number_of_edges():
             self.done = True
             reward -= self.n_edges * 10
 
         if self.player_biggest_clique >= self.k_clique:
-            logging.debug('Player %s has found a clique of size %s', self.current_player, self.player_biggest_clique)
+            logging.debug('Player %s has found a clique of size %s',
+                          self.current_player, self.player_biggest_clique)
             self.done = True
             logging.debug('game finished')
 
+        # A full board is a draw: the only moves left end with a penalty.
+        if not self.free_edges.any():
+            self.done = True
+
         # Check problem solved conditions.
         if self.save_counterexample:
-            if previous_player_biggest_clique < self.k_clique and \
-                    self.player_biggest_clique < self.k_clique and \
-                        self.graph.number_of_edges == self.n_edges:
-                self.close()
+            # The biggest clique checked above lags one step behind for the
+            # player who just moved, so check both players.
+            if max(self.players_biggest_clique.values()) < self.k_clique and \
+                    self.state.number_of_edges() == self.n_edges:
+                # The edges of player 1 form the graph, the ones of player 2
+                # its dual.
+                self._save_counterexample(
+                    self.encoder.encode(list(self.state.edges(1))))
         return reward
+
+    def _get_count_reward(self):
+        """Reward from the number of monochromatic cliques, see __init__."""
+        colours = self.edges[0] + 2 * self.edges[1]
+        clique_count = int(
+            clique_counts.monochromatic_counts(colours, self.n_nodes,
+                                               self.count_clique, (1, 2)).sum())
+        if self.reward_mode == 'count':
+            reward = -clique_count
+        else:
+            reward = self.clique_count - clique_count
+        self.clique_count = clique_count
+        return reward
+
+    def invalid_action_reward(self):
+        """Reward of a step that places no edge, see _get_reward().
+
+        Such a step ends the game with the reward of the current reward mode
+        for an unchanged board, minus the penalty for not adding an edge.
+        """
+        if self.reward_mode == 'clique':
+            reward = self.reward - 1
+        elif self.reward_mode == 'count':
+            reward = -self.clique_count
+        else:
+            reward = 0
+        return reward - self.n_edges * 10
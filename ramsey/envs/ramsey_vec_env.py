@@ -0,0 +1,212 @@
+"""Batched version of the multiplayer Ramsey game.
+
+RamseyGameMultiplayer steps a single game, so training on many games means
+one SubprocVecEnv worker per game and pickling every step through a pipe.
+RamseyVecEnv steps a whole batch of games in the same process: the games are
+stored as a (n_envs, n_edges) array with the player who placed every edge (0
+for a free edge) and every step is a handful of NumPy operations over the
+batch.
+
+Observations and action masks are the ones of RamseyGameMultiplayer for every
+game.
+
+The rules are the ones of RamseyGameMultiplayer. Winning conditions are
+checked for all the games at once with the table of the edges of every
+k_clique (see ramsey.clique_tables): a player has a k_clique when all the
+edges of one row of the table have her colour. With the count reward modes,
+the monochromatic cliques of all the games are counted at once too, see
+ramsey.clique_counts.
+"""
+
+import gym
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+from ramsey import clique_counts
+from ramsey import clique_tables
+from ramsey.envs import ramsey_env_multiplayer
+
+# Attributes holding one value per game, indexed by get_attr() and set_attr().
+PER_GAME_ATTRIBUTES = ('colours', 'current_player', 'rewards', 'clique_counts')
+
+
+class RamseyVecEnv(VecEnv):
+    """Steps n_envs RamseyGameMultiplayer games with array operations."""
+
+    def __init__(self,
+                 n_envs,
+                 n_nodes,
+                 k_clique,
+                 reward_mode='clique',
+                 count_clique=None):
+        """Inits the batch of games.
+
+        reward_mode and count_clique are the ones of RamseyGameMultiplayer.
+        """
+        if reward_mode not in clique_counts.REWARD_MODES:
+            raise ValueError(f'Unknown reward mode {reward_mode}.')
+        self.reward_mode = reward_mode
+        if count_clique is None:
+            count_clique = ramsey_env_multiplayer.default_count_clique(k_clique)
+        self.count_clique = count_clique
+        self.n_nodes = n_nodes
+        self.n_edges = int(self.n_nodes * (self.n_nodes - 1) / 2)
+        self.k_clique = k_clique
+        self.clique_edges = clique_tables.clique_edge_indices(
+            self.n_nodes, self.k_clique)
+
+        action_space = gym.spaces.Discrete(self.n_edges)
+        observation_space = gym.spaces.MultiBinary(2 * self.n_edges)
+        super().__init__(n_envs, observation_space, action_space)
+
+        self.colours = np.zeros((n_envs, self.n_edges), dtype=np.uint8)
+        self.current_player = np.ones(n_envs, dtype=np.uint8)
+        self.rewards = np.zeros(n_envs, dtype=np.int64)
+        # Number of monochromatic count_cliques of every game after the
+        # previous step.
+        self.clique_counts = np.zeros(n_envs, dtype=np.int64)
+        self.actions = np.zeros(n_envs, dtype=np.int64)
+        self.env_indices = np.arange(n_envs)
+        self.seeds = [None] * n_envs
+
+    def _has_k_clique(self, player):
+        """Whether the player of each game has a k_clique of her colour."""
+        player_edges = self.colours == player[:, None]
+        return player_edges[:, self.clique_edges].all(axis=2).any(axis=1)
+
+    def _observation(self):
+        """Encodes the games as the edges of player 1 then of player 2."""
+        return np.concatenate([self.colours == 1, self.colours == 2],
+                              axis=1).astype(np.int8)
+
+    def action_masks(self):
+        """Whether each action places a free edge, for every game."""
+        return self.colours == 0
+
+    def reset(self):
+        """Resets all the games."""
+        self.colours[:] = 0
+        self.current_player[:] = 1
+        self.rewards[:] = 0
+        self.clique_counts[:] = 0
+        return self._observation()
+
+    def step_async(self, actions):
+        """Stores the actions to be played by step_wait()."""
+        self.actions = np.asarray(actions,
+                                  dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        """Places an edge in every game and resets the finished ones.
+
+        The rewards and done flags follow RamseyGameMultiplayer._get_reward():
+        every step costs 1 (or the count reward of every game is computed in
+        one batch), placing an edge that is already in the graph ends
+        the game with a penalty, and the game also ends when the player who
+        is next to play has a k_clique or when the board is full.
+        """
+        placed = self.colours[self.env_indices, self.actions]
+        self.colours[self.env_indices, self.actions] = self.current_player
+        self.current_player = 3 - self.current_player
+
+        if self.reward_mode == 'clique':
+            self.rewards -= 1
+            rewards = self.rewards.astype(np.float32)
+        else:
+            rewards = self._count_rewards()
+
+        # Penalty for not adding an edge.
+        not_added = placed > 0
+        rewards[not_added] -= self.n_edges * 10
+
+        dones = not_added | self._has_k_clique(self.current_player)
+        # A full board is a draw.
+        dones |= ~(self.colours == 0).any(axis=1)
+
+        observations = self._observation()
+        infos = [{} for _ in range(self.num_envs)]
+        for env_index in np.flatnonzero(dones):
+            infos[env_index]['terminal_observation'] = \
+                observations[env_index].copy()
+        self.colours[dones] = 0
+        self.current_player[dones] = 1
+        self.rewards[dones] = 0
+        self.clique_counts[dones] = 0
+        observations[dones] = 0
+        return observations, rewards, dones, infos
+
+    def _count_rewards(self):
+        """Count rewards of all the games, see RamseyGameMultiplayer."""
+        counts = clique_counts.monochromatic_counts(self.colours, self.n_nodes,
+                                                    self.count_clique,
+                                                    (1, 2)).sum(axis=1)
+        if self.reward_mode == 'count':
+            rewards = -counts
+        else:
+            rewards = self.clique_counts - counts
+        self.clique_counts = counts
+        return rewards.astype(np.float32)
+
+    def close(self):
+        """Nothing to release, the games live in this process."""
+
+    def seed(self, seed=None):
+        """Records consecutive seeds for the games.
+
+        The games draw no random numbers, so the seeds only identify them.
+        """
+        self.seeds = [
+            None if seed is None else seed + index
+            for index in range(self.num_envs)
+        ]
+        return self.seeds
+
+    def _check_all_games(self, indices, name):
+        """Raises if indices do not select every game of the batch."""
+        if sorted(self._get_indices(indices)) != list(range(self.num_envs)):
+            raise ValueError(
+                f'{name} is shared by all the games, it cannot be used for '
+                'only some of them.')
+
+    def get_attr(self, attr_name, indices=None):
+        """Gets an attribute for every requested game.
+
+        The attributes in PER_GAME_ATTRIBUTES are indexed by game, the other
+        ones are shared by all the games.
+        """
+        value = getattr(self, attr_name)
+        indices = self._get_indices(indices)
+        if attr_name in PER_GAME_ATTRIBUTES:
+            return [value[index] for index in indices]
+        return [value] * len(indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        """Sets an attribute for the requested games, see get_attr()."""
+        if attr_name in PER_GAME_ATTRIBUTES:
+            getattr(self, attr_name)[list(self._get_indices(indices))] = value
+        else:
+            self._check_all_games(indices, attr_name)
+            setattr(self, attr_name, value)
+
+    def env_method(self,
+                   method_name,
+                   *method_args,
+                   indices=None,
+                   **method_kwargs):
+        """Calls a method of the batch, returning its result per game.
+
+        Only action_masks() can be called for some of the games, the other
+        methods act on the whole batch.
+        """
+        if method_name == 'action_masks':
+            # sb3-contrib stacks the action masks of every game.
+            masks = self.action_masks()
+            return [masks[index] for index in self._get_indices(indices)]
+        self._check_all_games(indices, method_name)
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result] * self.num_envs
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        """The games are not gym environments, so they are never wrapped."""
+        del wrapper_class  # Unused.
+        return [False] * len(self._get_indices(indices))
@@ -0,0 +1,361 @@
+"""SubprocVecEnv with the step results in shared memory.
+
+SubprocVecEnv sends the actions to its workers, and the observations, rewards,
+dones and infos back, pickled through a pipe on every step. For the small
+observations of the Ramsey games, pickling dominates the cost of a step.
+
+SharedMemoryVecEnv keeps the actions, observations, rewards and dones of all
+the games in NumPy arrays backed by multiprocessing.shared_memory. On a step,
+the main process writes the actions and releases a semaphore per worker; the
+workers step their games, write the results in place and release a semaphore
+back. Only the rare non-empty infos (e.g. the episode statistics of Monitor
+at the end of an episode) and the other VecEnv methods go through a pipe.
+
+Every worker steps a contiguous group of games, one game per worker by
+default, like SubprocVecEnv.
+
+An exception raised by a game in a worker is sent through its pipe, and raised
+again in the main process by the call waiting for the worker. The worker then
+exits.
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+import pickle
+import traceback
+
+import numpy as np
+from stable_baselines3.common.env_util import is_wrapped
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper
+
+# Commands of a worker, read from the shared commands array when its
+# semaphore is released.
+_STEP = 0
+_PIPE_COMMAND = 1
+_CLOSE = 2
+
+# Seconds between two checks that a worker is alive while waiting for it.
+_POLL_SECONDS = 1.0
+
+
+def _shared_array(shape, dtype, name=None):
+    """NumPy array in a new, or the named, shared memory block."""
+    n_bytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    if name is None:
+        memory = shared_memory.SharedMemory(create=True, size=n_bytes)
+    else:
+        memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+class _Buffers:
+    """Shared arrays of the step inputs and results of every game."""
+
+    def __init__(self, specs, names=None):
+        """Creates the arrays, or attaches to the ones with the given names.
+
+        Args:
+            specs: Dictionary from the name of every array to its shape and
+                dtype.
+            names: Dictionary from the name of every array to the name of its
+                shared memory block, None to create them.
+        """
+        self.specs = specs
+        self._memories = {}
+        self._arrays = {}
+        for key, (shape, dtype) in specs.items():
+            memory, array = _shared_array(shape, dtype,
+                                          names[key] if names else None)
+            self._memories[key] = memory
+            self._arrays[key] = array
+
+    def __getitem__(self, key):
+        return self._arrays[key]
+
+    def names(self):
+        """Names of the shared memory blocks, to attach to them."""
+        return {key: memory.name for key, memory in self._memories.items()}
+
+    def close(self, unlink=False):
+        """Detaches from the arrays, freeing them if unlink is set."""
+        # The arrays must be released before their memory is closed.
+        self._arrays.clear()
+        for memory in self._memories.values():
+            memory.close()
+            if unlink:
+                memory.unlink()
+
+
+class _WorkerError:
+    """Exception of a worker and its traceback, sent to the main process."""
+
+    def __init__(self, error):
+        self.traceback = traceback.format_exc()
+        try:
+            pickle.dumps(error)
+            self.error = error
+        except Exception:  # pylint: disable=broad-except
+            self.error = RuntimeError(repr(error))
+
+
+def _step_games(envs, buffers, first_env):
+    """Steps the games of a worker, resetting the finished ones.
+
+    Returns:
+        The infos of the games.
+    """
+    infos = []
+    for env_index, env in enumerate(envs, start=first_env):
+        observation, reward, done, info = env.step(
+            buffers['actions'][env_index])
+        if done:
+            buffers['terminal_observations'][env_index] = observation
+            observation = env.reset()
+        buffers['observations'][env_index] = observation
+        buffers['rewards'][env_index] = reward
+        buffers['dones'][env_index] = done
+        infos.append(info)
+    return infos
+
+
+def _call_games(envs, buffers, first_env, command):
+    """Runs a command received through the pipe on some games of a worker."""
+    method_name, env_offsets, args, kwargs = command
+    results = []
+    for offset in env_offsets:
+        env = envs[offset]
+        if method_name == 'reset':
+            buffers['observations'][first_env + offset] = env.reset()
+            results.append(None)
+        elif method_name == 'get_attr':
+            results.append(getattr(env, args[0]))
+        elif method_name == 'set_attr':
+            results.append(setattr(env, args[0], args[1]))
+        elif method_name == 'is_wrapped':
+            results.append(is_wrapped(env, args[0]))
+        else:
+            results.append(getattr(env, method_name)(*args, **kwargs))
+    return results
+
+
+def _worker(worker_index, env_fns_wrapper, first_env, specs, names, step_ready,
+            step_done, pipe):
+    """Steps a group of games, writing the results in the shared buffers."""
+    envs = [env_fn() for env_fn in env_fns_wrapper.var]
+    buffers = _Buffers(specs, names)
+    try:
+        while True:
+            step_ready.acquire()
+            command = buffers['commands'][worker_index]
+            if command == _STEP:
+                try:
+                    infos = _step_games(envs, buffers, first_env)
+                except Exception as error:
+                    # The main process reads the error like the infos.
+                    buffers['info_flags'][worker_index] = True
+                    step_done.release()
+                    pipe.send(_WorkerError(error))
+                    raise
+                has_infos = any(infos)
+                buffers['info_flags'][worker_index] = has_infos
+                step_done.release()
+                # Sent after the release, so that big infos cannot fill the
+                # pipe before the main process reads it.
+                if has_infos:
+                    pipe.send(infos)
+            elif command == _PIPE_COMMAND:
+                try:
+                    results = _call_games(envs, buffers, first_env, pipe.recv())
+                except Exception as error:
+                    pipe.send(_WorkerError(error))
+                    raise
+                pipe.send(results)
+            else:
+                break
+    finally:
+        for env in envs:
+            env.close()
+        buffers.close()
+        pipe.close()
+
+
+class SharedMemoryVecEnv(VecEnv):
+    """Runs games in worker processes, sharing their results in memory."""
+
+    def __init__(self, env_fns, n_workers=None, start_method=None):
+        """Starts the workers.
+
+        Args:
+            env_fns: Functions creating the environments, as for
+                SubprocVecEnv. The first one is also called in this process to
+                read the observation and action spaces.
+            n_workers: Number of worker processes, one per game by default.
+            start_method: Start method of the workers, defaults to forkserver
+                if available and spawn otherwise, like SubprocVecEnv.
+        """
+        env = env_fns[0]()
+        observation_space = env.observation_space
+        action_space = env.action_space
+        env.close()
+        super().__init__(len(env_fns), observation_space, action_space)
+
+        n_envs = len(env_fns)
+        n_workers = min(n_workers or n_envs, n_envs)
+        self.specs = {
+            'actions': ((n_envs,) + action_space.shape, action_space.dtype),
+            'observations': (
+                (n_envs,) + observation_space.shape, observation_space.dtype),
+            'terminal_observations': (
+                (n_envs,) + observation_space.shape, observation_space.dtype),
+            'rewards': ((n_envs,), np.float32),
+            'dones': ((n_envs,), bool),
+            'commands': ((n_workers,), np.int64),
+            'info_flags': ((n_workers,), bool),
+        }
+        self.buffers = _Buffers(self.specs)
+
+        if start_method is None:
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                start_method = 'forkserver'
+            else:
+                start_method = 'spawn'
+        context = multiprocessing.get_context(start_method)
+
+        # Contiguous groups of games, the first ones one game bigger.
+        group_sizes = [
+            n_envs // n_workers + (worker < n_envs % n_workers)
+            for worker in range(n_workers)
+        ]
+        self.first_envs = np.cumsum([0] + group_sizes[:-1]).tolist()
+        self.env_workers = np.repeat(np.arange(n_workers), group_sizes)
+        self.step_ready = []
+        self.step_done = []
+        self.pipes = []
+        self.processes = []
+        for worker in range(n_workers):
+            first_env = self.first_envs[worker]
+            env_group = env_fns[first_env:first_env + group_sizes[worker]]
+            step_ready = context.Semaphore(0)
+            step_done = context.Semaphore(0)
+            pipe, worker_pipe = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(worker,
+                      CloudpickleWrapper(env_group), first_env, self.specs,
+                      self.buffers.names(), step_ready, step_done, worker_pipe),
+                daemon=True)
+            process.start()
+            worker_pipe.close()
+            self.step_ready.append(step_ready)
+            self.step_done.append(step_done)
+            self.pipes.append(pipe)
+            self.processes.append(process)
+        self.closed = False
+
+    def _receive(self, worker):
+        """Receives a message of a worker, raising the errors it sends."""
+        message = self.pipes[worker].recv()
+        if isinstance(message, _WorkerError):
+            raise message.error from RuntimeError(
+                f'Worker {worker} failed:\n{message.traceback}')
+        return message
+
+    def _call(self, method_name, indices=None, args=(), kwargs=None):
+        """Calls a method of the games through the pipes of their workers."""
+        indices = list(self._get_indices(indices))
+        workers = sorted({self.env_workers[index] for index in indices})
+        for worker in workers:
+            offsets = [
+                index - self.first_envs[worker]
+                for index in indices
+                if self.env_workers[index] == worker
+            ]
+            self.buffers['commands'][worker] = _PIPE_COMMAND
+            self.step_ready[worker].release()
+            self.pipes[worker].send((method_name, offsets, args, kwargs or {}))
+        results = {}
+        for worker in workers:
+            worker_indices = [
+                index for index in indices if self.env_workers[index] == worker
+            ]
+            results.update(zip(worker_indices, self._receive(worker)))
+        return [results[index] for index in indices]
+
+    def reset(self):
+        """Resets all the games."""
+        self._call('reset')
+        return self.buffers['observations'].copy()
+
+    def step_async(self, actions):
+        """Writes the actions and wakes up the workers."""
+        self.buffers['actions'][:] = np.asarray(actions).reshape(
+            self.buffers['actions'].shape)
+        self.buffers['commands'][:] = _STEP
+        for step_ready in self.step_ready:
+            step_ready.release()
+
+    def step_wait(self):
+        """Waits for the workers and reads the step results.
+
+        The results are copied out of the shared buffers, since the next step
+        overwrites them while the caller (e.g. a rollout buffer) may still
+        hold the previous observations.
+        """
+        infos = [{} for _ in range(self.num_envs)]
+        for worker, step_done in enumerate(self.step_done):
+            while not step_done.acquire(timeout=_POLL_SECONDS):
+                if not self.processes[worker].is_alive():
+                    raise EOFError(f'Worker {worker} died during a step.')
+            if self.buffers['info_flags'][worker]:
+                first_env = self.first_envs[worker]
+                worker_infos = self._receive(worker)
+                infos[first_env:first_env + len(worker_infos)] = worker_infos
+        dones = self.buffers['dones'].copy()
+        for env_index in np.flatnonzero(dones):
+            infos[env_index]['terminal_observation'] = \
+                self.buffers['terminal_observations'][env_index].copy()
+        return (self.buffers['observations'].copy(),
+                self.buffers['rewards'].copy(), dones, infos)
+
+    def close(self):
+        """Stops the workers and frees the shared buffers."""
+        if self.closed:
+            return
+        self.buffers['commands'][:] = _CLOSE
+        for step_ready in self.step_ready:
+            step_ready.release()
+        for process in self.processes:
+            process.join()
+        for pipe in self.pipes:
+            pipe.close()
+        self.buffers.close(unlink=True)
+        self.closed = True
+
+    def seed(self, seed=None):
+        """Seeds every game with consecutive seeds."""
+        return [
+            self._call('seed', [index],
+                       (None if seed is None else seed + index,))[0]
+            for index in range(self.num_envs)
+        ]
+
+    def get_attr(self, attr_name, indices=None):
+        """Gets an attribute of the games."""
+        return self._call('get_attr', indices, (attr_name,))
+
+    def set_attr(self, attr_name, value, indices=None):
+        """Sets an attribute of the games."""
+        self._call('set_attr', indices, (attr_name, value))
+
+    def env_method(self,
+                   method_name,
+                   *method_args,
+                   indices=None,
+                   **method_kwargs):
+        """Calls a method of the games."""
+        return self._call(method_name, indices, method_args, method_kwargs)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        """Whether the games are wrapped by wrapper_class."""
+        return self._call('is_wrapped', indices, (wrapper_class,))
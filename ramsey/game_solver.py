@@ -0,0 +1,233 @@
+"""Exact solver for the two player Ramsey game.
+
+In RamseyGameMultiplayer, two players take turns claiming the free edges of
+the complete graph with n_nodes, player 1 first. The solver plays the first
+variant of the game (see ramsey.envs.ramsey_env): the first player to claim
+all the edges of a k_clique wins, and the game is a draw when every edge is
+claimed without one. With misere=True, completing a k_clique loses instead.
+
+Positions are solved with a negamax alpha-beta search:
+- A move can only complete the k_cliques that contain it, so whether it wins
+is checked on the common neighbourhood of its endpoints, see ramsey.cliques.
+- Moves that win at once are tried first, then the moves that take an edge
+the opponent would win with.
+- Solved positions are stored in a transposition table keyed by the canonical
+form of the two players' edges (see ramsey.canonical), so positions that only
+differ by a relabelling of the nodes are solved once.
+
+Values are from the point of view of the player to move: 1 for a win, 0 for a
+draw and -1 for a loss.
+"""
+
+import numbers
+
+from ramsey import canonical
+from ramsey import cliques
+from ramsey import encoders
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+# Bounds stored in the transposition table.
+_EXACT = 0
+_LOWER = 1
+_UPPER = 2
+
+
+class GameSolver:
+    """Solves positions of the Ramsey game with perfect play."""
+
+    def __init__(self, n_nodes, k_clique, misere=False, symmetry=True):
+        """Inits the solver.
+
+        Args:
+            n_nodes: Number of nodes of the complete graph.
+            k_clique: Size of the cliques that end the game.
+            misere: Whether completing a k_clique loses instead of winning.
+            symmetry: Whether positions equal up to a relabelling of the
+                nodes share their transposition table entry.
+        """
+        self.n_nodes = n_nodes
+        self.k_clique = k_clique
+        self.misere = misere
+        self.symmetry = symmetry
+        self.n_edges = n_nodes * (n_nodes - 1) // 2
+        self.edges = [
+            encoders.index_edge(n_nodes, index) for index in range(self.n_edges)
+        ]
+        self.table = {}
+        self.nodes_searched = 0
+
+    def position(self, player_edges):
+        """Adjacency bitmasks of both players from their lists of edges.
+
+        Args:
+            player_edges: Two lists of edges (i, j), or of edge indices, for
+                player 1 and player 2.
+        """
+        adjacencies = ([0] * self.n_nodes, [0] * self.n_nodes)
+        for adjacency, edges in zip(adjacencies, player_edges):
+            for edge in edges:
+                if isinstance(edge, numbers.Integral):
+                    edge = self.edges[edge]
+                node_u, node_v = edge
+                adjacency[node_u] |= 1 << node_v
+                adjacency[node_v] |= 1 << node_u
+        return adjacencies
+
+    def env_position(self, env):
+        """Position of a RamseyGameMultiplayer environment."""
+        return tuple(list(env.state.adjacency[player]) for player in (1, 2))
+
+    def _key(self, adjacencies):
+        """Transposition table key of a position."""
+        if self.symmetry:
+            return canonical.canonical_form(adjacencies, self.n_nodes)
+        return tuple(tuple(adjacency) for adjacency in adjacencies)
+
+    def _completes_clique(self, adjacency, edge):
+        """Whether claiming edge completes a k_clique in adjacency."""
+        node_u, node_v = edge
+        return cliques.has_clique(adjacency,
+                                  adjacency[node_u] & adjacency[node_v],
+                                  self.k_clique - 2)
+
+    def _free_edges(self, adjacencies):
+        """Indices of the edges claimed by neither player."""
+        first, second = adjacencies
+        return [
+            index for index, (node_u, node_v) in enumerate(self.edges)
+            if not (first[node_u] | second[node_u]) >> node_v & 1
+        ]
+
+    def _ordered_moves(self, adjacencies, mover, free_edges):
+        """Free edges, the ones deciding the game first.
+
+        Returns:
+            Whether the mover completes a k_clique with one of the moves, and
+            the moves in search order.
+        """
+        completing = []
+        blocking = []
+        others = []
+        for index in free_edges:
+            edge = self.edges[index]
+            if self._completes_clique(adjacencies[mover], edge):
+                completing.append(index)
+            elif self._completes_clique(adjacencies[1 - mover], edge):
+                blocking.append(index)
+            else:
+                others.append(index)
+        if self.misere:
+            # Completing a k_clique loses, so it is the last resort.
+            return bool(completing), blocking + others + completing
+        return bool(completing), completing + blocking + others
+
+    def _negamax(self, adjacencies, mover, free_edges, alpha, beta):
+        """Value of a position for the player to move."""
+        self.nodes_searched += 1
+        if not free_edges:
+            return DRAW
+
+        key = self._key(adjacencies)
+        entry = self.table.get(key)
+        if entry is not None:
+            value, bound = entry
+            if bound == _EXACT:
+                return value
+            if bound == _LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        can_complete, moves = self._ordered_moves(adjacencies, mover,
+                                                  free_edges)
+        if can_complete and not self.misere:
+            self.table[key] = (WIN, _EXACT)
+            return WIN
+
+        original_alpha = alpha
+        best = LOSS - 1
+        adjacency = adjacencies[mover]
+        for index in moves:
+            node_u, node_v = self.edges[index]
+            if self.misere and self._completes_clique(adjacency,
+                                                      (node_u, node_v)):
+                value = LOSS
+            else:
+                adjacency[node_u] |= 1 << node_v
+                adjacency[node_v] |= 1 << node_u
+                remaining = [edge for edge in free_edges if edge != index]
+                value = -self._negamax(adjacencies, 1 - mover, remaining, -beta,
+                                       -alpha)
+                adjacency[node_u] &= ~(1 << node_v)
+                adjacency[node_v] &= ~(1 << node_u)
+            best = max(best, value)
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best <= original_alpha:
+            self.table[key] = (best, _UPPER)
+        elif best >= beta:
+            self.table[key] = (best, _LOWER)
+        else:
+            self.table[key] = (best, _EXACT)
+        return best
+
+    def _mover(self, adjacencies):
+        """Index of the player to move: player 1 moves first."""
+        n_first, n_second = (
+            sum(bin(neighbours).count('1')
+                for neighbours in adjacency) // 2
+            for adjacency in adjacencies)
+        return 0 if n_first == n_second else 1
+
+    def solve(self, adjacencies=None):
+        """Value of a position for the player to move.
+
+        Args:
+            adjacencies: Adjacency bitmasks of player 1 and player 2, see
+                position(). Defaults to the empty board.
+        """
+        if adjacencies is None:
+            adjacencies = self.position(((), ()))
+        adjacencies = [list(adjacency) for adjacency in adjacencies]
+        return self._negamax(adjacencies, self._mover(adjacencies),
+                             self._free_edges(adjacencies), LOSS, WIN)
+
+    def move_values(self, adjacencies=None):
+        """Value of every free edge for the player to move.
+
+        Returns:
+            A dictionary from the index of every free edge to the value of the
+            game, for the player to move, after she claims it.
+        """
+        if adjacencies is None:
+            adjacencies = self.position(((), ()))
+        adjacencies = [list(adjacency) for adjacency in adjacencies]
+        mover = self._mover(adjacencies)
+        free_edges = self._free_edges(adjacencies)
+        values = {}
+        for index in free_edges:
+            edge = self.edges[index]
+            if self._completes_clique(adjacencies[mover], edge):
+                values[index] = LOSS if self.misere else WIN
+                continue
+            node_u, node_v = edge
+            adjacencies[mover][node_u] |= 1 << node_v
+            adjacencies[mover][node_v] |= 1 << node_u
+            remaining = [other for other in free_edges if other != index]
+            values[index] = -self._negamax(adjacencies, 1 - mover, remaining,
+                                           LOSS, WIN)
+            adjacencies[mover][node_u] &= ~(1 << node_v)
+            adjacencies[mover][node_v] &= ~(1 << node_u)
+        return values
+
+    def best_move(self, adjacencies=None):
+        """Index of a free edge with the best value for the player to move."""
+        values = self.move_values(adjacencies)
+        return max(values, key=values.get)
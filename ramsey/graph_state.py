@@ -0,0 +1,176 @@
+"""Compact graph state for the ramsey environments.
+
+Building a networkx graph on every step is dominated by the allocation of its
+dict-of-dicts storage. Instead, the environments keep, for every colour, one
+adjacency bitmask per node: bit j of adjacency[colour][i] is set when the edge
+(i, j) has that colour. An edge has at most one colour, so the colours of a
+complete graph partition its edges.
+
+A networkx graph is only built on demand, see GraphState.to_networkx(), and
+networkx is only imported then.
+"""
+
+from ramsey import cliques
+
+
+class GraphState:
+    """Edge colouring of a graph with n_nodes stored as adjacency bitmasks."""
+
+    def __init__(self, n_nodes, colours=(1,)):
+        """Inits an empty graph state.
+
+        Args:
+            n_nodes: Number of nodes of the graph.
+            colours: Labels of the edge colours. The multiplayer game uses the
+                player number as the colour of an edge.
+        """
+        self.n_nodes = n_nodes
+        self.colours = tuple(colours)
+        self.full_mask = (1 << n_nodes) - 1
+        self.clear()
+
+    def clear(self):
+        """Removes all the edges of the graph."""
+        self.adjacency = {colour: [0] * self.n_nodes for colour in self.colours}
+        self.n_colour_edges = dict.fromkeys(self.colours, 0)
+
+    def copy(self):
+        """Returns a copy of the graph state."""
+        state = GraphState.__new__(GraphState)
+        state.n_nodes = self.n_nodes
+        state.colours = self.colours
+        state.full_mask = self.full_mask
+        state.adjacency = {
+            colour: list(adjacency)
+            for colour, adjacency in self.adjacency.items()
+        }
+        state.n_colour_edges = dict(self.n_colour_edges)
+        return state
+
+    def edge_colour(self, node_u, node_v):
+        """Returns the colour of the edge (node_u, node_v), None if absent."""
+        bit = 1 << node_v
+        for colour, adjacency in self.adjacency.items():
+            if adjacency[node_u] & bit:
+                return colour
+        return None
+
+    def has_edge(self, node_u, node_v, colour=None):
+        """Whether the edge exists, optionally with the given colour."""
+        if colour is None:
+            return self.edge_colour(node_u, node_v) is not None
+        return bool(self.adjacency[colour][node_u] >> node_v & 1)
+
+    def add_edge(self, node_u, node_v, colour=None):
+        """Adds an edge with the given colour, recolouring it if present.
+
+        Returns:
+            The previous colour of the edge, None if it was not in the graph.
+        """
+        if colour is None:
+            colour = self.colours[0]
+        previous_colour = self.edge_colour(node_u, node_v)
+        if previous_colour == colour:
+            return previous_colour
+        if previous_colour is not None:
+            self._unset(node_u, node_v, previous_colour)
+        adjacency = self.adjacency[colour]
+        adjacency[node_u] |= 1 << node_v
+        adjacency[node_v] |= 1 << node_u
+        self.n_colour_edges[colour] += 1
+        return previous_colour
+
+    def remove_edge(self, node_u, node_v):
+        """Removes an edge from the graph, returning its previous colour."""
+        previous_colour = self.edge_colour(node_u, node_v)
+        if previous_colour is not None:
+            self._unset(node_u, node_v, previous_colour)
+        return previous_colour
+
+    def _unset(self, node_u, node_v, colour):
+        """Clears the bits of an edge known to have the given colour."""
+        adjacency = self.adjacency[colour]
+        adjacency[node_u] &= ~(1 << node_v)
+        adjacency[node_v] &= ~(1 << node_u)
+        self.n_colour_edges[colour] -= 1
+
+    def number_of_edges(self, colour=None):
+        """Number of edges in the graph, or of the given colour."""
+        if colour is None:
+            return sum(self.n_colour_edges.values())
+        return self.n_colour_edges[colour]
+
+    def edges(self, colour=None):
+        """Iterates over the edges (i, j), i < j, in the encoder ordering."""
+        adjacency = self.mask_adjacency(colour)
+        for node_u in range(self.n_nodes):
+            neighbours = adjacency[node_u] >> (node_u + 1)
+            node_v = node_u + 1
+            while neighbours:
+                if neighbours & 1:
+                    yield node_u, node_v
+                neighbours >>= 1
+                node_v += 1
+
+    def mask_adjacency(self, colour=None):
+        """Adjacency bitmasks of one colour, or of all the edges if None."""
+        if colour is not None:
+            return self.adjacency[colour]
+        adjacency = [0] * self.n_nodes
+        for colour_adjacency in self.adjacency.values():
+            for node, neighbours in enumerate(colour_adjacency):
+                adjacency[node] |= neighbours
+        return adjacency
+
+    def complement_adjacency(self, colour=None):
+        """Adjacency bitmasks of the complement of a colour class."""
+        return cliques.complement(self.mask_adjacency(colour), self.full_mask)
+
+    def non_isolated_nodes(self, colour=None):
+        """Bitmask of the nodes with at least one edge."""
+        mask = 0
+        for node, neighbours in enumerate(self.mask_adjacency(colour)):
+            if neighbours:
+                mask |= 1 << node
+        return mask
+
+    def clique_number(self, colour=None, nodes=None, limit=None):
+        """Size of the biggest clique of a colour class.
+
+        Args:
+            colour: The colour class, or all the edges if None.
+            nodes: Bitmask of the nodes of the (induced) subgraph to search.
+                Defaults to all the nodes, like networkx.empty_graph(n).
+            limit: If set, stop at the first clique of this size and return
+                at most limit.
+        """
+        if nodes is None:
+            nodes = self.full_mask
+        return cliques.clique_number(self.mask_adjacency(colour), nodes, limit)
+
+    def clique_number_through_edge(self,
+                                   node_u,
+                                   node_v,
+                                   colour=None,
+                                   limit=None):
+        """Size of the biggest clique of a colour class containing an edge."""
+        return cliques.clique_number_through_edge(self.mask_adjacency(colour),
+                                                  node_u, node_v, limit)
+
+    def to_networkx(self, colour=None, attribute=None):
+        """Materialises the graph, or a colour class, as a networkx graph.
+
+        Args:
+            colour: Only add the edges of this colour if not None.
+            attribute: If set, edges store their colour under this name.
+        """
+        import networkx  # pylint: disable=import-outside-toplevel
+        graph = networkx.empty_graph(self.n_nodes)
+        colours = self.colours if colour is None else (colour,)
+        for edge_colour in colours:
+            for edge in self.edges(edge_colour):
+                if attribute is None:
+                    graph.add_edge(*edge)
+                else:
+                    graph.add_edge(*edge, **{attribute: edge_colour})
+        return graph
@@ -0,0 +1,218 @@
+"""Local search for Ramsey counterexamples.
+
+Instead of building a colouring edge by edge (see ramsey.search), local search
+starts from a random 2-colouring of the complete graph and flips the colour of
+one edge at a time, trying to bring the number of monochromatic k_cliques down
+to zero. A colouring with no monochromatic k_clique is a counterexample.
+
+For every k_clique, the search maintains the number of its edges with colour
+1: the clique is monochromatic when this number is 0 or C(k_clique, 2).
+Flipping an edge only changes the cliques that contain it, which are read from
+the edge to cliques index of ramsey.clique_tables. The search also maintains
+the change in the number of monochromatic cliques of every possible flip: a
+flip only changes it for the edges sharing a clique with the flipped edge, so
+it is updated in O(C(n_nodes - 2, k_clique - 2) * C(k_clique, 2)) per flip
+and every move is evaluated in O(1).
+
+Three strategies are available:
+- 'anneal': simulated annealing over random single edge flips.
+- 'tabu': takes the best flip that is not tabu, i.e. did not flip the same
+edge recently, unless it improves on the best colouring found.
+- 'restart': steepest descent, restarting from a random colouring at local
+minima.
+"""
+
+import math
+
+import numpy as np
+
+from ramsey import clique_tables
+
+
+class LocalSearch:
+    """Searches for a counterexample by flipping edge colours."""
+
+    def __init__(self, n_nodes, k_clique, seed=None):
+        """Inits the search with a random colouring."""
+        self.n_nodes = n_nodes
+        self.k_clique = k_clique
+        self.n_edges = n_nodes * (n_nodes - 1) // 2
+        self.n_clique_edges = k_clique * (k_clique - 1) // 2
+        self.clique_edges = clique_tables.clique_edge_indices(n_nodes, k_clique)
+        self.edge_cliques = clique_tables.edge_clique_indices(n_nodes, k_clique)
+        self.rng = np.random.default_rng(seed)
+
+        self.flips = 0
+        self.restarts = 0
+        self.randomize()
+
+    def randomize(self):
+        """Starts again from a uniformly random colouring."""
+        self.colours = self.rng.integers(0, 2, self.n_edges, dtype=np.int8)
+        self.ones = self.colours[self.clique_edges].sum(axis=1, dtype=np.int64)
+        self.n_monochromatic = int(self._monochromatic(self.ones).sum())
+        self.deltas = self.flip_deltas()
+        self.best_colours = self.colours.copy()
+        self.best_n_monochromatic = self.n_monochromatic
+
+    def _monochromatic(self, ones):
+        """Whether cliques with the given number of colour 1 edges are."""
+        return (ones == 0) | (ones == self.n_clique_edges)
+
+    def flip_deltas(self):
+        """Change in the number of monochromatic cliques for every flip.
+
+        Recounted from the clique counts, whereas self.deltas is maintained
+        incrementally.
+        """
+        ones = self.ones[self.edge_cliques]
+        steps = np.where(self.colours == 1, -1, 1)[:, None]
+        return (self._monochromatic(ones + steps).sum(axis=1) -
+                self._monochromatic(ones).sum(axis=1))
+
+    def _clique_deltas(self, cliques):
+        """Edges of cliques, and how flipping each changes its clique.
+
+        Returns:
+            The (len(cliques), C(k_clique, 2)) array of the edges of the
+            cliques, and the array of the change in the number of
+            monochromatic cliques, among the given ones, of flipping each.
+        """
+        edges = self.clique_edges[cliques]
+        ones = self.ones[cliques][:, None]
+        steps = np.where(self.colours[edges] == 1, -1, 1)
+        return edges, (self._monochromatic(ones + steps).astype(np.int64) -
+                       self._monochromatic(ones))
+
+    def flip(self, edge):
+        """Flips the colour of an edge, updating the counts and deltas."""
+        cliques = self.edge_cliques[edge]
+        edges, old_deltas = self._clique_deltas(cliques)
+        self.n_monochromatic += int(self.deltas[edge])
+        if self.colours[edge]:
+            self.ones[cliques] -= 1
+        else:
+            self.ones[cliques] += 1
+        self.colours[edge] ^= 1
+        _, new_deltas = self._clique_deltas(cliques)
+        np.add.at(self.deltas, edges.ravel(), (new_deltas - old_deltas).ravel())
+        self.flips += 1
+        if self.n_monochromatic < self.best_n_monochromatic:
+            self.best_n_monochromatic = self.n_monochromatic
+            self.best_colours = self.colours.copy()
+
+    def _restart(self):
+        """Restarts from a random colouring, keeping the best one found."""
+        best_colours = self.best_colours
+        best_n_monochromatic = self.best_n_monochromatic
+        self.randomize()
+        self.restarts += 1
+        if best_n_monochromatic < self.best_n_monochromatic:
+            self.best_colours = best_colours
+            self.best_n_monochromatic = best_n_monochromatic
+
+    def _anneal(self, max_flips, temperature, cooling, restart_flips):
+        """Simulated annealing, reheating on every restart."""
+        current_temperature = temperature
+        last_improvement = self.flips
+        best_n_monochromatic = self.best_n_monochromatic
+        edges = self.rng.integers(0, self.n_edges, max_flips)
+        thresholds = self.rng.random(max_flips)
+        for edge, threshold in zip(edges, thresholds):
+            if self.n_monochromatic == 0:
+                return
+            delta = self.deltas[edge]
+            if delta <= 0 or \
+                    threshold < math.exp(-delta / current_temperature):
+                self.flip(edge)
+            else:
+                self.flips += 1
+            current_temperature = max(current_temperature * cooling, 1e-3)
+
+            if self.best_n_monochromatic < best_n_monochromatic:
+                best_n_monochromatic = self.best_n_monochromatic
+                last_improvement = self.flips
+            elif self.flips - last_improvement > restart_flips:
+                self._restart()
+                current_temperature = temperature
+                last_improvement = self.flips
+
+    def _tabu(self, max_flips, tabu_tenure):
+        """Tabu search with aspiration on the best colouring found."""
+        tabu_until = np.zeros(self.n_edges, dtype=np.int64)
+        for _ in range(max_flips):
+            if self.n_monochromatic == 0:
+                return
+            deltas = self.deltas
+            allowed = (tabu_until <= self.flips) | (
+                self.n_monochromatic + deltas < self.best_n_monochromatic)
+            if not allowed.any():
+                allowed[:] = True
+            deltas = np.where(allowed, deltas, np.iinfo(deltas.dtype).max)
+            candidates = np.flatnonzero(deltas == deltas.min())
+            edge = self.rng.choice(candidates)
+            tabu_until[edge] = self.flips + tabu_tenure + self.rng.integers(
+                0, tabu_tenure + 1)
+            self.flip(edge)
+
+    def _descend(self, max_flips, restart_flips):
+        """Steepest descent, restarting at local minima.
+
+        Flips that leave the number of monochromatic cliques unchanged are
+        allowed for restart_flips flips in a row before restarting.
+        """
+        sideways_flips = 0
+        for _ in range(max_flips):
+            if self.n_monochromatic == 0:
+                return
+            deltas = self.deltas
+            best_delta = deltas.min()
+            if best_delta > 0 or sideways_flips >= restart_flips:
+                self._restart()
+                sideways_flips = 0
+                continue
+            sideways_flips = sideways_flips + 1 if best_delta == 0 else 0
+            edge = self.rng.choice(np.flatnonzero(deltas == best_delta))
+            self.flip(edge)
+
+    def run(self,
+            mode='anneal',
+            max_flips=1000000,
+            temperature=0.3,
+            cooling=1.0,
+            tabu_tenure=None,
+            restart_flips=None):
+        """Runs the local search until a counterexample is found.
+
+        Args:
+            mode: One of 'anneal', 'tabu' or 'restart', see the module
+                docstring.
+            max_flips: Maximum number of flips (or rejected flips).
+            temperature: Initial temperature of the annealing. The defaults,
+                a constant temperature of 0.3, find the colourings of the
+                complete graph with 17 nodes without monochromatic 4-cliques
+                within a few hundred thousand flips.
+            cooling: Factor applied to the temperature after every flip.
+            tabu_tenure: Minimum number of flips during which a flipped edge
+                is tabu. Defaults to a tenth of the edges.
+            restart_flips: Number of flips without improvement before a
+                restart. Defaults to 150 times the number of edges for
+                annealing and to the number of edges for steepest descent.
+
+        Returns:
+            The counterexample, as an array with the colour of every edge, or
+            None if it was not found within max_flips.
+        """
+        if mode == 'anneal':
+            self._anneal(max_flips, temperature, cooling, restart_flips or
+                         150 * self.n_edges)
+        elif mode == 'tabu':
+            self._tabu(max_flips, tabu_tenure or max(1, self.n_edges // 10))
+        elif mode == 'restart':
+            self._descend(max_flips, restart_flips or self.n_edges)
+        else:
+            raise ValueError(f'Unknown local search mode: {mode}')
+
+        if self.best_n_monochromatic == 0:
+            return self.best_colours.copy()
+        return None
@@ -0,0 +1,402 @@
+"""Monte Carlo Tree Search for the two player Ramsey game.
+
+The game is the one of ramsey.game_solver: players take turns claiming free
+edges, player 1 first, and the first one to claim all the edges of a k_clique
+wins (or loses, with misere=True). GameState is a cheap to copy version of the
+RamseyGameMultiplayer state: one adjacency bitmask per player and node, and a
+bitmask of the free edges.
+
+Simulations select moves with PUCT. Leaves are evaluated in batches by an
+evaluator: a callable taking a list of states and returning the prior of every
+edge (or None for uniform priors) and the value of every state for its player
+to move, in [-1, 1]. While a batch is collected, virtual losses on the
+selected paths steer the next simulations of the batch to other leaves.
+
+Evaluators:
+- RolloutEvaluator (the default) plays random games from the leaves.
+- PolicyEvaluator uses a stable_baselines3 policy for the priors.
+
+play_game() plays a self-play game reusing the search tree between moves, and
+self_play() plays many of them on a process pool.
+"""
+
+import math
+import multiprocessing
+
+import numpy as np
+
+from ramsey import cliques
+from ramsey import encoders
+from ramsey import graph_state
+
+
+class GameState:
+    """State of the two player Ramsey game."""
+
+    def __init__(self, n_nodes, k_clique, misere=False):
+        """Inits the empty board."""
+        self.n_nodes = n_nodes
+        self.k_clique = k_clique
+        self.misere = misere
+        self.n_edges = n_nodes * (n_nodes - 1) // 2
+        self.edges = [
+            encoders.index_edge(n_nodes, index) for index in range(self.n_edges)
+        ]
+        self.graph = graph_state.GraphState(n_nodes, colours=(1, 2))
+        self.free = (1 << self.n_edges) - 1
+        self.player = 1
+        # The winning player, 0 for a draw, None while the game goes on.
+        self.winner = None
+        self.n_moves = 0
+
+    def copy(self):
+        """Returns a copy of the state, sharing the immutable attributes."""
+        state = GameState.__new__(GameState)
+        state.__dict__.update(self.__dict__)
+        state.graph = self.graph.copy()
+        return state
+
+    def legal_moves(self):
+        """Indices of the free edges."""
+        moves = []
+        free = self.free
+        while free:
+            move = (free & -free).bit_length() - 1
+            moves.append(move)
+            free &= free - 1
+        return moves
+
+    def is_terminal(self):
+        """Whether the game is over."""
+        return self.winner is not None
+
+    def play(self, action):
+        """Claims the edge with index action for the player to move."""
+        if not self.free >> action & 1:
+            raise ValueError(f'Edge {action} is already claimed.')
+        node_u, node_v = self.edges[action]
+        adjacency = self.graph.adjacency[self.player]
+        completes_clique = cliques.has_clique(
+            adjacency, adjacency[node_u] & adjacency[node_v], self.k_clique - 2)
+        self.graph.add_edge(node_u, node_v, colour=self.player)
+        self.free &= ~(1 << action)
+        self.n_moves += 1
+        if completes_clique:
+            self.winner = 3 - self.player if self.misere else self.player
+        elif not self.free:
+            self.winner = 0
+        self.player = 3 - self.player
+
+    def value(self):
+        """Value of a finished game for the player to move."""
+        if self.winner == 0:
+            return 0.0
+        return 1.0 if self.winner == self.player else -1.0
+
+    def observation(self):
+        """Observation of RamseyGameMultiplayer in this state."""
+        observation = np.zeros((2, self.n_edges), dtype=int)
+        for player in (1, 2):
+            for edge in self.graph.edges(player):
+                observation[player - 1,
+                            encoders.edge_index(self.n_nodes, *edge)] = 1
+        return observation.ravel()
+
+
+class RolloutEvaluator:
+    """Evaluates states with random games, with uniform priors."""
+
+    def __init__(self, n_rollouts=1, seed=None):
+        """Inits the evaluator.
+
+        Args:
+            n_rollouts: Number of random games averaged for every state.
+            seed: Seed of the random moves.
+        """
+        self.n_rollouts = n_rollouts
+        self.rng = np.random.default_rng(seed)
+
+    def rollout(self, state):
+        """Value of a random game from state for its player to move."""
+        player = state.player
+        state = state.copy()
+        while not state.is_terminal():
+            moves = state.legal_moves()
+            state.play(moves[self.rng.integers(len(moves))])
+        if state.winner == 0:
+            return 0.0
+        return 1.0 if state.winner == player else -1.0
+
+    def __call__(self, states):
+        values = [
+            sum(self.rollout(state)
+                for _ in range(self.n_rollouts)) / self.n_rollouts
+            for state in states
+        ]
+        return None, np.array(values)
+
+
+class PolicyEvaluator:
+    """Evaluates states with a stable_baselines3 policy.
+
+    The action probabilities of the policy are the priors. The value head of a
+    policy trained on RamseyGameMultiplayer estimates its shaped rewards, not
+    the outcome of the game, so the values come from random games unless
+    use_value_head is set.
+    """
+
+    def __init__(self, model, use_value_head=False, n_rollouts=1, seed=None):
+        """Inits the evaluator with a stable_baselines3 model."""
+        self.model = model
+        self.use_value_head = use_value_head
+        self.rollouts = RolloutEvaluator(n_rollouts, seed)
+
+    @classmethod
+    def from_file(cls, path, algorithm=None, **kwargs):
+        """Loads the model saved at path, an A2C model by default."""
+        if algorithm is None:
+            # pylint: disable=import-outside-toplevel
+            from stable_baselines3 import A2C
+            algorithm = A2C
+        return cls(algorithm.load(path), **kwargs)
+
+    def __call__(self, states):
+        # pylint: disable=import-outside-toplevel
+        import torch
+
+        policy = self.model.policy
+        observations = np.stack([state.observation() for state in states])
+        observations, _ = policy.obs_to_tensor(observations)
+        with torch.no_grad():
+            distribution = policy.get_distribution(observations)
+            priors = distribution.distribution.probs.cpu().numpy()
+            if self.use_value_head:
+                values = policy.predict_values(observations).cpu().numpy()
+                return priors, np.clip(values.ravel(), -1, 1)
+        return priors, self.rollouts(states)[1]
+
+
+class Node:
+    """Node of the search tree, reached by a move of the previous player."""
+
+    def __init__(self, prior):
+        """Inits an unexpanded node."""
+        self.prior = prior
+        # Move to child, None until the node is expanded.
+        self.children = None
+        self.visits = 0
+        # Sum of the values for the player who moved into the node.
+        self.value_sum = 0.0
+        self.virtual_losses = 0
+
+    def q_value(self):
+        """Mean value, counting virtual losses as lost games."""
+        visits = self.visits + self.virtual_losses
+        if not visits:
+            return 0.0
+        return (self.value_sum - self.virtual_losses) / visits
+
+
+class MCTS:
+    """Monte Carlo Tree Search from a game state."""
+
+    def __init__(self,
+                 state,
+                 evaluator=None,
+                 batch_size=8,
+                 c_puct=1.5,
+                 seed=None):
+        """Inits the search.
+
+        Args:
+            state: GameState at the root of the tree.
+            evaluator: Evaluates batches of leaves, see the module docstring.
+                Defaults to a RolloutEvaluator.
+            batch_size: Number of leaves evaluated together.
+            c_puct: Weight of the priors against the values in PUCT.
+            seed: Seed of the default evaluator and of the move sampling.
+        """
+        self.state = state.copy()
+        self.evaluator = evaluator or RolloutEvaluator(seed=seed)
+        self.batch_size = batch_size
+        self.c_puct = c_puct
+        self.rng = np.random.default_rng(seed)
+        self.root = Node(1.0)
+
+    def _select_child(self, node):
+        """Move and child with the highest PUCT score."""
+        scale = self.c_puct * math.sqrt(node.visits + node.virtual_losses)
+        best_score = -math.inf
+        best = None
+        for move, child in node.children.items():
+            score = child.q_value() + scale * child.prior / (
+                1 + child.visits + child.virtual_losses)
+            if score > best_score:
+                best_score = score
+                best = move, child
+        return best
+
+    def _select_leaf(self):
+        """Walks down the tree, adding virtual losses on the path."""
+        state = self.state.copy()
+        node = self.root
+        path = [node]
+        node.virtual_losses += 1
+        while node.children and not state.is_terminal():
+            move, node = self._select_child(node)
+            state.play(move)
+            node.virtual_losses += 1
+            path.append(node)
+        return path, state
+
+    def _expand(self, node, state, priors):
+        """Adds the children of a leaf."""
+        moves = state.legal_moves()
+        if priors is None:
+            move_priors = np.full(len(moves), 1 / len(moves))
+        else:
+            move_priors = np.asarray(priors, dtype=float)[moves]
+            total = move_priors.sum()
+            if total > 0:
+                move_priors /= total
+            else:
+                move_priors = np.full(len(moves), 1 / len(moves))
+        node.children = {
+            move: Node(prior) for move, prior in zip(moves, move_priors)
+        }
+
+    @staticmethod
+    def _backup(path, value):
+        """Backs up the value of a leaf for its player to move."""
+        for node in reversed(path):
+            node.virtual_losses -= 1
+            node.visits += 1
+            # Nodes hold the value of the player who moved into them.
+            value = -value
+            node.value_sum += value
+
+    def search(self, n_simulations):
+        """Runs simulations from the root.
+
+        Returns:
+            The visit counts of the moves of the root, over all the edges.
+        """
+        n_done = 0
+        while n_done < n_simulations:
+            batch = []
+            while n_done < n_simulations and len(batch) < self.batch_size:
+                path, state = self._select_leaf()
+                n_done += 1
+                if state.is_terminal():
+                    self._backup(path, state.value())
+                else:
+                    batch.append((path, state))
+            if not batch:
+                continue
+            priors, values = self.evaluator([state for _, state in batch])
+            for index, (path, state) in enumerate(batch):
+                leaf = path[-1]
+                # The same leaf can be selected twice in a batch.
+                if leaf.children is None:
+                    self._expand(leaf, state,
+                                 None if priors is None else priors[index])
+                self._backup(path, float(values[index]))
+        return self.visit_counts()
+
+    def visit_counts(self):
+        """Visit counts of the moves of the root, over all the edges."""
+        counts = np.zeros(self.state.n_edges, dtype=np.int64)
+        for move, child in (self.root.children or {}).items():
+            counts[move] = child.visits
+        return counts
+
+    def choose_move(self, temperature=0.0):
+        """Most visited move, or sampled from the visits at a temperature."""
+        counts = self.visit_counts()
+        if temperature <= 0 or not counts.any():
+            return int(np.argmax(counts))
+        weights = counts**(1 / temperature)
+        return int(self.rng.choice(len(counts), p=weights / weights.sum()))
+
+    def advance(self, move):
+        """Plays a move, keeping its subtree as the new root."""
+        self.state.play(move)
+        children = self.root.children or {}
+        self.root = children.get(move) or Node(1.0)
+
+
+def play_game(n_nodes,
+              k_clique,
+              n_simulations=200,
+              evaluator=None,
+              batch_size=8,
+              temperature_moves=0,
+              misere=False,
+              seed=None):
+    """Plays a self-play game.
+
+    Args:
+        n_nodes: Number of nodes of the complete graph.
+        k_clique: Size of the cliques that end the game.
+        n_simulations: Number of simulations per move.
+        evaluator: Evaluator of the leaves, defaults to a RolloutEvaluator.
+        batch_size: Number of leaves evaluated together.
+        temperature_moves: Number of first moves sampled from the visit
+            counts instead of taking the most visited one.
+        misere: Whether completing a k_clique loses.
+        seed: Seed of the search.
+
+    Returns:
+        A dictionary with the moves, the visit counts of the root at every
+        move and the winner (0 for a draw).
+    """
+    search = MCTS(GameState(n_nodes, k_clique, misere),
+                  evaluator=evaluator,
+                  batch_size=batch_size,
+                  seed=seed)
+    moves = []
+    visits = []
+    while not search.state.is_terminal():
+        visits.append(search.search(n_simulations))
+        move = search.choose_move(1.0 if search.state.n_moves <
+                                  temperature_moves else 0.0)
+        moves.append(move)
+        search.advance(move)
+    return {'moves': moves, 'visits': visits, 'winner': search.state.winner}
+
+
+_WORKER_EVALUATOR = None
+
+
+def _init_worker(make_evaluator):
+    """Builds the evaluator of a self-play worker once."""
+    global _WORKER_EVALUATOR
+    _WORKER_EVALUATOR = make_evaluator() if make_evaluator else None
+
+
+def _play_worker_game(args):
+    """Plays one game in a self-play worker."""
+    seed, kwargs = args
+    return play_game(evaluator=_WORKER_EVALUATOR, seed=seed, **kwargs)
+
+
+def self_play(n_games, n_workers=None, make_evaluator=None, seed=0, **kwargs):
+    """Plays self-play games on a process pool.
+
+    Args:
+        n_games: Number of games.
+        n_workers: Number of processes, defaults to the CPU count.
+        make_evaluator: Picklable function without arguments creating the
+            evaluator of every worker, e.g. functools.partial(
+            PolicyEvaluator.from_file, path). Defaults to rollouts.
+        seed: Seed of the first game, the next ones use the next seeds.
+        **kwargs: Arguments of play_game().
+
+    Returns:
+        The list of the games returned by play_game(), in order.
+    """
+    with multiprocessing.Pool(n_workers,
+                              initializer=_init_worker,
+                              initargs=(make_evaluator,)) as pool:
+        return pool.map(_play_worker_game,
+                        [(seed + game, kwargs) for game in range(n_games)])
@@ -0,0 +1,179 @@
+"""Counterexample search over many processes.
+
+The colouring tree of search.CounterexampleSearch is split into shards: the
+subtrees below every legal colouring of the first shard_depth edges. Workers
+take shards from a shared queue and search them in chunks of chunk_nodes
+nodes. Shards are very unbalanced, so whenever a worker is idle and the queue
+is empty, busy workers give away the shallowest unexplored branches of their
+shard (CounterexampleSearch.split) to the queue.
+
+Workers report progress and counterexamples on a results queue, and all of
+them stop as soon as one finds a counterexample.
+"""
+
+import multiprocessing
+import queue
+
+from absl import logging
+
+from ramsey import search
+
+# Seconds between two checks that the workers are alive while waiting for them.
+_POLL_SECONDS = 1.0
+
+
+def _search_worker(n_nodes, k_clique, chunk_nodes, tasks, results, pending,
+                   idle, stop):
+    """Searches shards from the tasks queue until the search is over."""
+    # Branches left in the queue when the search stops are not needed, so do
+    # not wait for them to be flushed before exiting.
+    tasks.cancel_join_thread()
+    is_idle = False
+    while not stop.is_set():
+        try:
+            prefix = tasks.get(timeout=0.1)
+        except queue.Empty:
+            if not is_idle:
+                is_idle = True
+                with idle.get_lock():
+                    idle.value += 1
+            if pending.value == 0:
+                break
+            continue
+        if is_idle:
+            is_idle = False
+            with idle.get_lock():
+                idle.value -= 1
+
+        shard_search = search.CounterexampleSearch(n_nodes,
+                                                   k_clique,
+                                                   prefix=prefix)
+        while not shard_search.exhausted and not stop.is_set():
+            nodes_expanded = shard_search.nodes_expanded
+            colouring = shard_search.run(max_nodes=chunk_nodes)
+            results.put(
+                ('progress', shard_search.nodes_expanded - nodes_expanded))
+            if colouring is not None:
+                results.put(('counterexample', colouring.tolist()))
+                stop.set()
+                break
+            if idle.value > 0 and tasks.empty():
+                for branch in shard_search.split():
+                    with pending.get_lock():
+                        pending.value += 1
+                    tasks.put(branch)
+
+        # A shard is only done once its branches are queued.
+        with pending.get_lock():
+            pending.value -= 1
+    results.put(('exit', None))
+
+
+class ParallelSearch:
+    """Runs a counterexample search on a pool of worker processes."""
+
+    def __init__(self,
+                 n_nodes,
+                 k_clique,
+                 n_workers=None,
+                 shard_depth=None,
+                 chunk_nodes=10000):
+        """Inits the parallel search.
+
+        Args:
+            n_nodes: Number of nodes of the complete graph.
+            k_clique: Size of the monochromatic cliques to avoid.
+            n_workers: Number of worker processes, defaults to the CPU count.
+            shard_depth: Number of edges fixed by the initial shards. Defaults
+                to the smallest depth with 8 shards per worker.
+            chunk_nodes: Number of nodes a worker expands between reports.
+        """
+        self.n_nodes = n_nodes
+        self.k_clique = k_clique
+        self.n_workers = n_workers or multiprocessing.cpu_count()
+        self.chunk_nodes = chunk_nodes
+        self.n_edges = n_nodes * (n_nodes - 1) // 2
+
+        if shard_depth is None:
+            shard_depth = 1
+            self.shards = search.shard_prefixes(n_nodes, k_clique, shard_depth)
+            while shard_depth < self.n_edges and \
+                    0 < len(self.shards) < 8 * self.n_workers:
+                shard_depth += 1
+                self.shards = search.shard_prefixes(n_nodes, k_clique,
+                                                    shard_depth)
+        else:
+            self.shards = search.shard_prefixes(n_nodes, k_clique, shard_depth)
+        self.shard_depth = shard_depth
+
+        self.nodes_expanded = 0
+        self.exhausted = False
+
+    def run(self, progress_interval=1000000):
+        """Runs the search until a counterexample is found.
+
+        Args:
+            progress_interval: Log the progress every this many nodes.
+
+        Returns:
+            The counterexample, as a list with the colour of every edge, or
+            None if there is no counterexample.
+        """
+        logging.info('Searching %s shards of depth %s on %s workers.',
+                     len(self.shards), self.shard_depth, self.n_workers)
+        context = multiprocessing.get_context()
+        tasks = context.Queue()
+        results = context.Queue()
+        pending = context.Value('i', len(self.shards))
+        idle = context.Value('i', 0)
+        stop = context.Event()
+        for shard in self.shards:
+            tasks.put(shard)
+        # Shards left in the queue when the search stops are not needed.
+        tasks.cancel_join_thread()
+
+        workers = [
+            context.Process(target=_search_worker,
+                            args=(self.n_nodes, self.k_clique, self.chunk_nodes,
+                                  tasks, results, pending, idle, stop),
+                            daemon=True) for _ in range(self.n_workers)
+        ]
+        for worker in workers:
+            worker.start()
+
+        counterexample = None
+        n_running = len(workers)
+        next_report = progress_interval
+        try:
+            while n_running:
+                try:
+                    message, value = results.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    # Workers exit with code 0 only after reporting it.
+                    for index, worker in enumerate(workers):
+                        if worker.exitcode not in (None, 0):
+                            raise RuntimeError(
+                                f'Search worker {index} died with exit code '
+                                f'{worker.exitcode}.') from None
+                    continue
+                if message == 'progress':
+                    self.nodes_expanded += value
+                    if self.nodes_expanded >= next_report:
+                        logging.info('Expanded %s nodes, %s shards pending.',
+                                     self.nodes_expanded, pending.value)
+                        next_report += progress_interval
+                elif message == 'counterexample':
+                    if counterexample is None:
+                        counterexample = value
+                    stop.set()
+                else:
+                    n_running -= 1
+        except BaseException:
+            for worker in workers:
+                worker.terminate()
+            raise
+        finally:
+            for worker in workers:
+                worker.join()
+        self.exhausted = counterexample is None
+        return counterexample
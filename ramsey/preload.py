@@ -0,0 +1,78 @@
+"""Warms up the forkserver that starts the worker processes.
+
+SubprocVecEnv starts its workers from a forkserver process by default. The
+modules imported by the forkserver, with multiprocessing's
+set_forkserver_preload(), and the tables they build are inherited by every
+worker it forks, instead of being imported and built again by each of them.
+
+preload() makes the forkserver import this module, which imports the modules
+of the workers and builds the tables of the games listed in the
+RAMSEY_PRELOAD_GAMES environment variable: the edge tables of the encoders and
+the clique tables (see ramsey.clique_tables) of the cliques counted by the
+count rewards and RamseyVecEnv. Clique tables with more than
+MAX_PRELOADED_CLIQUES rows are left to the workers that use them.
+"""
+
+import math
+import multiprocessing
+import os
+
+# pylint: disable=unused-import
+import gym
+import numpy as np
+
+import ramsey
+from ramsey import clique_tables
+from ramsey import encoders
+from ramsey import envs
+from ramsey import reward_cache
+from ramsey.envs import ramsey_env_multiplayer
+
+# pylint: enable=unused-import
+
+GAMES_VARIABLE = 'RAMSEY_PRELOAD_GAMES'
+MAX_PRELOADED_CLIQUES = 1 << 20
+
+
+def build_tables(games):
+    """Builds the tables of a list of (n_nodes, k_clique) games."""
+    for n_nodes, k_clique in games:
+        encoders.graph_hot_encoder_dict(n_nodes)
+        # The k_cliques, the (k_clique + 1)-cliques that end the count reward
+        # games of RamseyGame-v0, and the cliques counted by RamseyGame-v1.
+        clique_sizes = {
+            k_clique, k_clique + 1,
+            ramsey_env_multiplayer.default_count_clique(k_clique)
+        }
+        for clique_size in sorted(clique_sizes):
+            if clique_size <= n_nodes and math.comb(
+                    n_nodes, clique_size) <= MAX_PRELOADED_CLIQUES:
+                clique_tables.clique_edge_indices(n_nodes, clique_size)
+
+
+def preload(games, modules=()):
+    """Makes the forkserver preload the workers of a list of games.
+
+    Must be called before the first process is started with the forkserver.
+
+    Args:
+        games: List of (n_nodes, k_clique) games played by the workers.
+        modules: Other modules to preload, e.g. the ones of the learner that
+            the workers unpickle.
+    """
+    os.environ[GAMES_VARIABLE] = ','.join(
+        f'{n_nodes}:{k_clique}' for n_nodes, k_clique in games)
+    multiprocessing.set_forkserver_preload([__name__] + list(modules))
+
+
+def _games_from_environment():
+    """Games listed in the RAMSEY_PRELOAD_GAMES environment variable."""
+    games = []
+    for game in os.environ.get(GAMES_VARIABLE, '').split(','):
+        if game:
+            n_nodes, k_clique = game.split(':')
+            games.append((int(n_nodes), int(k_clique)))
+    return games
+
+
+build_tables(_games_from_environment())
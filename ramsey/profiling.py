@@ -0,0 +1,147 @@
+"""Opt-in timers and counters of the phases of environment steps.
+
+A StepProfiler times the methods of an environment by shadowing them with
+timed versions on the instance, so an environment that is not profiled runs
+its own methods untouched. Every profiled step adds a 'profile' dictionary to
+its info with:
+- '<phase>_ns': the nanoseconds spent in the phase, excluding the phases it
+calls, e.g. 'step_ns' is the part of the step not spent in any other phase.
+- '<phase>_calls': the number of calls of the phase.
+- 'clique_searches' and 'nodes_expanded': the searches of ramsey.cliques and
+the nodes of their branch and bound, counted by patching the search kernels
+for the duration of the profiled steps only.
+- The increase of every tracked counter, e.g. the hits of a reward cache.
+
+The infos of all the games, e.g. from the SubprocVecEnv workers, are summed
+with aggregate().
+"""
+
+import collections
+import contextlib
+import functools
+import time
+
+from ramsey import cliques
+
+# Counters of the clique search kernels, shared by the profilers of a process.
+_kernel_counts = collections.Counter()
+# Number of running profiled steps, e.g. of a profiled game inside another.
+_kernel_depth = 0
+
+
+@contextlib.contextmanager
+def _counting_kernels():
+    """Counts the calls of the clique search kernels while it is entered."""
+    global _kernel_depth  # pylint: disable=global-statement
+    # pylint: disable=protected-access
+    max_clique = cliques._max_clique
+    colour_candidates = cliques._colour_candidates
+
+    @functools.wraps(max_clique)
+    def counted_max_clique(*args, **kwargs):
+        _kernel_counts['clique_searches'] += 1
+        return max_clique(*args, **kwargs)
+
+    @functools.wraps(colour_candidates)
+    def counted_colour_candidates(*args, **kwargs):
+        # Every node of the branch and bound colours its candidates once.
+        _kernel_counts['nodes_expanded'] += 1
+        return colour_candidates(*args, **kwargs)
+
+    if not _kernel_depth:
+        cliques._max_clique = counted_max_clique
+        cliques._colour_candidates = counted_colour_candidates
+    _kernel_depth += 1
+    try:
+        yield
+    finally:
+        _kernel_depth -= 1
+        if not _kernel_depth:
+            cliques._max_clique = max_clique
+            cliques._colour_candidates = colour_candidates
+    # pylint: enable=protected-access
+
+
+class StepProfiler:
+    """Times the phases of the steps of an environment."""
+
+    def __init__(self):
+        self.times_ns = collections.Counter()
+        self.calls = collections.Counter()
+        self.trackers = {}
+        self._previous = {}
+        self._kernel_start = collections.Counter()
+        # Time spent in the phases called by every running phase.
+        self._nested_ns = []
+
+    def timed(self, phase, function):
+        """Returns function timed as phase."""
+
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            self._nested_ns.append(0)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - start
+                self.times_ns[phase] += elapsed - self._nested_ns.pop()
+                self.calls[phase] += 1
+                if self._nested_ns:
+                    self._nested_ns[-1] += elapsed
+
+        return timed_function
+
+    def time_methods(self, instance, phases):
+        """Shadows methods of an instance with timed versions.
+
+        Args:
+            instance: Object whose methods are timed.
+            phases: Dictionary from the method names to their phases.
+        """
+        for method_name, phase in phases.items():
+            setattr(instance, method_name,
+                    self.timed(phase, getattr(instance, method_name)))
+
+    def track(self, name, counter):
+        """Reports the increase of counter() on every step as name."""
+        self.trackers[name] = counter
+        self._previous[name] = counter()
+
+    def profiled_step(self, step):
+        """Returns step timed as the 'step' phase, with its profile in info."""
+        timed_step = self.timed('step', step)
+
+        @functools.wraps(step)
+        def profiled(action):
+            self._kernel_start = _kernel_counts.copy()
+            with _counting_kernels():
+                observation, reward, done, info = timed_step(action)
+            info = dict(info, profile=self.flush())
+            return observation, reward, done, info
+
+        return profiled
+
+    def flush(self):
+        """Returns the profile since the last flush and starts a new one."""
+        profile = {}
+        for phase, time_ns in self.times_ns.items():
+            profile[phase + '_ns'] = time_ns
+            profile[phase + '_calls'] = self.calls[phase]
+        for name in ('clique_searches', 'nodes_expanded'):
+            profile[name] = _kernel_counts[name] - self._kernel_start[name]
+        for name, counter in self.trackers.items():
+            value = counter()
+            profile[name] = value - self._previous[name]
+            self._previous[name] = value
+        self.times_ns.clear()
+        self.calls.clear()
+        return profile
+
+
+def aggregate(infos):
+    """Sums the profiles of the infos of several games or steps."""
+    total = collections.Counter()
+    for info in infos:
+        total.update(info.get('profile', {}))
+    return dict(total)
@@ -0,0 +1,160 @@
+"""Records the games played by an environment, to watch them elsewhere.
+
+Rendering inside the step loop stalls training, so EpisodeRecorder only
+appends, on every step, the edges whose colour changed to a buffered file, and
+a separate process replays or follows the file with ramsey.view_episodes.
+
+The colours of the edges are read from the observations: in RamseyGame-v1
+colour 1 and 2 are the edges of player 1 and 2, and in RamseyGame-v0 colour 1
+is the graph and colour 0 its dual. Edges are referred to by their index in
+encoders.graph_hot_encoder_dict.
+
+The file is a sequence of records:
+
+    kind (uint8) | n_nodes (uint8) | n_changes (uint16) | reward (float32)
+    | n_changes times: edge (uint16) | colour (uint8)
+
+A RESET record starts a game with all the edges of colour 0, and is followed
+by the STEP records of its moves. Each worker process should record to its
+own file. The file is only opened, and a game only recorded, at its first
+step, so that environments that are reset but never stepped (e.g. the one
+SharedMemoryVecEnv builds in the main process to read the spaces) record
+nothing.
+"""
+
+import collections
+import io
+import struct
+import time
+
+import gym
+import numpy as np
+
+RESET = 0
+STEP = 1
+
+_HEADER = struct.Struct('<BBHf')
+_CHANGE = np.dtype([('edge', '<u2'), ('colour', 'u1')])
+_CHANGE_STRUCT = struct.Struct('<HB')
+
+Record = collections.namedtuple(
+    'Record', ['kind', 'n_nodes', 'reward', 'edges', 'colours'])
+
+
+class EpisodeRecorder(gym.Wrapper):
+    """Appends the edge colour changes of every step to a file."""
+
+    def __init__(self,
+                 env,
+                 file_name,
+                 episode_interval=1,
+                 buffer_size=1 << 16,
+                 n_nodes=None):
+        """Inits the recorder.
+
+        Args:
+            env: RamseyGame-v0 or RamseyGame-v1 environment.
+            file_name: File the games are appended to.
+            episode_interval: Only every episode_interval-th game is recorded.
+            buffer_size: Bytes buffered before they are written to the file.
+                The buffer is also written at the end of every recorded game.
+            n_nodes: Number of nodes of the observations, defaults to the one
+                of env. A curriculum.CurriculumEnv observes max_nodes.
+        """
+        super().__init__(env)
+        self.n_nodes = n_nodes or env.n_nodes
+        self.n_edges = self.n_nodes * (self.n_nodes - 1) // 2
+        self.episode_interval = episode_interval
+        self.file_name = file_name
+        self.buffer_size = buffer_size
+        self._file = None
+        # Last recorded observation.
+        self.observation = np.zeros(env.observation_space.shape,
+                                    dtype=env.observation_space.dtype)
+        # Observation of the last reset, recorded at the first step.
+        self.reset_observation = None
+        self.n_episodes = 0
+        self.recording = False
+
+    def _write(self, kind, reward, observation):
+        """Appends a record with the changes of the observation."""
+        observation = np.asarray(observation)
+        changed = (observation != self.observation).nonzero()[0].tolist()
+        # Observations are often views of the state of the environment.
+        self.observation = observation.copy()
+        # Typically one edge changes, so it is cheaper to pack it in Python.
+        edges = sorted({index % self.n_edges for index in changed})
+        record = [_HEADER.pack(kind, self.n_nodes, len(edges), reward)]
+        for edge in edges:
+            colour = int(observation[edge])
+            if observation.size > self.n_edges:
+                colour += 2 * int(observation[self.n_edges + edge])
+            record.append(_CHANGE_STRUCT.pack(edge, colour))
+        self._file.write(b''.join(record))
+
+    def _start_episode(self):
+        """Records the reset of a game at its first step, if it is recorded."""
+        self.recording = self.n_episodes % self.episode_interval == 0
+        self.n_episodes += 1
+        if self.recording:
+            if self._file is None:
+                # pylint: disable=consider-using-with
+                self._file = io.open(self.file_name,
+                                     'ab',
+                                     buffering=self.buffer_size)
+            self.observation[:] = 0
+            self._write(RESET, 0, self.reset_observation)
+        self.reset_observation = None
+
+    def reset(self, **kwargs):
+        observation = self.env.reset(**kwargs)
+        self.reset_observation = np.array(observation)
+        self.recording = False
+        return observation
+
+    def step(self, action):
+        observation, reward, done, info = self.env.step(action)
+        if self.reset_observation is not None:
+            self._start_episode()
+        if self.recording:
+            self._write(STEP, reward, observation)
+            if done:
+                self._file.flush()
+        return observation, reward, done, info
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+        return self.env.close()
+
+
+def read_records(file_name, follow=False, poll_interval=0.1):
+    """Reads the records of a recording file.
+
+    Args:
+        file_name: Recording file of an EpisodeRecorder.
+        follow: Whether to wait for the records appended to the file once its
+            end is reached, like tail -f.
+        poll_interval: Seconds between the checks for new records.
+
+    Yields:
+        Records, with the edges whose colour changed and their new colours.
+    """
+    with open(file_name, 'rb') as record_file:
+        while True:
+            position = record_file.tell()
+            header = record_file.read(_HEADER.size)
+            if len(header) == _HEADER.size:
+                kind, n_nodes, n_changes, reward = _HEADER.unpack(header)
+                changes = record_file.read(n_changes * _CHANGE.itemsize)
+                if len(changes) == n_changes * _CHANGE.itemsize:
+                    changes = np.frombuffer(changes, dtype=_CHANGE)
+                    yield Record(kind, n_nodes, reward,
+                                 changes['edge'].astype(np.int64),
+                                 changes['colour'])
+                    continue
+            # The end of the file, or a record being written.
+            if not follow:
+                return
+            record_file.seek(position)
+            time.sleep(poll_interval)
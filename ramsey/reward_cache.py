@@ -0,0 +1,188 @@
+"""Memoised rewards.
+
+The same small graphs are scored over and over, e.g. near the start of the
+episodes of RamseyGame-v0. RewardCache keeps the rewards of the most recently
+used graphs in a bounded LRU dictionary, keyed by the packed edges of the
+graph or, optionally, by its canonical form (see ramsey.canonical) so that
+isomorphic graphs share an entry.
+
+A SharedRewardTable can back the cache, so that environments in different
+worker processes (e.g. SubprocVecEnv workers) reuse each other's rewards. It
+is a direct-mapped hash table in shared memory: a new entry overwrites the
+slot of its key, and is written without locks. Every slot holds a checksum of
+its key and value, so a slot being written by another process reads as a
+miss instead of a wrong reward.
+"""
+
+import collections
+import hashlib
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ramsey import canonical
+from ramsey import reward_functions
+
+# Columns of a SharedRewardTable slot: the 128 bit digest of the key, the
+# value and the checksum of the three.
+_SLOT_WORDS = 4
+_CHECKSUM_SEED = np.uint64(0x9E3779B97F4A7C15)
+
+
+class SharedRewardTable:
+    """Fixed-size table of integer rewards in shared memory.
+
+    The table is created by the main process and attached by name in the
+    workers. Pickling a table (e.g. inside the env_fns of a SubprocVecEnv)
+    attaches the unpickled copy to the same memory.
+    """
+
+    def __init__(self, n_slots=1 << 20, name=None):
+        """Creates a table, or attaches to the table with the given name."""
+        if name is None:
+            size = n_slots * _SLOT_WORDS * np.dtype(np.uint64).itemsize
+            # The memory may be rounded up to whole pages, the number of
+            # slots is always read from its actual size.
+            self._memory = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self.name = self._memory.name
+        self._slots = np.frombuffer(self._memory.buf,
+                                    dtype=np.uint64).reshape(-1, _SLOT_WORDS)
+        self.n_slots = len(self._slots)
+
+    def __getstate__(self):
+        return {'name': self.name}
+
+    def __setstate__(self, state):
+        self.__init__(name=state['name'])
+
+    @staticmethod
+    def _digest(key):
+        """128 bit digest of a key, as two uint64."""
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+        return np.frombuffer(digest, dtype=np.uint64)
+
+    @staticmethod
+    def _checksum(digest, value_bits):
+        return digest[0] ^ digest[1] ^ value_bits ^ _CHECKSUM_SEED
+
+    def get(self, key):
+        """The value of a key, or None if it is not in the table."""
+        digest = self._digest(key)
+        slot = self._slots[int(digest[0] % self.n_slots)].copy()
+        if slot[0] != digest[0] or slot[1] != digest[1] or \
+                slot[3] != self._checksum(digest, slot[2]):
+            return None
+        return int(slot[2:3].view(np.int64)[0])
+
+    def put(self, key, value):
+        """Stores the value of a key, evicting the key in its slot."""
+        digest = self._digest(key)
+        value_bits = np.array([value], dtype=np.int64).view(np.uint64)[0]
+        slot = self._slots[int(digest[0] % self.n_slots)]
+        slot[:] = (digest[0], digest[1], value_bits,
+                   self._checksum(digest, value_bits))
+
+    def close(self):
+        """Detaches from the table, freeing it in the creating process."""
+        self._slots = None
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+class RewardCache:
+    """Bounded LRU cache of the rewards of graphs."""
+
+    def __init__(self,
+                 reward_function=reward_functions.ramsey_number,
+                 max_size=100000,
+                 canonical_keys=False,
+                 shared_table=None):
+        """Inits the cache.
+
+        Args:
+            reward_function: Function of a networkx graph, used when the cache
+                is called on a graph.
+            max_size: Maximum number of rewards kept in this process.
+            canonical_keys: Whether isomorphic graphs share their entries.
+                Computing the canonical form costs more than the packed edges,
+                but is still much cheaper than a clique search on the graphs
+                of up to about 10 nodes where caching helps.
+            shared_table: SharedRewardTable shared by the caches of every
+                process, or None. A table must only be shared by caches of
+                the same reward function.
+        """
+        self.reward_function = reward_function
+        self.max_size = max_size
+        self.canonical_keys = canonical_keys
+        self.shared_table = shared_table
+        self._rewards = collections.OrderedDict()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._rewards)
+
+    def key(self, adjacency):
+        """Key of the graph with the given adjacency bitmasks."""
+        n_nodes = len(adjacency)
+        if self.canonical_keys:
+            return n_nodes, canonical.canonical_form([adjacency], n_nodes)[0]
+        return n_nodes, canonical.certificate([adjacency], range(n_nodes))[0]
+
+    def lookup(self, adjacency, compute):
+        """Reward of a graph, calling compute() if it is not cached.
+
+        Args:
+            adjacency: Adjacency bitmasks of the graph, see ramsey.cliques.
+            compute: Function without arguments returning the reward.
+        """
+        key = self.key(adjacency)
+        reward = self._rewards.get(key)
+        if reward is not None:
+            self._rewards.move_to_end(key)
+            self.hits += 1
+            return reward
+
+        if self.shared_table is not None:
+            reward = self.shared_table.get(key)
+        if reward is None:
+            reward = compute()
+            self.misses += 1
+            if self.shared_table is not None:
+                self.shared_table.put(key, reward)
+        else:
+            self.shared_hits += 1
+
+        self._rewards[key] = reward
+        if len(self._rewards) > self.max_size:
+            self._rewards.popitem(last=False)
+        return reward
+
+    def __call__(self, graph):
+        """Reward of a networkx graph."""
+        adjacency, _ = reward_functions.adjacency_bitmasks(graph)
+        return self.lookup(adjacency, lambda: self.reward_function(graph))
+
+    def stats(self):
+        """Hit and miss counters."""
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            'size': len(self._rewards),
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'hit_rate': (lookups - self.misses) / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        """Empties the cache of this process and resets the counters."""
+        self._rewards.clear()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
@@ -1,19 +1,79 @@
-"""Reward functions for the Ramsey game."""
+"""Reward functions for the Ramsey game.
 
-import networkx
+The graphs are converted to adjacency bitmasks (see ramsey.cliques), so that
+the dual is a bitwise complement instead of a new networkx graph.
+"""
+
+from ramsey import cliques
+
+
+def adjacency_bitmasks(graph):
+    """Adjacency bitmasks of a networkx graph.
+
+    Returns:
+        The list with the neighbours bitmask of every node, in the order of
+        graph.nodes, and the bitmask of all the nodes.
+    """
+    index = {node: i for i, node in enumerate(graph.nodes)}
+    adjacency = [0] * len(index)
+    for node_u, node_v in graph.edges:
+        if node_u != node_v:
+            adjacency[index[node_u]] |= 1 << index[node_v]
+            adjacency[index[node_v]] |= 1 << index[node_u]
+    return adjacency, (1 << len(index)) - 1
 
 
 def dual_based_reward(graph):
     """Biggest clique number minus the biggest clique in the dual."""
-    biggest_clique = networkx.graph_clique_number(graph)
-    complement = networkx.complement(graph)
-    biggest_clique_in_dual = networkx.graph_clique_number(complement)
+    adjacency, nodes = adjacency_bitmasks(graph)
+    biggest_clique = cliques.clique_number(adjacency, nodes)
+    biggest_clique_in_dual = cliques.clique_number(
+        cliques.complement(adjacency, nodes), nodes)
     return biggest_clique - biggest_clique_in_dual
 
 
-def ramsey_number(graph):
-    """Maximum clique number in the graph or it's dual."""
-    biggest_clique = networkx.graph_clique_number(graph)
-    complement = networkx.complement(graph)
-    biggest_clique_in_dual = networkx.graph_clique_number(complement)
-    return max(biggest_clique, biggest_clique_in_dual)
+def ramsey_number(graph, k_clique=None):
+    """Maximum clique number in the graph or it's dual.
+
+    Args:
+        graph: A networkx graph.
+        k_clique: If set, stop as soon as a clique of this size is found in
+            the graph or its dual, and return at most k_clique.
+    """
+    adjacency, nodes = adjacency_bitmasks(graph)
+    return cliques.ramsey_number(adjacency, nodes, limit=k_clique)
+
+
+def clique_number_capped(graph, cap):
+    """Clique number of the graph, or cap if it has a clique of size cap.
+
+    The search stops at the first clique of size cap, so it is much cheaper
+    than the clique number on dense graphs when only cap matters.
+    """
+    adjacency, nodes = adjacency_bitmasks(graph)
+    return cliques.clique_number(adjacency, nodes, limit=cap)
+
+
+def has_k_clique(graph, k_clique, return_witness=False):
+    """Whether the graph has a clique of size k_clique.
+
+    Nodes with fewer than k_clique - 1 neighbours are pruned before the
+    search, which stops at the first clique found.
+
+    Args:
+        graph: A networkx graph.
+        k_clique: Size of the clique.
+        return_witness: Whether to return the clique found.
+
+    Returns:
+        A boolean, or if return_witness is set, the list of the nodes of the
+        clique found, None if there is none.
+    """
+    adjacency, nodes = adjacency_bitmasks(graph)
+    clique = cliques.find_clique(adjacency, nodes, k_clique)
+    if not return_witness:
+        return clique is not None
+    if clique is None:
+        return None
+    graph_nodes = list(graph.nodes)
+    return [graph_nodes[node] for node in reversed(clique)]
@@ -1,6 +1,7 @@
 """Learns the environment"""
 
 import multiprocessing
+import os
 import sys
 
 from absl import app
@@ -10,9 +11,19 @@ from absl import flags
 import gym
 from stable_baselines3 import A2C
 from stable_baselines3.common.vec_env import SubprocVecEnv
+from stable_baselines3.common.vec_env import VecMonitor
 from stable_baselines3.common.monitor import Monitor
 
 import ramsey  # pylint: disable=unused-import
+from ramsey import callbacks
+from ramsey import clique_counts
+from ramsey import curriculum
+from ramsey import preload
+from ramsey import recorder
+from ramsey import reward_cache
+from ramsey import trajectories
+from ramsey.envs import ramsey_vec_env
+from ramsey.envs import shared_memory_vec_env
 
 FLAGS = flags.FLAGS
 
@@ -33,17 +44,173 @@ flags.DEFINE_boolean(
     'Whether to save the counterexample. A counterexample is a graph (and \
     it\'s dual) that does not have a clique of size k_clique_number.')
 
+flags.DEFINE_boolean(
+    'batched_env', False,
+    'Whether to step all the games in this process with RamseyVecEnv instead \
+    of running one RamseyGame-v1 per worker process.')
+
+flags.DEFINE_boolean(
+    'shared_memory_env', False,
+    'Whether the worker processes share their step results with the learner \
+    in shared memory instead of pickling them through pipes.')
+
+flags.DEFINE_integer('n_envs',
+                     None,
+                     'Number of games played in parallel. Defaults to the \
+                     number of CPUs.',
+                     lower_bound=1)
+
+flags.DEFINE_boolean(
+    'action_masks', False,
+    'Whether to train with MaskablePPO from sb3-contrib, which only samples \
+    the free edges of RamseyGame-v1, instead of A2C.')
+
+flags.DEFINE_enum('environment_id', 'RamseyGame-v1',
+                  ['RamseyGame-v0', 'RamseyGame-v1'],
+                  'Environment played by every worker process.')
+
+flags.DEFINE_integer(
+    'reward_cache_size',
+    0,
+    'Number of rewards cached by every RamseyGame-v0 worker, 0 disables the \
+    cache.',
+    lower_bound=0)
+
+flags.DEFINE_boolean(
+    'canonical_reward_cache', False,
+    'Whether isomorphic graphs share their entry in the reward cache.')
+
+flags.DEFINE_integer(
+    'shared_reward_cache_slots',
+    0,
+    'Number of slots of the reward table shared by all the workers, 0 \
+    disables it.',
+    lower_bound=0)
+
+flags.DEFINE_list(
+    'curriculum', None,
+    'Stages n_nodes:k_clique of a curriculum, e.g. 5:3,8:4,12:4. Training \
+    moves to the next stage when the success rate reaches \
+    curriculum_threshold. Overrides n_nodes and k_clique_number.')
+
+flags.DEFINE_float('curriculum_threshold',
+                   0.8,
+                   'Success rate needed to move to the next stage.',
+                   lower_bound=0,
+                   upper_bound=1)
+
+flags.DEFINE_integer('curriculum_window',
+                     100,
+                     'Number of episodes of the curriculum success rate.',
+                     lower_bound=1)
+
+flags.DEFINE_boolean(
+    'profile_env', False,
+    'Whether the workers time the phases of their steps and log them per \
+    step, see ramsey.profiling.')
 
-def make_environment(environment_id, seed, n_nodes, k_clique,
-                     save_counterexample):
-    """Returns a function that creates the environment."""
+flags.DEFINE_string(
+    'record_episodes', None,
+    'Directory where every worker records its games, to watch them with \
+    ramsey.view_episodes.')
+
+flags.DEFINE_integer('record_episode_interval',
+                     100,
+                     'Only every record_episode_interval-th game is recorded.',
+                     lower_bound=1)
+
+flags.DEFINE_string(
+    'trajectory_dir', None,
+    'Directory where every worker writes its transitions, to train offline \
+    with ramsey.trajectories.TrajectoryDataset.')
+
+flags.DEFINE_integer('trajectory_shard_size',
+                     1 << 20,
+                     'Number of transitions of every trajectory shard.',
+                     lower_bound=1)
+
+flags.DEFINE_enum(
+    'reward_mode', 'clique', clique_counts.REWARD_MODES,
+    'Reward of the environments: based on the biggest clique, minus the \
+    number of monochromatic cliques, or its decrease on every step.')
+
+flags.DEFINE_string(
+    'tournament_dir', None,
+    'Directory where checkpoints of the model are saved and rated in \
+    tournaments against random and greedy agents and the previous \
+    checkpoint, see ramsey.tournament.')
+
+flags.DEFINE_integer('tournament_interval',
+                     100000,
+                     'Number of timesteps between two tournaments.',
+                     lower_bound=1)
+
+flags.DEFINE_integer('tournament_games',
+                     200,
+                     'Number of games of every match of a tournament.',
+                     lower_bound=1)
+
+
+def make_environment(environment_id,
+                     seed,
+                     n_nodes,
+                     k_clique,
+                     save_counterexample,
+                     reward_cache_size=0,
+                     canonical_reward_cache=False,
+                     shared_reward_table=None,
+                     max_nodes=None,
+                     profile=False,
+                     record_file=None,
+                     record_interval=1,
+                     trajectory_dir=None,
+                     trajectory_shard_size=1 << 20,
+                     reward_mode='clique'):
+    """Returns a function that creates the environment.
+
+    With max_nodes, the environment is a curriculum.CurriculumEnv padded to
+    max_nodes. With record_file, its games are recorded with
+    recorder.EpisodeRecorder, and with trajectory_dir, its transitions are
+    written with trajectories.TrajectoryWriter.
+    """
 
     def get_env():
         """Returns a environment."""
-        env = gym.make(environment_id,
-                       n_nodes=n_nodes,
-                       k_clique=k_clique,
-                       save_counterexample=save_counterexample)
+        kwargs = {}
+        if reward_mode != 'clique':
+            kwargs['reward_mode'] = reward_mode
+        if profile:
+            kwargs['profile'] = True
+        if reward_cache_size:
+            kwargs['reward_cache'] = reward_cache.RewardCache(
+                max_size=reward_cache_size,
+                canonical_keys=canonical_reward_cache,
+                shared_table=shared_reward_table)
+        if max_nodes:
+            env = curriculum.CurriculumEnv(
+                max_nodes,
+                n_nodes,
+                k_clique,
+                environment_id=environment_id,
+                save_counterexample=save_counterexample,
+                **kwargs)
+        else:
+            env = gym.make(environment_id,
+                           n_nodes=n_nodes,
+                           k_clique=k_clique,
+                           save_counterexample=save_counterexample,
+                           **kwargs)
+        if record_file:
+            env = recorder.EpisodeRecorder(env,
+                                           record_file,
+                                           episode_interval=record_interval,
+                                           n_nodes=max_nodes)
+        if trajectory_dir:
+            env = trajectories.TrajectoryWriter(
+                env,
+                trajectory_dir,
+                f'worker_{seed}_{os.getpid()}',
+                shard_size=trajectory_shard_size)
         env = Monitor(env)
         env.seed(seed)
         env.reset()
@@ -55,20 +222,97 @@ def make_environment(environment_id, seed, n_nodes, k_clique,
 def main(_):
     """Learns the environment."""
 
-    cpu_count = multiprocessing.cpu_count()
-    env_list = [
-        make_environment('RamseyGame-v1',
-                         seed,
-                         FLAGS.n_nodes,
-                         FLAGS.k_clique_number,
-                         save_counterexample=FLAGS.save_counterexample)
-        for seed in range(cpu_count)
-    ]
-    environment = SubprocVecEnv(env_list)
+    n_envs = FLAGS.n_envs or multiprocessing.cpu_count()
+    if FLAGS.reward_cache_size and FLAGS.environment_id != 'RamseyGame-v0':
+        raise app.UsageError('The reward cache needs RamseyGame-v0.')
+    if FLAGS.action_masks and FLAGS.environment_id != 'RamseyGame-v1':
+        raise app.UsageError('Action masks need RamseyGame-v1.')
+    shared_reward_table = None
+    if FLAGS.shared_reward_cache_slots:
+        if not FLAGS.reward_cache_size:
+            raise app.UsageError('The shared reward table needs a cache.')
+        shared_reward_table = reward_cache.SharedRewardTable(
+            FLAGS.shared_reward_cache_slots)
+
+    n_nodes = FLAGS.n_nodes
+    k_clique = FLAGS.k_clique_number
+    games = [(n_nodes, k_clique)]
+    max_nodes = None
+    callback = []
+    if FLAGS.profile_env:
+        if FLAGS.batched_env:
+            raise app.UsageError('Profiling needs worker processes.')
+        callback.append(callbacks.ProfilingCallback())
+    if FLAGS.curriculum:
+        if FLAGS.batched_env:
+            raise app.UsageError('The curriculum needs worker processes.')
+        scheduler = curriculum.CurriculumScheduler(
+            curriculum.parse_stages(FLAGS.curriculum),
+            threshold=FLAGS.curriculum_threshold,
+            window=FLAGS.curriculum_window)
+        n_nodes, k_clique = scheduler.task
+        games = scheduler.stages
+        max_nodes = max(stage[0] for stage in scheduler.stages)
+        callback.append(curriculum.CurriculumCallback(scheduler, verbose=1))
+    if FLAGS.tournament_dir:
+        if FLAGS.environment_id != 'RamseyGame-v1' or FLAGS.curriculum:
+            raise app.UsageError('Tournaments need RamseyGame-v1 policies.')
+        callback.append(
+            callbacks.TournamentCallback(FLAGS.tournament_dir,
+                                         n_nodes,
+                                         k_clique,
+                                         FLAGS.tournament_interval,
+                                         n_games=FLAGS.tournament_games,
+                                         verbose=1))
+
+    if FLAGS.batched_env:
+        environment = ramsey_vec_env.RamseyVecEnv(n_envs,
+                                                  FLAGS.n_nodes,
+                                                  FLAGS.k_clique_number,
+                                                  reward_mode=FLAGS.reward_mode)
+        environment = VecMonitor(environment)
+    else:
+        if FLAGS.record_episodes:
+            os.makedirs(FLAGS.record_episodes, exist_ok=True)
+        # Workers forked by the forkserver inherit the imports and tables.
+        preload.preload(games, modules=['stable_baselines3.common.monitor'])
+        env_list = [
+            make_environment(
+                FLAGS.environment_id,
+                seed,
+                n_nodes,
+                k_clique,
+                save_counterexample=FLAGS.save_counterexample,
+                reward_cache_size=FLAGS.reward_cache_size,
+                canonical_reward_cache=FLAGS.canonical_reward_cache,
+                shared_reward_table=shared_reward_table,
+                max_nodes=max_nodes,
+                profile=FLAGS.profile_env,
+                record_file=(os.path.join(FLAGS.record_episodes,
+                                          f'episodes_{seed}.bin')
+                             if FLAGS.record_episodes else None),
+                record_interval=FLAGS.record_episode_interval,
+                trajectory_dir=FLAGS.trajectory_dir,
+                trajectory_shard_size=FLAGS.trajectory_shard_size,
+                reward_mode=FLAGS.reward_mode) for seed in range(n_envs)
+        ]
+        if FLAGS.shared_memory_env:
+            environment = shared_memory_vec_env.SharedMemoryVecEnv(env_list)
+        else:
+            environment = SubprocVecEnv(env_list)
+
+    if FLAGS.action_masks:
+        # pylint: disable=import-outside-toplevel
+        from sb3_contrib import MaskablePPO
+        model = MaskablePPO('MlpPolicy', environment, verbose=1)
+    else:
+        model = A2C('MlpPolicy', environment, verbose=1)
 
-    model = A2C('MlpPolicy', environment, verbose=1)
+    model.learn(total_timesteps=FLAGS.n_timesteps, callback=callback)
 
-    model.learn(total_timesteps=FLAGS.n_timesteps)
+    environment.close()
+    if shared_reward_table is not None:
+        shared_reward_table.close()
 
 
 if __name__ == '__main__':
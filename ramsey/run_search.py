@@ -0,0 +1,143 @@
+"""Searches for a Ramsey counterexample without reinforcement learning."""
+
+import os
+
+from absl import app
+from absl import logging
+from absl import flags
+
+from ramsey import counterexamples
+from ramsey import local_search
+from ramsey import parallel_search
+from ramsey import search
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_integer('n_nodes', 6, 'Number of Nodes', lower_bound=0)
+
+flags.DEFINE_integer('k_clique_number',
+                     3,
+                     'Size of clique to find in graph.',
+                     lower_bound=2)
+
+flags.DEFINE_enum(
+    'method', 'exact', ['exact', 'anneal', 'tabu', 'restart'],
+    'Search method: the exhaustive search, or local search with simulated \
+    annealing, tabu search or steepest descent with random restarts.')
+
+flags.DEFINE_boolean(
+    'random_order', False,
+    'Whether to try the colours of every edge in a random order. The search \
+    is still exhaustive.')
+
+flags.DEFINE_integer('seed', None,
+                     'Seed of the random colour order or local search.')
+
+flags.DEFINE_integer('max_flips',
+                     1000000,
+                     'Maximum number of edge flips of the local search.',
+                     lower_bound=1)
+
+flags.DEFINE_integer('max_nodes',
+                     None,
+                     'Maximum number of search nodes to expand.',
+                     lower_bound=1)
+
+flags.DEFINE_string(
+    'checkpoint_file', None,
+    'File where the search state is saved. If it exists, the search is \
+    resumed from it.')
+
+flags.DEFINE_integer('checkpoint_interval',
+                     1000000,
+                     'Number of search nodes expanded between checkpoints.',
+                     lower_bound=1)
+
+flags.DEFINE_integer('n_workers',
+                     1,
+                     'Number of worker processes. With more than one worker, \
+    the search is sharded and does not support checkpoints.',
+                     lower_bound=1)
+
+flags.DEFINE_integer(
+    'shard_depth',
+    None,
+    'Number of edges coloured by every shard of the parallel search. Defaults \
+    to the smallest depth with 8 shards per worker.',
+    lower_bound=1)
+
+flags.DEFINE_string('counterexample_file', counterexamples.DEFAULT_FILE,
+                    'File of the counterexample store.')
+
+
+def exact_search():
+    """Runs the exhaustive search, returning the colouring and the search."""
+    if FLAGS.n_workers > 1:
+        counterexample_search = parallel_search.ParallelSearch(
+            FLAGS.n_nodes,
+            FLAGS.k_clique_number,
+            n_workers=FLAGS.n_workers,
+            shard_depth=FLAGS.shard_depth)
+        colouring = counterexample_search.run()
+    else:
+        if FLAGS.checkpoint_file and os.path.exists(FLAGS.checkpoint_file):
+            logging.info('Resuming the search from %s', FLAGS.checkpoint_file)
+            counterexample_search = \
+                search.CounterexampleSearch.from_checkpoint(
+                    FLAGS.checkpoint_file, seed=FLAGS.seed)
+        else:
+            counterexample_search = search.CounterexampleSearch(
+                FLAGS.n_nodes,
+                FLAGS.k_clique_number,
+                random_order=FLAGS.random_order,
+                seed=FLAGS.seed)
+        colouring = counterexample_search.run(
+            max_nodes=FLAGS.max_nodes,
+            checkpoint_file=FLAGS.checkpoint_file,
+            checkpoint_interval=FLAGS.checkpoint_interval)
+    logging.info('Expanded %s nodes.', counterexample_search.nodes_expanded)
+    return colouring, counterexample_search
+
+
+def main(_):
+    """Searches for a counterexample."""
+    if FLAGS.method == 'exact':
+        colouring, counterexample_search = exact_search()
+        exhausted = counterexample_search.exhausted
+    else:
+        counterexample_search = local_search.LocalSearch(FLAGS.n_nodes,
+                                                         FLAGS.k_clique_number,
+                                                         seed=FLAGS.seed)
+        colouring = counterexample_search.run(FLAGS.method,
+                                              max_flips=FLAGS.max_flips)
+        exhausted = False
+        logging.info(
+            'Flipped %s edges with %s restarts, best colouring has %s '
+            'monochromatic cliques.', counterexample_search.flips,
+            counterexample_search.restarts,
+            counterexample_search.best_n_monochromatic)
+    n_nodes = counterexample_search.n_nodes
+    k_clique = counterexample_search.k_clique
+
+    if colouring is None:
+        if exhausted:
+            logging.info(
+                'There is no counterexample: every 2-colouring of K_%s has a '
+                'monochromatic %s-clique.', n_nodes, k_clique)
+        else:
+            logging.info('No counterexample found within the budget.')
+        return
+
+    store = counterexamples.CounterexampleStore(FLAGS.counterexample_file)
+    if store.add(n_nodes, k_clique, colouring):
+        logging.info('Found a counterexample, saved to %s',
+                     FLAGS.counterexample_file)
+    else:
+        logging.info('Found a counterexample, an isomorphic one is in %s',
+                     FLAGS.counterexample_file)
+    store.close()
+
+
+if __name__ == '__main__':
+    logging.set_verbosity(logging.INFO)
+    app.run(main)
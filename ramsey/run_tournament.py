@@ -0,0 +1,61 @@
+"""Rates agents of the two player Ramsey game in a tournament."""
+
+import json
+
+from absl import app
+from absl import logging
+from absl import flags
+
+from ramsey import tournament
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_list(
+    'agents', ['random', 'greedy'],
+    'Agents of the tournament: random, greedy or paths of checkpoints.')
+
+flags.DEFINE_integer('n_nodes', 6, 'Number of Nodes', lower_bound=2)
+
+flags.DEFINE_integer('k_clique_number',
+                     3,
+                     'Size of clique to find in graph.',
+                     lower_bound=2)
+
+flags.DEFINE_integer('n_games',
+                     1000,
+                     'Number of games of every match.',
+                     lower_bound=1)
+
+flags.DEFINE_integer('n_workers',
+                     None,
+                     'Number of processes. Defaults to the number of CPUs.',
+                     lower_bound=1)
+
+flags.DEFINE_string('ratings_file', None,
+                    'JSON file of the Elo ratings, updated in place.')
+
+
+def main(_):
+    """Runs a tournament and prints its results as JSON."""
+    ratings = None
+    if FLAGS.ratings_file:
+        ratings = tournament.EloRatings.load(FLAGS.ratings_file)
+    results = tournament.run_tournament(FLAGS.agents,
+                                        FLAGS.n_games,
+                                        FLAGS.n_nodes,
+                                        FLAGS.k_clique_number,
+                                        n_workers=FLAGS.n_workers,
+                                        ratings=ratings)
+    if ratings is not None:
+        ratings.save(FLAGS.ratings_file)
+    for spec, result in sorted(results['agents'].items(),
+                               key=lambda item: -item[1]['elo']):
+        logging.info('%s: Elo %.0f, %.1f%% wins, %.1f%% draws', spec,
+                     result['elo'], 100 * result['win_rate'],
+                     100 * result['draw_rate'])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    logging.set_verbosity(logging.INFO)
+    app.run(main)
@@ -0,0 +1,312 @@
+"""Exact search for Ramsey counterexamples.
+
+A counterexample for (n_nodes, k_clique) is a colouring of the edges of the
+complete graph with n_nodes in two colours such that neither colour has a
+k_clique. Colour 1 edges form the graph and colour 0 edges its dual, so a
+counterexample is a graph with n_nodes that, like the graphs saved by
+RamseyGame.close(), has no k_clique in itself nor in its dual.
+
+The search colours the edges one at a time, in the order of
+encoders.graph_hot_encoder_dict, with a depth-first search. Colouring the edge
+(u, v) can only create k_cliques that contain it, so a colour is pruned as
+soon as the common neighbourhood of u and v in that colour has a
+(k_clique - 2)-clique.
+
+Symmetry breaking keeps only colourings whose colour 1 adjacency matrix has
+lexicographically ordered rows: for every i < j, row i without the columns i
+and j is not bigger than row j without them. The edge (0, 1) is also fixed to
+colour 0, which breaks the symmetry between the two colours. Every colouring
+has an isomorphic copy, up to swapping the colours, that satisfies both
+constraints (its lex-leader), so the search stays complete.
+
+The search state is small (the colours on the current path), so it can be
+saved to a JSON checkpoint and resumed later.
+"""
+
+import json
+import os
+import random
+
+from absl import logging
+import numpy as np
+
+from ramsey import cliques
+from ramsey import encoders
+
+
+class CounterexampleSearch:
+    """Depth-first search over the 2-colourings of a complete graph."""
+
+    def __init__(self,
+                 n_nodes,
+                 k_clique,
+                 symmetry_breaking=True,
+                 random_order=False,
+                 seed=None,
+                 prefix=()):
+        """Inits the search at the root of the colouring tree.
+
+        Args:
+            n_nodes: Number of nodes of the complete graph.
+            k_clique: Size of the monochromatic cliques to avoid.
+            symmetry_breaking: Whether to prune colourings that are not the
+                lex-leader of their class, see the module docstring.
+            random_order: Whether to try the two colours of every edge in a
+                random order. The search is still exhaustive, but a
+                counterexample is usually found sooner.
+            seed: Seed of the random colour order.
+            prefix: Colours of the first edges. Only the subtree of the
+                colouring tree below this prefix is searched.
+        """
+        self.n_nodes = n_nodes
+        self.k_clique = k_clique
+        self.symmetry_breaking = symmetry_breaking
+        self.random_order = random_order
+        self.rng = random.Random(seed)
+
+        encoder = encoders.EdgeEncoder(n_nodes)
+        self.n_edges = encoder.n_edges
+        self.edges = [tuple(edge) for edge in encoder.edges.tolist()]
+        self.full_mask = (1 << n_nodes) - 1
+
+        # adjacency[colour][node] is the bitmask of the neighbours of node in
+        # that colour and known[node] the bitmask of its coloured edges.
+        self.adjacency = [[0] * n_nodes, [0] * n_nodes]
+        self.known = [0] * n_nodes
+        self.path = []
+        self.next_option = [0] * (self.n_edges + 1)
+        self.orders = [None] * (self.n_edges + 1)
+        self.nodes_expanded = 0
+        self.exhausted = False
+
+        for depth, colour in enumerate(prefix):
+            if not self._is_legal(depth, colour):
+                self.exhausted = True
+                break
+            self._set_colour(depth, colour)
+            self.path.append(colour)
+        self.root_depth = len(prefix)
+        self.orders[self.root_depth] = self._colour_order(self.root_depth)
+
+    def _colour_order(self, depth):
+        """Colours to try, in order, for the edge at the given depth."""
+        if self.symmetry_breaking and depth == 0:
+            return (0,)
+        if self.random_order and self.rng.random() < 0.5:
+            return (1, 0)
+        return (0, 1)
+
+    def _set_colour(self, depth, colour):
+        """Colours the edge at the given depth."""
+        node_u, node_v = self.edges[depth]
+        adjacency = self.adjacency[colour]
+        adjacency[node_u] |= 1 << node_v
+        adjacency[node_v] |= 1 << node_u
+        self.known[node_u] |= 1 << node_v
+        self.known[node_v] |= 1 << node_u
+
+    def _unset_colour(self, depth, colour):
+        """Removes the colour of the edge at the given depth."""
+        node_u, node_v = self.edges[depth]
+        adjacency = self.adjacency[colour]
+        adjacency[node_u] &= ~(1 << node_v)
+        adjacency[node_v] &= ~(1 << node_u)
+        self.known[node_u] &= ~(1 << node_v)
+        self.known[node_v] &= ~(1 << node_u)
+
+    def _rows_ordered(self, node_i, node_j):
+        """Whether row node_i can still be lexicographically <= row node_j.
+
+        Rows are compared from column 0 on, skipping the columns node_i and
+        node_j. The comparison is only decided once the first differing
+        column is known in both rows and no unknown column precedes it.
+        """
+        rows = self.adjacency[1]
+        both_known = self.known[node_i] & self.known[node_j] & \
+            ~((1 << node_i) | (1 << node_j))
+        diff = (rows[node_i] ^ rows[node_j]) & both_known
+        if not diff:
+            return True
+        first_diff = diff & -diff
+        unknown = ~both_known & self.full_mask & \
+            ~((1 << node_i) | (1 << node_j))
+        if unknown and unknown & -unknown < first_diff:
+            return True
+        return bool(rows[node_j] & first_diff)
+
+    def _is_legal(self, depth, colour):
+        """Whether the edge at depth can have colour, given the path."""
+        node_u, node_v = self.edges[depth]
+        adjacency = self.adjacency[colour]
+        if cliques.has_clique(adjacency, adjacency[node_u] & adjacency[node_v],
+                              self.k_clique - 2):
+            return False
+        if not self.symmetry_breaking:
+            return True
+
+        self._set_colour(depth, colour)
+        legal = True
+        for node in (node_u, node_v):
+            for other in range(self.n_nodes):
+                if other == node:
+                    continue
+                if not self._rows_ordered(min(node, other), max(node, other)):
+                    legal = False
+                    break
+            if not legal:
+                break
+        self._unset_colour(depth, colour)
+        return legal
+
+    def colouring(self):
+        """Colour of every edge on the current path, -1 when not coloured."""
+        colouring = np.full(self.n_edges, -1, dtype=np.int8)
+        colouring[:len(self.path)] = self.path
+        return colouring
+
+    def run(self,
+            max_nodes=None,
+            checkpoint_file=None,
+            checkpoint_interval=1000000,
+            leaf_depth=None):
+        """Runs the search until a counterexample is found.
+
+        Calling run() again after a counterexample is returned continues the
+        search with the next one.
+
+        Args:
+            max_nodes: Stop after expanding this many more nodes if not None.
+            checkpoint_file: File where the search state is saved, every
+                checkpoint_interval expanded nodes and when the search stops.
+            checkpoint_interval: Number of expanded nodes between checkpoints.
+            leaf_depth: Return the partial colourings with this many edges
+                instead of complete counterexamples.
+
+        Returns:
+            The counterexample, as an array with the colour of every edge, or
+            None if the search was exhausted or ran out of nodes.
+        """
+        if leaf_depth is None:
+            leaf_depth = self.n_edges
+        last_nodes_expanded = self.nodes_expanded
+        counterexample = None
+        while not self.exhausted:
+            depth = len(self.path)
+            if depth == leaf_depth:
+                counterexample = self.colouring()
+                # Step back, so that the next run continues the search.
+                self._backtrack()
+                break
+            if max_nodes is not None and \
+                    self.nodes_expanded - last_nodes_expanded >= max_nodes:
+                break
+
+            option = self.next_option[depth]
+            if option == len(self.orders[depth]):
+                self._backtrack()
+                continue
+            self.next_option[depth] = option + 1
+            colour = self.orders[depth][option]
+            self.nodes_expanded += 1
+            if self._is_legal(depth, colour):
+                self._set_colour(depth, colour)
+                self.path.append(colour)
+                self.next_option[depth + 1] = 0
+                self.orders[depth + 1] = self._colour_order(depth + 1)
+
+            if checkpoint_file is not None and \
+                    self.nodes_expanded % checkpoint_interval == 0:
+                logging.info('Expanded %s nodes, depth %s of %s.',
+                             self.nodes_expanded, depth, self.n_edges)
+                self.save_checkpoint(checkpoint_file)
+
+        if checkpoint_file is not None:
+            self.save_checkpoint(checkpoint_file)
+        return counterexample
+
+    def _backtrack(self):
+        """Uncolours the last edge of the path, or exhausts the search."""
+        if len(self.path) == self.root_depth:
+            self.exhausted = True
+            return
+        colour = self.path.pop()
+        self._unset_colour(len(self.path), colour)
+
+    def split(self):
+        """Gives away the shallowest unexplored branches of the search.
+
+        The branches are removed from this search, which keeps the subtree of
+        its current path, and returned as prefixes for new searches.
+
+        Returns:
+            A list of prefixes, empty when there is nothing left to give away.
+        """
+        for depth in range(self.root_depth, len(self.path) + 1):
+            option = self.next_option[depth]
+            remaining_colours = self.orders[depth][option:]
+            if remaining_colours and depth < len(self.path):
+                self.next_option[depth] = len(self.orders[depth])
+                return [
+                    self.path[:depth] + [colour] for colour in remaining_colours
+                ]
+        return []
+
+    def save_checkpoint(self, file_name):
+        """Saves the search state to a JSON file."""
+        depth = len(self.path)
+        checkpoint = {
+            'n_nodes': self.n_nodes,
+            'k_clique': self.k_clique,
+            'symmetry_breaking': self.symmetry_breaking,
+            'random_order': self.random_order,
+            'root_depth': self.root_depth,
+            'path': self.path,
+            'next_option': self.next_option[:depth + 1],
+            'orders': [list(order) for order in self.orders[:depth + 1]],
+            'nodes_expanded': self.nodes_expanded,
+            'exhausted': self.exhausted,
+        }
+        # Replace the previous checkpoint only once the new one is written.
+        with open(file_name + '.tmp', 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(file_name + '.tmp', file_name)
+
+    @classmethod
+    def from_checkpoint(cls, file_name, seed=None):
+        """Resumes a search saved by save_checkpoint()."""
+        with open(file_name, encoding='utf-8') as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        search = cls(checkpoint['n_nodes'],
+                     checkpoint['k_clique'],
+                     symmetry_breaking=checkpoint['symmetry_breaking'],
+                     random_order=checkpoint['random_order'],
+                     seed=seed,
+                     prefix=checkpoint['path'][:checkpoint['root_depth']])
+        # pylint: disable=protected-access
+        for depth in range(search.root_depth, len(checkpoint['path'])):
+            search._set_colour(depth, checkpoint['path'][depth])
+        search.path = checkpoint['path']
+        depth = len(search.path)
+        search.next_option[:depth + 1] = checkpoint['next_option']
+        search.orders[:depth +
+                      1] = [tuple(order) for order in checkpoint['orders']]
+        search.nodes_expanded = checkpoint['nodes_expanded']
+        search.exhausted = checkpoint['exhausted']
+        return search
+
+
+def shard_prefixes(n_nodes, k_clique, depth, symmetry_breaking=True):
+    """Colours of the first depth edges of every branch of the search.
+
+    The subtrees below these prefixes partition the colouring tree, so they
+    can be searched independently.
+    """
+    search = CounterexampleSearch(n_nodes,
+                                  k_clique,
+                                  symmetry_breaking=symmetry_breaking)
+    prefixes = []
+    while True:
+        colouring = search.run(leaf_depth=depth)
+        if colouring is None:
+            return prefixes
+        prefixes.append(colouring[:depth].tolist())
@@ -0,0 +1,298 @@
+"""Tournament between agents of the two player Ramsey game.
+
+Agents are given by specs:
+- 'random': claims a uniformly random free edge.
+- 'greedy': completes one of its k_cliques if it can, else takes an edge the
+opponent would complete one with, else the edge with the most common
+neighbours of its colour.
+- Any other spec is the path of a stable_baselines3 checkpoint of a policy
+trained on RamseyGame-v1, which claims its most likely free edge.
+
+The games follow ramsey.mcts.GameState: players take turns claiming free
+edges, player 1 first, and the first one to claim all the edges of a k_clique
+wins. Every pair of agents plays a match, each agent playing first in half of
+the games. Matches are split in batches of games played on a process pool;
+a worker plays all the games of a batch at once, so that every agent chooses
+the moves of all the games where it is to move with a single call, e.g. a
+single forward pass of a policy.
+
+The results are summarised as win, draw and loss rates, the distribution of
+the game lengths and Elo ratings, which can be kept in a JSON file across
+tournaments, e.g. to rate every checkpoint of a training run.
+
+    python -m ramsey.run_tournament --agents=random,greedy,model.zip
+"""
+
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+
+import numpy as np
+
+from ramsey import cliques
+from ramsey import mcts
+
+# Elo rating of a new agent, and the maximum change of a rating per game.
+INITIAL_RATING = 1500.0
+K_FACTOR = 16.0
+
+
+class RandomAgent:
+    """Claims uniformly random free edges."""
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def act(self, states):
+        """Moves of the player to move in every state."""
+        moves = []
+        for state in states:
+            legal_moves = state.legal_moves()
+            moves.append(legal_moves[self.rng.integers(len(legal_moves))])
+        return moves
+
+
+class GreedyAgent:
+    """Wins, blocks, or builds on its own edges, see the module docstring."""
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def _move(self, state):
+        """Move of the player to move in a state."""
+        own = state.graph.adjacency[state.player]
+        other = state.graph.adjacency[3 - state.player]
+        blocking = []
+        best = []
+        best_score = -1
+        for move in state.legal_moves():
+            node_u, node_v = state.edges[move]
+            if cliques.has_clique(own, own[node_u] & own[node_v],
+                                  state.k_clique - 2):
+                return move
+            if cliques.has_clique(other, other[node_u] & other[node_v],
+                                  state.k_clique - 2):
+                blocking.append(move)
+                continue
+            score = bin(own[node_u] & own[node_v]).count('1')
+            if score > best_score:
+                best = []
+                best_score = score
+            if score == best_score:
+                best.append(move)
+        candidates = blocking or best
+        return candidates[self.rng.integers(len(candidates))]
+
+    def act(self, states):
+        """Moves of the player to move in every state."""
+        return [self._move(state) for state in states]
+
+
+class PolicyAgent:
+    """Claims the most likely free edge of a stable_baselines3 policy."""
+
+    def __init__(self, model):
+        self.model = model
+
+    @classmethod
+    def from_file(cls, path, algorithm=None):
+        """Loads the model saved at path, an A2C model by default."""
+        if algorithm is None:
+            # pylint: disable=import-outside-toplevel
+            from stable_baselines3 import A2C
+            algorithm = A2C
+        return cls(algorithm.load(path, device='cpu'))
+
+    def act(self, states):
+        """Moves of the player to move in every state, in one forward pass."""
+        # pylint: disable=import-outside-toplevel
+        import torch
+
+        policy = self.model.policy
+        observations = np.stack([state.observation() for state in states])
+        observations, _ = policy.obs_to_tensor(observations)
+        with torch.no_grad():
+            distribution = policy.get_distribution(observations)
+            probs = distribution.distribution.probs.cpu().numpy()
+        masks = np.zeros(probs.shape, dtype=bool)
+        for index, state in enumerate(states):
+            masks[index, state.legal_moves()] = True
+        return np.where(masks, probs, -1).argmax(axis=1).tolist()
+
+
+def make_agent(spec, seed=None, algorithm=None):
+    """Agent of a spec, see the module docstring."""
+    if spec == 'random':
+        return RandomAgent(seed)
+    if spec == 'greedy':
+        return GreedyAgent(seed)
+    return PolicyAgent.from_file(spec, algorithm)
+
+
+def play_games(agents, n_games, n_nodes, k_clique):
+    """Plays games between two agents, all at once.
+
+    Agent 0 plays first in the even games and agent 1 in the odd ones.
+
+    Returns:
+        The score of agent 0 in every game (1 for a win, 0.5 for a draw and 0
+        for a loss), and the number of moves of every game.
+    """
+    states = [mcts.GameState(n_nodes, k_clique) for _ in range(n_games)]
+    active = list(range(n_games))
+    while active:
+        for agent_index, agent in enumerate(agents):
+            # Agent 0 is player 1 in the even games, so it is to move when
+            # the parity of the game and of the player differ.
+            to_move = [
+                game for game in active
+                if (game + states[game].player + agent_index) % 2 == 1
+            ]
+            if not to_move:
+                continue
+            moves = agent.act([states[game] for game in to_move])
+            for game, move in zip(to_move, moves):
+                states[game].play(move)
+            active = [game for game in active if not states[game].is_terminal()]
+
+    scores = []
+    for game, state in enumerate(states):
+        first_agent_player = 1 if game % 2 == 0 else 2
+        if state.winner == 0:
+            scores.append(0.5)
+        else:
+            scores.append(float(state.winner == first_agent_player))
+    return scores, [state.n_moves for state in states]
+
+
+_WORKER_AGENTS = {}
+
+
+def _play_worker_batch(args):
+    """Plays a batch of games of a match in a tournament worker."""
+    specs, n_games, n_nodes, k_clique, seed, algorithm = args
+    agents = []
+    for index, spec in enumerate(specs):
+        if spec in ('random', 'greedy'):
+            # Seeded for every batch, so that the games do not depend on the
+            # worker playing them.
+            agents.append(make_agent(spec, [seed, index]))
+            continue
+        # Checkpoints are loaded once per worker.
+        if spec not in _WORKER_AGENTS:
+            _WORKER_AGENTS[spec] = make_agent(spec, algorithm=algorithm)
+        agents.append(_WORKER_AGENTS[spec])
+    return specs, play_games(agents, n_games, n_nodes, k_clique)
+
+
+class EloRatings:
+    """Elo ratings of agents, optionally kept in a JSON file."""
+
+    def __init__(self, ratings=None):
+        self.ratings = dict(ratings or {})
+
+    @classmethod
+    def load(cls, file_name):
+        """Loads the ratings of a file, if it exists."""
+        if not os.path.exists(file_name):
+            return cls()
+        with open(file_name, encoding='utf-8') as ratings_file:
+            return cls(json.load(ratings_file))
+
+    def save(self, file_name):
+        """Saves the ratings to a file."""
+        with open(file_name, 'w', encoding='utf-8') as ratings_file:
+            json.dump(self.ratings, ratings_file, indent=2, sort_keys=True)
+
+    def __getitem__(self, name):
+        return self.ratings.get(name, INITIAL_RATING)
+
+    def update(self, name_a, name_b, score_a, k_factor=K_FACTOR):
+        """Updates the ratings with the score of a against b in a game."""
+        rating_a = self[name_a]
+        rating_b = self[name_b]
+        expected_a = 1 / (1 + 10**((rating_b - rating_a) / 400))
+        change = k_factor * (score_a - expected_a)
+        self.ratings[name_a] = rating_a + change
+        self.ratings[name_b] = rating_b - change
+
+
+def run_tournament(specs,
+                   n_games,
+                   n_nodes,
+                   k_clique,
+                   n_workers=None,
+                   batch_size=64,
+                   ratings=None,
+                   pairs=None,
+                   algorithm=None,
+                   start_method=None,
+                   seed=0):
+    """Plays a match between every pair of agents.
+
+    Args:
+        specs: Specs of the agents, see the module docstring.
+        n_games: Number of games of every match.
+        n_nodes: Number of nodes of the complete graph.
+        k_clique: Size of the cliques that end the game.
+        n_workers: Number of processes, defaults to the CPU count.
+        batch_size: Number of games a worker plays at once.
+        ratings: EloRatings updated with the games, new ratings by default.
+        pairs: Pairs of specs playing a match, all the pairs by default.
+        algorithm: stable_baselines3 algorithm of the checkpoints, A2C by
+            default.
+        start_method: multiprocessing start method of the workers, e.g.
+            'forkserver' from a process using torch.
+        seed: Seed of the random choices of the agents.
+
+    Returns:
+        A dictionary with, for every agent, its games, win, draw and loss
+        rates and Elo rating, and the histogram and mean of the game lengths.
+    """
+    ratings = ratings or EloRatings()
+    tasks = []
+    if pairs is None:
+        pairs = itertools.combinations(specs, 2)
+    for pair in pairs:
+        for first_game in range(0, n_games, batch_size):
+            tasks.append((tuple(pair), min(batch_size, n_games - first_game),
+                          n_nodes, k_clique, seed + len(tasks), algorithm))
+
+    results = collections.defaultdict(collections.Counter)
+    lengths = []
+    context = multiprocessing.get_context(start_method)
+    with context.Pool(n_workers) as pool:
+        # The games are rated in the order of the tasks, whatever the order
+        # the workers finish them in.
+        for (spec_a,
+             spec_b), (scores,
+                       game_lengths) in pool.imap(_play_worker_batch, tasks):
+            for score in scores:
+                ratings.update(spec_a, spec_b, score)
+                outcome_a, outcome_b = {
+                    1.0: ('wins', 'losses'),
+                    0.5: ('draws', 'draws'),
+                    0.0: ('losses', 'wins'),
+                }[score]
+                results[spec_a][outcome_a] += 1
+                results[spec_b][outcome_b] += 1
+            lengths.extend(game_lengths)
+
+    agents = {}
+    for spec in specs:
+        counts = results[spec]
+        n_played = sum(counts.values())
+        agents[spec] = {
+            'games': n_played,
+            'win_rate': counts['wins'] / max(n_played, 1),
+            'draw_rate': counts['draws'] / max(n_played, 1),
+            'loss_rate': counts['losses'] / max(n_played, 1),
+            'elo': ratings[spec],
+        }
+    return {
+        'agents': agents,
+        'game_lengths': np.bincount(lengths).tolist() if lengths else [],
+        'mean_game_length': float(np.mean(lengths)) if lengths else 0.0,
+    }
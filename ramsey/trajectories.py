@@ -0,0 +1,199 @@
+"""Dataset of the transitions played by the environments, for offline training.
+
+TrajectoryWriter wraps an environment and writes every transition to shards:
+.npy files of shard_size records, memory-mapped while they are written. A
+record holds:
+- 'state': the observation the action was played in, packed with
+np.packbits.
+- 'action': the action, packed the same way for MultiBinary actions.
+- 'reward', 'done' and 'player': the reward and done flag of the step, and the
+player who moved: the current_player of the unwrapped environment (e.g. of
+the game of a curriculum.CurriculumEnv), always 1 in RamseyGame-v0.
+
+Every writer, e.g. every SubprocVecEnv worker, has its own shards. Every
+index_interval records, and when a shard is full or the writer is closed, the
+shard is flushed and a line with its file name and number of records is
+appended to the index file of the directory, under a lock, so the index only
+lists complete records. A shard can appear in several lines, the last one
+having the most records, and a crashed writer loses at most the records of
+its last index_interval steps.
+
+TrajectoryDataset memory-maps the shards of the index and samples minibatches
+across all of them without loading them in memory.
+"""
+
+import fcntl
+import json
+import os
+
+import gym
+import numpy as np
+
+INDEX_FILE = 'index.jsonl'
+
+
+def record_dtype(observation_space, action_space):
+    """NumPy dtype of the records of an environment."""
+    state_bytes = (observation_space.n + 7) // 8
+    if isinstance(action_space, gym.spaces.MultiBinary):
+        action = ('action', np.uint8, ((action_space.n + 7) // 8,))
+    else:
+        action = ('action', np.int32)
+    return np.dtype([('state', np.uint8, (state_bytes,)), action,
+                     ('reward', np.float32), ('done', bool),
+                     ('player', np.uint8)])
+
+
+class TrajectoryWriter(gym.Wrapper):
+    """Writes the transitions of an environment to memory-mapped shards."""
+
+    def __init__(self,
+                 env,
+                 directory,
+                 name,
+                 shard_size=1 << 20,
+                 index_interval=1 << 12):
+        """Inits the writer.
+
+        Args:
+            env: RamseyGame-v0 or RamseyGame-v1 environment.
+            directory: Directory of the dataset.
+            name: Prefix of the shards of this writer, unique in the
+                directory.
+            shard_size: Number of records of every shard.
+            index_interval: Number of records between two index entries of a
+                shard.
+        """
+        super().__init__(env)
+        self.directory = directory
+        self.name = name
+        self.shard_size = shard_size
+        self.index_interval = index_interval
+        self.dtype = record_dtype(env.observation_space, env.action_space)
+        self.pack_actions = isinstance(env.action_space, gym.spaces.MultiBinary)
+        os.makedirs(directory, exist_ok=True)
+        self.n_shards = 0
+        self.shard = None
+        self.shard_file = None
+        self.position = 0
+        # Number of records of the current shard in the index.
+        self.indexed = 0
+        self.state = None
+
+    def _open_shard(self):
+        """Starts a new shard."""
+        self.shard_file = f'{self.name}_{self.n_shards:05d}.npy'
+        path = os.path.join(self.directory, self.shard_file)
+        self.shard = np.lib.format.open_memmap(path,
+                                               mode='w+',
+                                               dtype=self.dtype,
+                                               shape=(self.shard_size,))
+        self.n_shards += 1
+        self.position = 0
+        self.indexed = 0
+
+    def _index_shard(self):
+        """Flushes the current shard and adds its records to the index."""
+        if self.position == self.indexed:
+            return
+        self.shard.flush()
+        self.indexed = self.position
+        entry = json.dumps({'file': self.shard_file, 'size': self.position})
+        with open(os.path.join(self.directory, INDEX_FILE),
+                  'a',
+                  encoding='utf-8') as index_file:
+            fcntl.flock(index_file, fcntl.LOCK_EX)
+            try:
+                index_file.write(entry + '\n')
+            finally:
+                fcntl.flock(index_file, fcntl.LOCK_UN)
+
+    def _close_shard(self):
+        """Indexes the current shard, or removes it if it is empty."""
+        if self.shard is None:
+            return
+        if self.position:
+            self._index_shard()
+        else:
+            os.remove(os.path.join(self.directory, self.shard_file))
+        self.shard = None
+
+    def reset(self, **kwargs):
+        observation = self.env.reset(**kwargs)
+        self.state = np.packbits(np.asarray(observation, dtype=bool))
+        return observation
+
+    def step(self, action):
+        player = getattr(self.env.unwrapped, 'current_player', 1)
+        observation, reward, done, info = self.env.step(action)
+        if self.shard is None or self.position == self.shard_size:
+            self._close_shard()
+            self._open_shard()
+        record = self.shard[self.position]
+        record['state'] = self.state
+        if self.pack_actions:
+            record['action'] = np.packbits(np.asarray(action, dtype=bool))
+        else:
+            record['action'] = action
+        record['reward'] = reward
+        record['done'] = done
+        record['player'] = player
+        self.position += 1
+        if self.position % self.index_interval == 0:
+            self._index_shard()
+        self.state = np.packbits(np.asarray(observation, dtype=bool))
+        return observation, reward, done, info
+
+    def close(self):
+        self._close_shard()
+        return self.env.close()
+
+
+class TrajectoryDataset:
+    """Random access to the records of the shards of a dataset."""
+
+    def __init__(self, directory):
+        """Memory-maps the shards listed in the index of a directory."""
+        self.directory = directory
+        # Number of records of every shard, in the order of the index.
+        sizes = {}
+        with open(os.path.join(directory, INDEX_FILE),
+                  encoding='utf-8') as index_file:
+            for line in index_file:
+                entry = json.loads(line)
+                sizes[entry['file']] = max(sizes.get(entry['file'], 0),
+                                           entry['size'])
+        if not any(sizes.values()):
+            raise ValueError(f'The index of {directory} lists no records.')
+        self.shards = [
+            np.load(os.path.join(directory, file_name), mmap_mode='r')[:size]
+            for file_name, size in sizes.items()
+        ]
+        # Index of the first record of every shard, and the total.
+        self.offsets = np.cumsum([0] + list(sizes.values()))
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __getitem__(self, indices):
+        """Records with the given indices, as a structured array."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if np.any((indices < 0) | (indices >= len(self))):
+            raise IndexError('Record index out of range.')
+        shard_indices = np.searchsorted(self.offsets, indices, side='right') - 1
+        records = np.empty(indices.shape, dtype=self.shards[0].dtype)
+        for shard_index in np.unique(shard_indices):
+            selected = shard_indices == shard_index
+            positions = indices[selected] - self.offsets[shard_index]
+            records[selected] = self.shards[shard_index][positions]
+        return records
+
+    def sample(self, batch_size, rng=None):
+        """Uniformly samples a minibatch of records."""
+        rng = rng or np.random.default_rng()
+        return self[rng.integers(0, len(self), batch_size)]
+
+
+def unpack_states(records, n_state_bits):
+    """Unpacks the states of records into binary observations."""
+    return np.unpackbits(records['state'], axis=-1, count=n_state_bits)
@@ -0,0 +1,105 @@
+"""Replays, or follows, the games recorded by recorder.EpisodeRecorder.
+
+Runs in its own process, so that watching the games of a long training run
+does not slow it down:
+
+    python -m ramsey.view_episodes --episode_file=episodes.bin --follow
+"""
+
+from absl import app
+from absl import flags
+from absl import logging
+
+import matplotlib.pyplot as plt
+from matplotlib import collections as mc
+import numpy as np
+
+from ramsey import encoders
+from ramsey import recorder
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_string('episode_file', None, 'Recording file to view.')
+
+flags.DEFINE_boolean(
+    'follow', False,
+    'Whether to keep showing the games appended to the file, like tail -f.')
+
+flags.DEFINE_float('frame_seconds',
+                   0.2,
+                   'Seconds each step is shown.',
+                   lower_bound=0.001)
+
+flags.DEFINE_integer('skip_episodes',
+                     0,
+                     'Number of recorded games to skip.',
+                     lower_bound=0)
+
+flags.mark_flag_as_required('episode_file')
+
+# Colours of the edges: free, player 1 (or the graph), player 2.
+EDGE_COLOURS = np.array([[0.85, 0.85, 0.85, 0.3], [0.85, 0.1, 0.1, 1.0],
+                         [0.1, 0.2, 0.85, 1.0]])
+
+
+class EpisodeViewer:
+    """Draws the complete graph of a game with the colour of every edge."""
+
+    def __init__(self):
+        self.figure, self.axes = plt.subplots()
+        self.axes.set_axis_off()
+        self.axes.set_aspect('equal')
+        self.n_nodes = None
+        self.lines = None
+        self.colours = None
+        self.episode = 0
+
+    def _layout(self, n_nodes):
+        """Places the nodes of a game on a circle."""
+        self.n_nodes = n_nodes
+        encoder = encoders.EdgeEncoder(n_nodes)
+        angles = 2 * np.pi * np.arange(n_nodes) / max(n_nodes, 1)
+        positions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        self.axes.clear()
+        self.axes.set_axis_off()
+        self.axes.scatter(positions[:, 0], positions[:, 1], c='k', zorder=2)
+        # One line per edge, recoloured in place on every step.
+        self.lines = mc.LineCollection(np.stack(
+            [positions[encoder.rows], positions[encoder.cols]], axis=1),
+                                       zorder=1)
+        self.axes.add_collection(self.lines)
+        self.colours = np.zeros(encoder.n_edges, dtype=np.int64)
+
+    def show(self, record, frame_seconds):
+        """Applies a record to the game and draws it."""
+        if record.kind == recorder.RESET:
+            self.episode += 1
+            if record.n_nodes != self.n_nodes:
+                self._layout(record.n_nodes)
+            self.colours[:] = 0
+        self.colours[record.edges] = record.colours
+        self.lines.set_color(EDGE_COLOURS[self.colours])
+        self.axes.set_title(f'Game {self.episode}, reward {record.reward:g}')
+        self.figure.canvas.draw_idle()
+        plt.pause(frame_seconds)
+
+
+def main(_):
+    """Shows the recorded games."""
+    viewer = EpisodeViewer()
+    episode = 0
+    for record in recorder.read_records(FLAGS.episode_file,
+                                        follow=FLAGS.follow):
+        if record.kind == recorder.RESET:
+            episode += 1
+        if episode <= FLAGS.skip_episodes:
+            continue
+        if not plt.fignum_exists(viewer.figure.number):
+            break
+        viewer.show(record, FLAGS.frame_seconds)
+    logging.info('Showed %s games.', episode - FLAGS.skip_episodes)
+
+
+if __name__ == '__main__':
+    logging.set_verbosity(logging.INFO)
+    app.run(main)
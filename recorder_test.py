@@ -0,0 +1,79 @@
+"""Tests of the game recorder."""
+
+import os
+
+import numpy as np
+
+from ramsey import envs
+from ramsey import recorder
+
+
+def replay(file_name, n_edges):
+    """Final colours of every recorded game."""
+    games = []
+    for record in recorder.read_records(file_name):
+        if record.kind == recorder.RESET:
+            games.append(np.zeros(n_edges, dtype=np.int64))
+        games[-1][record.edges] = record.colours
+    return games
+
+
+def test_multiplayer_round_trip(tmp_path):
+    file_name = str(tmp_path / 'games.bin')
+    env = recorder.EpisodeRecorder(envs.RamseyGameMultiplayer(6, 3),
+                                   file_name,
+                                   episode_interval=2)
+    rng = np.random.default_rng(0)
+    expected = []
+    env.reset()
+    for episode in range(6):
+        env.reset()
+        done = False
+        while not done:
+            observation, _, done, _ = env.step(rng.integers(15))
+        if episode % 2 == 0:
+            expected.append(observation[:15] + 2 * observation[15:])
+    env.close()
+
+    games = replay(file_name, 15)
+    assert len(games) == len(expected)
+    for game, colours in zip(games, expected):
+        np.testing.assert_array_equal(game, colours)
+
+
+def test_single_player_round_trip(tmp_path):
+    file_name = str(tmp_path / 'games.bin')
+    env = recorder.EpisodeRecorder(envs.RamseyGame(5, 3), file_name)
+    env.reset()
+    colouring = np.array([1, 0] * 5)
+    observation, reward, _, _ = env.step(colouring)
+    env.close()
+
+    records = list(recorder.read_records(file_name))
+    kinds = [record.kind for record in records]
+    assert kinds == [recorder.RESET, recorder.STEP]
+    assert records[1].reward == reward
+    np.testing.assert_array_equal(replay(file_name, 10)[0], observation)
+
+
+def test_unstepped_games_are_not_recorded(tmp_path):
+    file_name = str(tmp_path / 'games.bin')
+    env = recorder.EpisodeRecorder(envs.RamseyGameMultiplayer(5, 3), file_name)
+    env.reset()
+    env.close()
+    assert not os.path.exists(file_name)
+
+
+def test_partial_records_are_not_read(tmp_path):
+    file_name = str(tmp_path / 'games.bin')
+    env = recorder.EpisodeRecorder(envs.RamseyGameMultiplayer(5, 3), file_name)
+    env.reset()
+    env.step(0)
+    env.close()
+    with open(file_name, 'rb') as record_file:
+        data = record_file.read()
+
+    partial_file_name = str(tmp_path / 'partial.bin')
+    with open(partial_file_name, 'wb') as partial_file:
+        partial_file.write(data[:-1])
+    assert len(list(recorder.read_records(partial_file_name))) == 1
@@ -0,0 +1,69 @@
+"""Tests of the reward cache."""
+
+import pickle
+
+import networkx
+
+from ramsey import reward_cache
+from ramsey import reward_functions
+
+
+def test_cached_rewards_match():
+    cache = reward_cache.RewardCache(max_size=1000)
+    for seed in range(30):
+        graph = networkx.gnp_random_graph(8, 0.5, seed % 10)
+        assert cache(graph) == reward_functions.ramsey_number(graph)
+    assert cache.stats()['misses'] == 10
+    assert cache.stats()['hits'] == 20
+
+
+def test_evicts_least_recently_used():
+    cache = reward_cache.RewardCache(max_size=2)
+    graphs = [networkx.path_graph(n_nodes) for n_nodes in (3, 4, 5)]
+    cache(graphs[0])
+    cache(graphs[1])
+    cache(graphs[0])
+    cache(graphs[2])
+    assert len(cache) == 2
+    cache(graphs[0])
+    assert cache.hits == 2
+    cache(graphs[1])
+    assert cache.misses == 4
+
+
+def test_canonical_keys():
+    graph = networkx.gnp_random_graph(8, 0.4, 0)
+    labels = [3, 6, 0, 7, 1, 5, 2, 4]
+    relabelled = networkx.empty_graph(8)
+    relabelled.add_edges_from(
+        (labels[node_u], labels[node_v]) for node_u, node_v in graph.edges)
+
+    cache = reward_cache.RewardCache()
+    cache(graph)
+    cache(relabelled)
+    assert cache.hits == 0
+
+    cache = reward_cache.RewardCache(canonical_keys=True)
+    cache(graph)
+    cache(relabelled)
+    assert cache.hits == 1
+
+
+def test_shared_table():
+    table = reward_cache.SharedRewardTable(n_slots=1024)
+    try:
+        attached = pickle.loads(pickle.dumps(table))
+        table.put(('key', 1), -3)
+        assert attached.get(('key', 1)) == -3
+        assert attached.get(('key', 2)) is None
+
+        cache = reward_cache.RewardCache(shared_table=table)
+        other_cache = reward_cache.RewardCache(shared_table=attached)
+        graph = networkx.cycle_graph(5)
+        assert cache(graph) == 2
+        assert other_cache(graph) == 2
+        assert other_cache.shared_hits == 1
+        assert other_cache.misses == 0
+        attached.close()
+    finally:
+        table.close()
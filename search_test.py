@@ -0,0 +1,87 @@
+"""Tests of the exact counterexample search."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from ramsey import canonical
+from ramsey import encoders
+from ramsey import search
+
+
+def brute_force_counterexamples(n_nodes, k_clique):
+    encoder = encoders.EdgeEncoder(n_nodes)
+    clique_edges = []
+    for nodes in itertools.combinations(range(n_nodes), k_clique):
+        clique_edges.append([
+            encoder.edge_index(node_u, node_v)
+            for node_u, node_v in itertools.combinations(nodes, 2)
+        ])
+    colourings = np.array(list(itertools.product((0, 1),
+                                                 repeat=encoder.n_edges)),
+                          dtype=np.int8)
+    ones = colourings[:, clique_edges].sum(axis=2)
+    monochromatic = (ones == 0) | (ones == len(clique_edges[0]))
+    return colourings[~monochromatic.any(axis=1)]
+
+
+def all_counterexamples(counterexample_search):
+    colourings = []
+    while True:
+        colouring = counterexample_search.run()
+        if colouring is None:
+            return colourings
+        colourings.append(colouring)
+
+
+def classes(colourings):
+    """Isomorphism classes of colourings, up to swapping the colours."""
+    return {
+        min(
+            canonical.canonical_colourings(colouring)[0].tobytes(),
+            canonical.canonical_colourings(1 - colouring)[0].tobytes())
+        for colouring in colourings
+    }
+
+
+@pytest.mark.parametrize('n_nodes,k_clique', [(4, 3), (5, 3), (6, 3), (5, 4)])
+def test_matches_brute_force(n_nodes, k_clique):
+    expected = brute_force_counterexamples(n_nodes, k_clique)
+    found = all_counterexamples(
+        search.CounterexampleSearch(n_nodes, k_clique, symmetry_breaking=False))
+    assert sorted(map(tuple, found)) == sorted(map(tuple, expected))
+
+    counterexample_search = search.CounterexampleSearch(n_nodes, k_clique)
+    assert classes(
+        all_counterexamples(counterexample_search)) == classes(expected)
+    assert counterexample_search.exhausted
+
+
+def test_shards_partition_the_search():
+    expected = all_counterexamples(search.CounterexampleSearch(6, 4))
+    found = []
+    for prefix in search.shard_prefixes(6, 4, depth=4):
+        found.extend(
+            all_counterexamples(search.CounterexampleSearch(6, 4,
+                                                            prefix=prefix)))
+    assert sorted(map(tuple, found)) == sorted(map(tuple, expected))
+
+
+def test_resume_from_checkpoint(tmp_path):
+    checkpoint_file = str(tmp_path / 'search.json')
+    expected = all_counterexamples(
+        search.CounterexampleSearch(6, 4, random_order=True, seed=1))
+    counterexample_search = search.CounterexampleSearch(6,
+                                                        4,
+                                                        random_order=True,
+                                                        seed=1)
+    found = []
+    while not counterexample_search.exhausted:
+        colouring = counterexample_search.run(max_nodes=37,
+                                              checkpoint_file=checkpoint_file)
+        if colouring is not None:
+            found.append(colouring)
+        counterexample_search = search.CounterexampleSearch.from_checkpoint(
+            checkpoint_file)
+    assert sorted(map(tuple, found)) == sorted(map(tuple, expected))
@@ -0,0 +1,72 @@
+"""Tests of the shared memory VecEnv."""
+
+import functools
+
+import numpy as np
+import pytest
+
+from ramsey.envs import ramsey_env_multiplayer
+
+pytest.importorskip('stable_baselines3')
+
+# pylint: disable=wrong-import-position
+from ramsey.envs import shared_memory_vec_env
+
+
+class FailingGame(ramsey_env_multiplayer.RamseyGameMultiplayer):
+    """Game whose steps raise once an edge is claimed twice."""
+
+    def step(self, action):
+        if not self.free_edges[action]:
+            raise ValueError(f'Edge {action} is already claimed.')
+        return super().step(action)
+
+
+@pytest.mark.parametrize('n_workers', [None, 2])
+def test_matches_single_games(n_workers):
+    n_envs = 5
+    make_game = functools.partial(ramsey_env_multiplayer.RamseyGameMultiplayer,
+                                  6, 3)
+    env = shared_memory_vec_env.SharedMemoryVecEnv([make_game] * n_envs,
+                                                   n_workers=n_workers)
+    games = [make_game() for _ in range(n_envs)]
+    try:
+        observations = env.reset()
+        np.testing.assert_array_equal(observations,
+                                      [game.reset() for game in games])
+        rng = np.random.default_rng(0)
+        n_dones = 0
+        for _ in range(100):
+            actions = rng.integers(0, 15, n_envs)
+            observations, rewards, dones, infos = env.step(actions)
+            for index, game in enumerate(games):
+                observation, reward, done, _ = game.step(actions[index])
+                if done:
+                    n_dones += 1
+                    np.testing.assert_array_equal(
+                        infos[index]['terminal_observation'], observation)
+                    observation = game.reset()
+                np.testing.assert_array_equal(observations[index], observation)
+                assert rewards[index] == reward
+                assert dones[index] == done
+        assert n_dones > 0
+
+        env.set_attr('k_clique', 4, indices=[2])
+        assert env.get_attr('k_clique') == [3, 3, 4, 3, 3]
+        masks = env.env_method('action_masks', indices=[1, 4])
+        assert len(masks) == 2
+        np.testing.assert_array_equal(masks[1], games[4].action_masks())
+    finally:
+        env.close()
+
+
+def test_worker_errors_are_raised():
+    env = shared_memory_vec_env.SharedMemoryVecEnv(
+        [functools.partial(FailingGame, 5, 3)] * 2)
+    try:
+        env.reset()
+        env.step(np.array([0, 0]))
+        with pytest.raises(ValueError, match='already claimed'):
+            env.step(np.array([1, 0]))
+    finally:
+        env.close()
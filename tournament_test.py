@@ -0,0 +1,78 @@
+"""Tests of the tournaments between agents."""
+
+import pytest
+
+from ramsey import encoders
+from ramsey import mcts
+from ramsey import tournament
+
+
+def test_elo_update():
+    ratings = tournament.EloRatings()
+    ratings.update('a', 'b', 1.0)
+    assert ratings['a'] == tournament.INITIAL_RATING + tournament.K_FACTOR / 2
+    assert ratings['b'] == tournament.INITIAL_RATING - tournament.K_FACTOR / 2
+
+    # A draw moves the ratings towards each other, keeping their sum.
+    ratings.update('a', 'b', 0.5)
+    assert ratings['b'] < ratings['a'] < tournament.INITIAL_RATING + 8
+    assert ratings['a'] + ratings['b'] == pytest.approx(
+        2 * tournament.INITIAL_RATING)
+
+    # Beating a much weaker agent barely changes the ratings.
+    ratings = tournament.EloRatings({'strong': 2500.0})
+    ratings.update('strong', 'weak', 1.0)
+    assert 0 < ratings['strong'] - 2500 < 0.1
+
+
+def test_elo_file(tmp_path):
+    file_name = str(tmp_path / 'ratings.json')
+    assert tournament.EloRatings.load(file_name).ratings == {}
+    ratings = tournament.EloRatings()
+    ratings.update('a', 'b', 0.0)
+    ratings.save(file_name)
+    assert tournament.EloRatings.load(file_name).ratings == ratings.ratings
+
+
+def test_greedy_agent_wins_at_once():
+    state = mcts.GameState(5, 3)
+    # Both players can complete a triangle, player 1 is to move.
+    for node_u, node_v in [(0, 1), (3, 4), (0, 2), (2, 4)]:
+        state.play(encoders.edge_index(5, node_u, node_v))
+    assert tournament.GreedyAgent(0).act([state
+                                         ]) == [encoders.edge_index(5, 1, 2)]
+
+
+def test_play_games():
+    scores, lengths = tournament.play_games(
+        [tournament.GreedyAgent(0),
+         tournament.RandomAgent(0)], 20, 6, 3)
+    assert len(scores) == len(lengths) == 20
+    assert set(scores) <= {0.0, 0.5, 1.0}
+    assert all(0 < length <= 15 for length in lengths)
+    # There is no draw with 6 nodes and triangles.
+    assert 0.5 not in scores
+
+
+def run_tournament(**kwargs):
+    return tournament.run_tournament(['random', 'greedy'],
+                                     40,
+                                     6,
+                                     3,
+                                     n_workers=2,
+                                     batch_size=16,
+                                     **kwargs)
+
+
+def test_run_tournament():
+    results = run_tournament()
+    agents = results['agents']
+    assert agents['random']['games'] == agents['greedy']['games'] == 40
+    assert agents['greedy']['win_rate'] == agents['random']['loss_rate']
+    assert agents['greedy']['win_rate'] > 0.5
+    assert agents['greedy']['elo'] > tournament.INITIAL_RATING
+    assert sum(results['game_lengths']) == 40
+
+
+def test_run_tournament_is_reproducible():
+    assert run_tournament(seed=1) == run_tournament(seed=1)
@@ -0,0 +1,105 @@
+"""Tests of the trajectory dataset."""
+
+import numpy as np
+import pytest
+
+from ramsey import encoders
+from ramsey import envs
+from ramsey import trajectories
+
+
+def play(env, n_steps, seed=0):
+    """Plays random moves, returning the transitions."""
+    rng = np.random.default_rng(seed)
+    transitions = []
+    observation = env.reset()
+    for _ in range(n_steps):
+        player = env.unwrapped.current_player
+        action = int(rng.integers(env.action_space.n))
+        next_observation, reward, done, _ = env.step(action)
+        transitions.append((observation, action, reward, done, player))
+        observation = env.reset() if done else next_observation
+    return transitions
+
+
+def test_round_trip(tmp_path):
+    directory = str(tmp_path)
+    transitions = []
+    for worker in range(2):
+        env = trajectories.TrajectoryWriter(envs.RamseyGameMultiplayer(6, 3),
+                                            directory,
+                                            f'worker{worker}',
+                                            shard_size=50,
+                                            index_interval=16)
+        transitions.extend(play(env, 237, seed=worker))
+        env.close()
+
+    dataset = trajectories.TrajectoryDataset(directory)
+    assert len(dataset) == len(transitions)
+    assert len(dataset.shards) == 10
+    records = dataset[np.arange(len(dataset))]
+    states = trajectories.unpack_states(records, 30)
+    for index, (observation, action, reward, done,
+                player) in enumerate(transitions):
+        np.testing.assert_array_equal(states[index], observation)
+        assert records['action'][index] == action
+        assert records['reward'][index] == np.float32(reward)
+        assert records['done'][index] == done
+        assert records['player'][index] == player
+    assert set(records['player']) == {1, 2}
+
+    batch = dataset.sample(64, np.random.default_rng(0))
+    assert batch.shape == (64,)
+    assert batch.dtype == records.dtype
+
+
+def test_unclosed_writer(tmp_path):
+    directory = str(tmp_path)
+    env = trajectories.TrajectoryWriter(envs.RamseyGameMultiplayer(6, 3),
+                                        directory,
+                                        'worker',
+                                        index_interval=16)
+    play(env, 40)
+    # Only the records of the index are read, up to the last interval.
+    assert len(trajectories.TrajectoryDataset(directory)) == 32
+    env.close()
+    assert len(trajectories.TrajectoryDataset(directory)) == 40
+
+
+def test_packed_actions(tmp_path):
+    directory = str(tmp_path)
+    env = trajectories.TrajectoryWriter(envs.RamseyGame(5, 3), directory, 'v0')
+    env.reset()
+    action = np.array([1, 1, 0, 1, 0, 0, 0, 1, 1, 0])
+    env.step(action)
+    env.close()
+    records = trajectories.TrajectoryDataset(directory)[[0]]
+    np.testing.assert_array_equal(np.unpackbits(records['action'][0], count=10),
+                                  action)
+    assert records['player'][0] == 1
+
+
+def test_curriculum_players(tmp_path):
+    pytest.importorskip('stable_baselines3')
+    # pylint: disable=import-outside-toplevel
+    from ramsey import curriculum
+    directory = str(tmp_path)
+    env = trajectories.TrajectoryWriter(curriculum.CurriculumEnv(6, 5, 3),
+                                        directory, 'curriculum')
+    env.reset()
+    for node_u, node_v in [(0, 1), (0, 2), (1, 2)]:
+        env.step(encoders.edge_index(6, node_u, node_v))
+    env.close()
+    records = trajectories.TrajectoryDataset(directory)[np.arange(3)]
+    assert records['player'].tolist() == [1, 2, 1]
+
+
+def test_empty_index(tmp_path):
+    env = trajectories.TrajectoryWriter(envs.RamseyGameMultiplayer(5, 3),
+                                        str(tmp_path), 'worker')
+    env.reset()
+    env.close()
+    with open(tmp_path / trajectories.INDEX_FILE, 'w', encoding='utf-8'):
+        pass
+    with pytest.raises(ValueError, match='no records'):
+        trajectories.TrajectoryDataset(str(tmp_path))